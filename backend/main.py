@@ -4,17 +4,22 @@ import os
 import fastapi
 import shutil
 import uuid
+import json
 import jwt
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 from pathlib import Path
-from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks, Depends
+from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks, Depends, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse, FileResponse
+try:
+    import orjson  # noqa: F401  (ORJSONResponse needs it at render time)
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+except ImportError:
+    FastJSONResponse = JSONResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from passlib.context import CryptContext
-from asgiref.sync import sync_to_async
 import concurrent.futures
 import multiprocessing
 
@@ -37,89 +42,84 @@ from core.batch_processor import BatchProcessor
 from core.db_bridge import (
     get_constituencies, get_local_bodies, save_booth_data,
     get_dashboard_stats, get_voter_list, update_voter_in_db,
-    get_all_locations, add_constituency, add_local_body, add_booth,
-    get_all_users, create_managed_user, delete_user, update_user_profile, get_parties, add_party
+    get_locations_tree, add_constituency, add_local_body, add_booth,
+    get_all_users, create_managed_user, delete_user, update_user_profile, get_parties, add_party,
+    iter_voter_export, import_voter_records, revise_voter_records, VOTER_LIST_KEYS
 )
+from core.export_stream import encode_export, ThreadedChunks
+from core.structured_import import iter_records, read_rows
+from core import stats_cache
+from core.profile_cache import resolve_user, user_info as user_info_for
+from core.db_executor import db_async, try_acquire, stats as db_executor_stats
+from voter_vault.db_pool import pool_stats
 
 SYMBOLS_DIR = BASE_DIR / "data" / "party_symbols"
 SYMBOLS_DIR.mkdir(parents=True, exist_ok=True)
 
 # --- Django Async Bridges ---
 from django.contrib.auth import authenticate
-from django.contrib.auth.models import User
 
-# THREAD-SAFE SYNC WRAPPERS
+# SYNC WRAPPERS (run on the bounded DB pool, see core/db_executor.py)
 def sync_authenticate(username, password):
     user = authenticate(username=username, password=password)
     if user:
-        return {
-            "id": user.id,
-            "username": user.username,
-            "role": user.profile.role,
-            "can_download": user.profile.can_download,
-            "can_upload": user.profile.can_upload,
-            "can_verify": user.profile.can_verify,
-            "can_edit_voters": user.profile.can_edit_voters,
-            "can_send_broadcasts": user.profile.can_send_broadcasts,
-            "can_manage_system": user.profile.can_manage_system
-        }
+        return user_info_for(user.profile)
     return None
 
 def sync_get_user_info(username):
-    user = User.objects.filter(username=username).first()
-    if user:
-        return {
-            "id": user.id,
-            "username": user.username,
-            "role": user.profile.role,
-            "can_download": user.profile.can_download,
-            "can_upload": user.profile.can_upload,
-            "can_verify": user.profile.can_verify,
-            "can_edit_voters": user.profile.can_edit_voters,
-            "can_send_broadcasts": user.profile.can_send_broadcasts,
-            "can_manage_system": user.profile.can_manage_system
-        }
+    resolved = resolve_user(username)
+    if resolved:
+        profile, info = resolved
+        # Handlers get the resolved profile along with the permission summary
+        return {**info, "profile": profile}
     return None
 
-def sync_dashboard_wrapper(username, constituency_id=None, booth_id=None):
-    user = User.objects.get(username=username)
-    return get_dashboard_stats(user.profile, constituency_id, booth_id)
-
-def sync_voter_list_wrapper(username, search, page, page_size, constituency_id=None, lb_id=None, booth_id=None, gender=None, age_from=None, age_to=None, leaning=None):
-    user = User.objects.get(username=username)
-    return get_voter_list(user.profile, search, page, page_size, constituency_id, lb_id, booth_id, gender, age_from, age_to, leaning)
-
-def sync_locations_wrapper(username):
-    user = User.objects.get(username=username)
-    return get_all_locations(user.profile)
-
-# ASYNC WRAPPERS
-authenticate_async = sync_to_async(sync_authenticate, thread_sensitive=True)
-get_user_info_async = sync_to_async(sync_get_user_info, thread_sensitive=True)
-get_constituencies_async = sync_to_async(get_constituencies, thread_sensitive=True)
-get_local_bodies_async = sync_to_async(get_local_bodies, thread_sensitive=True)
-save_booth_data_async = sync_to_async(save_booth_data, thread_sensitive=True)
-get_stats_async = sync_to_async(sync_dashboard_wrapper, thread_sensitive=True)
-get_voters_async = sync_to_async(sync_voter_list_wrapper, thread_sensitive=True)
-edit_voter_async = sync_to_async(update_voter_in_db, thread_sensitive=True)
+def sync_dashboard_wrapper(profile, constituency_id=None, booth_id=None):
+    return get_dashboard_stats(profile, constituency_id, booth_id)
+
+def sync_voter_list_wrapper(profile, search, page, page_size, constituency_id=None, lb_id=None, booth_id=None, gender=None, age_from=None, age_to=None, leaning=None, cursor=None, count_mode='exact'):
+    return get_voter_list(profile, search, page, page_size, constituency_id, lb_id, booth_id, gender, age_from, age_to, leaning, cursor=cursor, count_mode=count_mode)
+
+def sync_locations_wrapper(profile):
+    return get_locations_tree(profile)
+
+def sync_import_roll_wrapper(path, filename, mapping, constituency, lgb_type, lgb_name, b_num=None, ps_no="", ps_name="", user_id=None, revision_mode=None, dry_run=False):
+    # Rows are read, cleaned and COPYed as one stream on the pool thread
+    records = iter_records(read_rows(path), mapping)
+    if revision_mode:
+        return revise_voter_records(records, constituency, filename, booth_number=b_num, user_id=user_id,
+                                    mode=revision_mode, dry_run=dry_run)
+    return import_voter_records(records, constituency, lgb_type, lgb_name, filename,
+                                booth_number=b_num, polling_station_no=ps_no, polling_station_name=ps_name, user_id=user_id)
+
+# ASYNC WRAPPERS (endpoint group -> concurrency limit)
+authenticate_async = db_async(sync_authenticate, 'auth')
+get_user_info_async = db_async(sync_get_user_info, 'auth')
+get_constituencies_async = db_async(get_constituencies, 'read')
+get_local_bodies_async = db_async(get_local_bodies, 'read')
+save_booth_data_async = db_async(save_booth_data, 'write')
+import_roll_async = db_async(sync_import_roll_wrapper, 'write')
+revise_booth_data_async = db_async(revise_voter_records, 'write')
+get_stats_async = db_async(sync_dashboard_wrapper, 'dashboard')
+get_voters_async = db_async(sync_voter_list_wrapper, 'voters')
+edit_voter_async = db_async(update_voter_in_db, 'write')
 
 # Admin Async Wrappers
-get_all_locations_async = sync_to_async(sync_locations_wrapper, thread_sensitive=True)
-add_const_async = sync_to_async(add_constituency, thread_sensitive=True)
-add_lb_async = sync_to_async(add_local_body, thread_sensitive=True)
-add_booth_async = sync_to_async(add_booth, thread_sensitive=True)
-get_all_users_async = sync_to_async(get_all_users, thread_sensitive=True)
-create_user_async = sync_to_async(create_managed_user, thread_sensitive=True)
-delete_user_async = sync_to_async(delete_user, thread_sensitive=True)
-update_user_async = sync_to_async(update_user_profile, thread_sensitive=True)
-get_parties_async = sync_to_async(get_parties, thread_sensitive=True)
-add_party_async = sync_to_async(add_party, thread_sensitive=True)
+get_all_locations_async = db_async(sync_locations_wrapper, 'read')
+add_const_async = db_async(add_constituency, 'write')
+add_lb_async = db_async(add_local_body, 'write')
+add_booth_async = db_async(add_booth, 'write')
+get_all_users_async = db_async(get_all_users, 'read')
+create_user_async = db_async(create_managed_user, 'write')
+delete_user_async = db_async(delete_user, 'write')
+update_user_async = db_async(update_user_profile, 'write')
+get_parties_async = db_async(get_parties, 'read')
+add_party_async = db_async(add_party, 'write')
 
 # --- Comm Engine Sync Wrappers ---
-def sync_comm_stats(username):
+def sync_comm_stats(profile):
     from core.comm_engine import CommunicationEngine
-    user = User.objects.get(username=username)
-    return CommunicationEngine.get_comm_stats(user.profile)
+    return CommunicationEngine.get_comm_stats(profile)
 
 def sync_manage_templates(action, data=None):
     from core_db.models import MessageTemplate
@@ -129,15 +129,14 @@ def sync_manage_templates(action, data=None):
         t = MessageTemplate.objects.create(**data)
         return {"id": t.id, "success": True}
 
-def sync_send_broadcast(username, voter_ids, template_id):
+def sync_send_broadcast(profile, voter_ids, template_id):
     from core.comm_engine import CommunicationEngine
-    user = User.objects.get(username=username)
-    return CommunicationEngine.send_broadcast(voter_ids, template_id, user)
+    return CommunicationEngine.send_broadcast(voter_ids, template_id, profile.user)
 
 # --- Comm Engine Async Wrappers ---
-get_comm_stats_async = sync_to_async(sync_comm_stats, thread_sensitive=True)
-manage_templates_async = sync_to_async(sync_manage_templates, thread_sensitive=True)
-send_broadcast_async = sync_to_async(sync_send_broadcast, thread_sensitive=True)
+get_comm_stats_async = db_async(sync_comm_stats, 'dashboard')
+manage_templates_async = db_async(sync_manage_templates, 'read')
+send_broadcast_async = db_async(sync_send_broadcast, 'write')
 
 # Auth Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "election-super-secret-key-2026")
@@ -167,6 +166,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger("ElectionEngine")
 
+# Build the stats cache backend now so a misconfigured STATS_CACHE_BACKEND fails startup
+stats_cache.get_backend()
+
 app = FastAPI(title="Election Management System Backend")
 
 # Auth Helpers
@@ -330,10 +332,15 @@ def run_processing(batch_id: str):
 # ----------------------------------------------------------------
 
 @app.get("/api/admin/locations")
-async def admin_get_locations(user_info=Depends(get_current_user)):
+async def admin_get_locations(if_none_match: str = Header(None), user_info=Depends(get_current_user)):
     # Scoped locations: Allowed for all authenticated users
     # Filtering is handled in the wrapper/db_bridge
-    return await get_all_locations_async(user_info['username'])
+    etag, tree = await get_all_locations_async(user_info['profile'])
+    # private: the tree depends on the caller's scope
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match and etag in [t.strip() for t in if_none_match.split(',')]:
+        return Response(status_code=304, headers=headers)
+    return FastJSONResponse(tree, headers=headers)
 
 @app.post("/api/admin/add-const")
 async def admin_add_const(data: dict, user_info=Depends(get_current_user)):
@@ -351,9 +358,18 @@ async def admin_add_booth(data: dict, user_info=Depends(get_current_user)):
     return await add_booth_async(data['const_id'], data['lb_id'], data['number'], data.get('ps_name', ''), data.get('ps_no', ''))
 
 @app.get("/api/admin/users")
-async def admin_get_users(user_info=Depends(get_current_user)):
+async def admin_get_users(
+    page: int = None, page_size: int = 100,
+    role: str = None, constituency: str = None, lb: str = None, booth: str = None,
+    search: str = None,
+    user_info=Depends(get_current_user)
+):
     if user_info['role'] != 'SUPERUSER': raise HTTPException(403)
-    return await get_all_users_async()
+    c_id = int(constituency) if constituency and str(constituency).isdigit() else None
+    l_id = int(lb) if lb and str(lb).isdigit() else None
+    b_id = int(booth) if booth and str(booth).isdigit() else None
+    # Without page the full list is returned, as before
+    return await get_all_users_async(page, min(max(page_size, 1), 500), role, c_id, l_id, b_id, search)
 
 @app.post("/api/admin/create-user")
 async def admin_create_user(data: dict, user_info=Depends(get_current_user)):
@@ -407,7 +423,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
 async def get_stats(constituency: str = None, booth: str = None, user_info=Depends(get_current_user)):
     c_id = int(constituency) if constituency and str(constituency).isdigit() else None
     b_id = int(booth) if booth and str(booth).isdigit() else None
-    return await get_stats_async(user_info['username'], c_id, b_id)
+    return await get_stats_async(user_info['profile'], c_id, b_id)
 
 @app.get("/api/voters")
 async def list_voters(
@@ -416,6 +432,8 @@ async def list_voters(
     gender: str = None, age_from: str = None, age_to: str = None,
     leaning: str = None,
     page_size: int = 50,
+    cursor: str = None,
+    count_mode: str = 'exact',
     user_info=Depends(get_current_user)
 ):
     c_id = int(constituency) if constituency and str(constituency).isdigit() else None
@@ -423,7 +441,13 @@ async def list_voters(
     b_id = int(booth) if booth and str(booth).isdigit() else None
     af = int(age_from) if age_from and str(age_from).isdigit() else None
     at = int(age_to) if age_to and str(age_to).isdigit() else None
-    return await get_voters_async(user_info['username'], search, page, page_size, c_id, l_id, b_id, gender, af, at, leaning)
+    # cursor="" starts keyset pagination; follow next_cursor from there
+    try:
+        data = await get_voters_async(user_info['profile'], search, page, page_size, c_id, l_id, b_id, gender, af, at, leaning, cursor, count_mode)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    # Results are plain JSON types already: skip jsonable_encoder and render with orjson
+    return FastJSONResponse(data)
 
 @app.get("/api/export-voters")
 async def export_voters(
@@ -431,33 +455,46 @@ async def export_voters(
     constituency: str = None, lb: str = None, booth: str = None,
     gender: str = None, age_from: str = None, age_to: str = None,
     leaning: str = None,
+    format: str = 'csv',
+    gzip: bool = False,
     user_info=Depends(get_current_user)
 ):
     # Check download permission (BOOTH_AGENT and ZONE_COMMANDER cannot download by default)
     if not user_info.get('can_download', False):
         raise HTTPException(403, "You do not have permission to export data")
+    if format not in ('csv', 'xlsx'):
+        raise HTTPException(400, "Invalid export format (expected csv or xlsx)")
     
     c_id = int(constituency) if constituency and str(constituency).isdigit() else None
     l_id = int(lb) if lb and str(lb).isdigit() else None
     b_id = int(booth) if booth and str(booth).isdigit() else None
     af = int(age_from) if age_from and str(age_from).isdigit() else None
     at = int(age_to) if age_to and str(age_to).isdigit() else None
-    
-    data = await get_voters_async(user_info['username'], search, None, 0, c_id, l_id, b_id, gender, af, at, leaning)
-    results = data['results']
-    
-    import csv, io
+    filters = dict(search=search, constituency_id=c_id, lb_id=l_id, booth_id=b_id,
+                   gender=gender, age_from=af, age_to=at, leaning=leaning)
+    _, media_type, ext = encode_export(VOTER_LIST_KEYS, (), format, gzip)
+    # Each export holds a thread and a connection for its whole duration
+    release = try_acquire('export')
+    if release is None:
+        raise HTTPException(429, "Too many exports in progress, please retry shortly")
+
+    def produce():
+        # Runs on the producer thread: the server-side cursor never changes threads
+        rows = iter_voter_export(user_info['profile'], **filters)
+        return encode_export(VOTER_LIST_KEYS, rows, format, gzip)[0]
+
+    from django.db import connection
+
+    def finish():
+        connection.close()
+        release()
+
     from fastapi.responses import StreamingResponse
-    output = io.StringIO()
-    if results:
-        writer = csv.DictWriter(output, fieldnames=results[0].keys())
-        writer.writeheader()
-        writer.writerows(results)
-    output.seek(0)
+    # Async-iterated, so a client disconnect closes it and frees the thread, connection and slot
     return StreamingResponse(
-        io.BytesIO(output.getvalue().encode("utf-8-sig")),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=voters_export.csv"}
+        ThreadedChunks(produce, on_exit=finish),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=voters_export.{ext}"}
     )
 
 @app.post("/api/edit-voter/{voter_id}")
@@ -500,20 +537,59 @@ async def cancel_batch(batch_id: str, user_info=Depends(get_current_user)):
     return {"success": True, "message": "Batch cancellation requested"}
 
 @app.post("/api/save-to-db")
-async def save_to_db(constituency: str, lgb_type: str, lgb_name: str, b_num: str, batch_id: str, ps_no: str = "", ps_name: str = "", user_info=Depends(get_current_user)):
+async def save_to_db(constituency: str, lgb_type: str, lgb_name: str, b_num: str, batch_id: str, ps_no: str = "", ps_name: str = "", revise: bool = False, revision_mode: str = None, dry_run: bool = False, user_info=Depends(get_current_user)):
     if batch_id not in active_batches: raise HTTPException(404, "Batch not found")
     results = active_batches[batch_id]['results']
+    if revise:
+        # Revised roll for an existing booth: diff and upsert, campaign data is kept
+        # No default: 'full' deletes voters missing from the roll, so the caller must choose
+        if revision_mode not in ('full', 'supplementary'):
+            raise HTTPException(400, "revise requires revision_mode=full or revision_mode=supplementary")
+        return await revise_booth_data_async(results, constituency, active_batches[batch_id]['filename'],
+                                             booth_number=b_num, user_id=user_info['id'],
+                                             mode=revision_mode, dry_run=dry_run)
     # Pass user_id to track who uploaded this batch (for OPERATOR role filtering)
     success, msg = await save_booth_data_async(constituency, lgb_type, lgb_name, b_num, results, active_batches[batch_id]['filename'], ps_no, ps_name, user_info['id'])
     return {"success": success, "message": msg}
 
+@app.post("/api/import-roll")
+async def import_roll(file: UploadFile = File(...), constituency: str = "", lgb_type: str = "PANCHAYAT", lgb_name: str = "", b_num: str = None, ps_no: str = "", ps_name: str = "", mapping: str = None, revise: bool = False, revision_mode: str = None, dry_run: bool = False, user_info=Depends(get_current_user)):
+    """
+    Structured (CSV/XLSX) roll import, no OCR. mapping: optional JSON {"Full Name": "Header", ...}
+    revise=true applies the file to existing booths instead (see revise_voter_records).
+    """
+    if not user_info.get('can_upload', False):
+        raise HTTPException(403, "You do not have permission to upload rolls")
+    if not constituency or (not lgb_name and not revise):
+        raise HTTPException(400, "constituency and lgb_name are required")
+    if revise and revision_mode not in ('full', 'supplementary'):
+        raise HTTPException(400, "revise requires revision_mode=full or revision_mode=supplementary")
+    suffix = Path(file.filename or "").suffix.lower()
+    if suffix not in ('.csv', '.xlsx'):
+        raise HTTPException(400, "Unsupported file type (expected .csv or .xlsx)")
+    try:
+        column_map = json.loads(mapping) if mapping else None
+    except ValueError:
+        column_map = []
+    if column_map is not None and not isinstance(column_map, dict):
+        raise HTTPException(400, "mapping must be a JSON object")
+
+    f_path = UPLOAD_DIR / f"{str(uuid.uuid4())[:8]}_roll{suffix}"
+    with f_path.open("wb") as b: shutil.copyfileobj(file.file, b)
+    try:
+        return await import_roll_async(str(f_path), file.filename, column_map, constituency, lgb_type, lgb_name,
+                                       b_num or None, ps_no, ps_name, user_info['id'],
+                                       revision_mode if revise else None, dry_run)
+    finally:
+        f_path.unlink(missing_ok=True)
+
 # ----------------------------------------------------------------
 # COMMUNICATION SYSTEM ENDPOINTS
 # ----------------------------------------------------------------
 
 @app.get("/api/comm/stats")
 async def get_comm_stats_api(user_info=Depends(get_current_user)):
-    return await get_comm_stats_async(user_info['username'])
+    return await get_comm_stats_async(user_info['profile'])
 
 @app.get("/api/comm/templates")
 async def get_templates_api(user_info=Depends(get_current_user)):
@@ -527,28 +603,27 @@ async def create_template_api(data: dict, user_info=Depends(get_current_user)):
 @app.post("/api/comm/send")
 async def send_comm_api(data: dict, user_info=Depends(get_current_user)):
     # Check if user has permission to broadcast
-    return await send_broadcast_async(user_info['username'], data['voter_ids'], data['template_id'])
+    return await send_broadcast_async(user_info['profile'], data['voter_ids'], data['template_id'])
 
 @app.get("/api/download-csv/{batch_id}")
-async def download_csv(batch_id: str, user_info=Depends(get_current_user)):
+async def download_csv(batch_id: str, format: str = 'csv', gzip: bool = False, user_info=Depends(get_current_user)):
     if not user_info.get('can_download', False):
         raise HTTPException(403, "You do not have permission to download reports.")
         
     if batch_id not in active_batches: raise HTTPException(404)
+    if format not in ('csv', 'xlsx'):
+        raise HTTPException(400, "Invalid export format (expected csv or xlsx)")
     results = active_batches[batch_id]['results']
     
-    import csv, io
     from fastapi.responses import StreamingResponse
-    output = io.StringIO()
-    if results:
-        writer = csv.DictWriter(output, fieldnames=results[0].keys())
-        writer.writeheader()
-        writer.writerows(results)
-    output.seek(0)
-    filename = f"export_{batch_id}.csv"
+    header = list(results[0].keys()) if results else []
+    # Rows are encoded chunk by chunk straight from the batch results (no text copy)
+    rows = ([row.get(key) for key in header] for row in results)
+    chunks, media_type, ext = encode_export(header, rows, format, gzip)
+    filename = f"export_{batch_id}.{ext}"
     return StreamingResponse(
-        io.BytesIO(output.getvalue().encode("utf-8-sig")),
-        media_type="text/csv",
+        chunks,
+        media_type=media_type,
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
 
@@ -649,6 +724,8 @@ async def get_system_health(user_info=Depends(get_current_user)):
         "disk_free_gb": round(free / (1024**3), 2),
         "memory_usage_percent": memory.percent,
         "active_batches": len(active_batches),
+        "db_executor": db_executor_stats(),
+        "db_pool": pool_stats(),
         "uptime_start": datetime.utcnow().isoformat()
     }
 
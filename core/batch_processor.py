@@ -4,14 +4,61 @@ import json
 import logging
 import re
 from core.ocr_engine import OCREngine
-from core.parser import VoterParser
+from core.parser import VoterParser, CompiledVoterParser
 from core.malayalam_normalizer import normalize_malayalam
 # AI Integration disabled for now
 
+# Look-alike characters OCR reads in place of digits
+AGE_LOOKALIKES = {'B': '8', 'O': '0', 'S': '5', 'G': '6', 'I': '1', 'L': '1', 'Z': '2', 'A': '4'}
+EPIC_DIGIT_LOOKALIKES = {'O': '0', 'U': '0', 'Q': '0', 'D': '0', 'I': '1', 'L': '1', 'Z': '2', 'S': '5', 'B': '8', 'G': '6', 'A': '4'}
+EPIC_PATTERN = re.compile(r'^[A-Z]{3}[0-9]{7}$')
+
+# Sacrosanct Fields: Full Name, Age, Gender, EPIC_ID
+# Missing fields in Relation/House are still flagged, but noise is gone.
+CRITICAL_FIELDS = ["Full Name", "Relation Name", "EPIC_ID", "Age", "Gender"]
+MALAYALAM_FIELDS = ["Full Name", "Relation Name", "House Name"]
+
+
+def heal_age(value):
+    """If Age is a character that looks like a number, force it to be numeric"""
+    value = str(value)
+    if value == "N/A" or value.isdigit():
+        return value
+    healed = ""
+    for char in value:
+        if char.isdigit(): healed += char
+        elif char.upper() in AGE_LOOKALIKES: healed += AGE_LOOKALIKES[char.upper()]
+    return healed or value
+
+
+def heal_epic(raw):
+    """Strict 10-char EPIC: keep the first 10 alphanumerics, map letters in the digit part to look-alike digits"""
+    clean_epic = re.sub(r'[^A-Z0-9]', '', str(raw).upper())[:10]
+    if len(clean_epic) != 10:
+        return clean_epic
+    prefix, suffix = clean_epic[:3], clean_epic[3:]
+    return prefix + "".join(EPIC_DIGIT_LOOKALIKES.get(char, char) if char.isalpha() else char for char in suffix)
+
+
+def integrity_flags(parsed_info):
+    """Missing critical fields and EPIC pattern violations for one parsed record"""
+    flags = []
+    for field in CRITICAL_FIELDS:
+        val = str(parsed_info.get(field, "N/A"))
+        if val == "N/A" or val.strip() == "":
+            flags.append(f"Missing {field}")
+
+    epic_val = str(parsed_info.get("EPIC_ID", "")).strip()
+    if not EPIC_PATTERN.match(epic_val):
+        flags.append(f"Invalid EPIC Pattern (Captured: {epic_val})")
+    return flags
+
 class BatchProcessor:
-    def __init__(self, tesseract_cmd=None):
+    def __init__(self, tesseract_cmd=None, parser_mode=None):
         self.engine = OCREngine(tesseract_cmd=tesseract_cmd)
-        self.parser = VoterParser()
+        # 'compiled' (default) gives identical output to 'legacy' - see scripts/benchmark_parser.py
+        mode = parser_mode or os.getenv('PARSER_MODE', 'compiled')
+        self.parser = VoterParser() if mode == 'legacy' else CompiledVoterParser()
         self.results = []
 
     def process_box(self, img_path, expected_serial):
@@ -40,46 +87,16 @@ class BatchProcessor:
         parsed_info["Serial_OCR"] = serial_digits[-1] if serial_digits else ""
         
         # --- AGE HEALING (Decision Logic) ---
-        # If Age is a character that looks like a number, force it to be numeric
-        age_val = str(parsed_info.get("Age", "N/A"))
-        if age_val != "N/A" and not age_val.isdigit():
-            # Decision map for Age look-alikes
-            age_map = {'B': '8', 'O': '0', 'S': '5', 'G': '6', 'I': '1', 'L': '1', 'Z': '2', 'A': '4'}
-            healed_age = ""
-            for char in age_val:
-                if char.isdigit(): healed_age += char
-                elif char.upper() in age_map: healed_age += age_map[char.upper()]
-            if healed_age:
-                parsed_info["Age"] = healed_age
+        if "Age" in parsed_info:
+            parsed_info["Age"] = heal_age(parsed_info["Age"])
 
         # --- EPIC HEALING & TRUNCATION ---
-        # 1. Take only first 10 alphanumeric characters (Strict 10-char limit)
-        raw_epic = re.sub(r'[^A-Z0-9]', '', raw_data["B_EPIC"].upper())
-        clean_epic = raw_epic[:10]
-        
-        # 2. Heuristic Healing (Decision Logic)
-        if len(clean_epic) == 10:
-            prefix = clean_epic[:3]
-            suffix = clean_epic[3:]
-            
-            # Heal digits (4th to 10th char): Map letters to look-alike numbers
-            num_map = {'O': '0', 'U': '0', 'Q': '0', 'D': '0', 'I': '1', 'L': '1', 'Z': '2', 'S': '5', 'B': '8', 'G': '6', 'A': '4'}
-            healed_suffix = ""
-            for char in suffix:
-                if char.isalpha() and char in num_map:
-                    healed_suffix += num_map[char]
-                else:
-                    healed_suffix += char
-            
-            parsed_info["EPIC_ID"] = prefix + healed_suffix
-        else:
-            parsed_info["EPIC_ID"] = clean_epic
+        parsed_info["EPIC_ID"] = heal_epic(raw_data["B_EPIC"])
 
         parsed_info["Image_Path"] = img_path
         parsed_info["Filename"] = os.path.basename(img_path)
 
         # 3. Integrity Shield (REFINED: Silent Pruning & 10-Char Strictness)
-        flags = []
         is_healed = False
         
         # --- Serial Number Healing ---
@@ -95,8 +112,7 @@ class BatchProcessor:
         # --- SILENT PRUNING (Malayalam Fields) ---
         # Rule: Automatically prune everything except Malayalam, Space, and Dot (.)
         # Name is sacrosanct, but still pruned. Relation/House are relaxed.
-        mal_fields = ["Full Name", "Relation Name", "House Name"]
-        for field in mal_fields:
+        for field in MALAYALAM_FIELDS:
             val = str(parsed_info.get(field, ""))
             if not val or val == "N/A": continue
             
@@ -109,19 +125,7 @@ class BatchProcessor:
             parsed_info[field] = pruned_val
 
         # --- Data Integrity Checks ---
-        # Sacrosanct Fields: Full Name, Age, Gender, EPIC_ID
-        # Missing fields in Relation/House are still flagged, but noise is gone.
-        critical_fields = ["Full Name", "Relation Name", "EPIC_ID", "Age", "Gender"]
-        
-        for field in critical_fields:
-            val = str(parsed_info.get(field, "N/A"))
-            if val == "N/A" or val.strip() == "":
-                flags.append(f"Missing {field}")
-
-        # --- EPIC Strict Pattern Validation ---
-        epic_val = str(parsed_info.get("EPIC_ID", "")).strip()
-        if not re.match(r'^[A-Z]{3}[0-9]{7}$', epic_val):
-            flags.append(f"Invalid EPIC Pattern (Captured: {epic_val})")
+        flags = integrity_flags(parsed_info)
 
         # Final Status determination
         if flags:
@@ -0,0 +1,129 @@
+"""
+Bulk Ingest
+Fast insert path for whole booths / constituencies of new voters.
+
+On PostgreSQL rows are streamed with COPY into a temporary staging table (no
+indexes, no constraints) and moved into the voter table with one
+INSERT ... SELECT, so neither the statement nor its parameter list grows with
+the batch. Other backends fall back to bulk_create in fixed-size batches.
+
+Callers build unsaved Voter instances exactly as for bulk_create (booth,
+constituency and local_body set); values go through each field's own
+get_db_prep_save, so coded fields, auto_now timestamps and defaults behave the
+same on both paths.
+"""
+
+import io
+import time
+from itertools import islice
+
+from django.db import connection, transaction
+
+from core_db.models import Voter
+
+METHODS = ('auto', 'copy', 'bulk_create')
+DEFAULT_BATCH_SIZE = 5000
+BULK_CREATE_BATCH_SIZE = 1000
+
+STAGE_TABLE = 'voter_ingest_stage'
+
+
+def _copy_value(value):
+    """Text-format COPY encoding: \\N for NULL, backslash-escape the delimiters."""
+    if value is None:
+        return '\\N'
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+def _batches(iterable, size):
+    it = iter(iterable)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _ingest_fields():
+    return [f for f in Voter._meta.concrete_fields if not f.primary_key]
+
+
+def _copy_from(cursor, sql, buf):
+    raw = cursor.cursor
+    if hasattr(raw, 'copy_expert'):  # psycopg2
+        raw.copy_expert(sql, buf)
+    else:  # psycopg 3
+        with raw.copy(sql) as copy:
+            copy.write(buf.getvalue())
+
+
+def supports_copy():
+    return connection.vendor == 'postgresql'
+
+
+def _copy_voters(voters, batch_size):
+    fields = _ingest_fields()
+    qn = connection.ops.quote_name
+    table = qn(Voter._meta.db_table)
+    columns = ', '.join(qn(f.column) for f in fields)
+    written = 0
+    with connection.cursor() as cursor:
+        # Only the copied columns, without constraints: LIKE would keep "id NOT NULL"
+        # but not its identity default, and the COPY leaves id out
+        cursor.execute(f"CREATE TEMP TABLE {STAGE_TABLE} ON COMMIT DROP AS SELECT {columns} FROM {table} WITH NO DATA")
+        for batch in _batches(voters, batch_size):
+            buf = io.StringIO()
+            for voter in batch:
+                values = [f.get_db_prep_save(f.pre_save(voter, True), connection) for f in fields]
+                buf.write('\t'.join(_copy_value(v) for v in values) + '\n')
+            buf.seek(0)
+            _copy_from(cursor, f"COPY {STAGE_TABLE} ({columns}) FROM STDIN", buf)
+            written += len(batch)
+        # One set-based move, in roll order so a booth's rows sit together on disk
+        cursor.execute(
+            f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {STAGE_TABLE} "
+            f"ORDER BY {qn('booth_id')}, {qn('serial_no')}"
+        )
+        # Only after success: on failure the transaction is aborted and the
+        # savepoint rollback in ingest_voters() removes the table anyway
+        cursor.execute(f"DROP TABLE {STAGE_TABLE}")
+    return written
+
+
+def _bulk_create_voters(voters, batch_size):
+    written = 0
+    for batch in _batches(voters, batch_size):
+        Voter.objects.bulk_create(batch, batch_size=BULK_CREATE_BATCH_SIZE)
+        written += len(batch)
+    return written
+
+
+def ingest_voters(voters, method='auto', batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Inserts an iterable of unsaved Voter instances; rows are consumed batch by batch.
+    Runs in (or as) one transaction. Primary keys are not set on the instances.
+
+    Returns:
+        dict: {"rows", "seconds", "rows_per_sec", "method"}
+    """
+    if method not in METHODS:
+        raise ValueError(f"Invalid ingest method (expected one of {', '.join(METHODS)})")
+    if method == 'auto':
+        method = 'copy' if supports_copy() else 'bulk_create'
+    elif method == 'copy' and not supports_copy():
+        raise ValueError("COPY ingest needs PostgreSQL")
+
+    start = time.perf_counter()
+    with transaction.atomic():
+        if method == 'copy':
+            rows = _copy_voters(voters, batch_size)
+        else:
+            rows = _bulk_create_voters(voters, batch_size)
+    seconds = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(rows / seconds) if seconds > 0 else rows,
+        "method": method,
+    }
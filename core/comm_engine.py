@@ -1,7 +1,8 @@
 import time
 import random
 import logging
-from .db_bridge import PROJECT_PATH
+from .db_bridge import PROJECT_PATH, stats_scope, bump_stats_versions
+from . import stats_cache
 import sys
 import os
 
@@ -11,6 +12,7 @@ if PROJECT_PATH not in sys.path:
 
 from core_db.models import CommunicationLog, Voter, MessageTemplate
 from django.db import transaction
+from django.db.models import Count, Q
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +30,7 @@ class CommunicationEngine:
         """
         template = MessageTemplate.objects.get(id=template_id)
         results = {"success": 0, "failed": 0, "logs": []}
+        logged_booths, logged_owners = set(), set()
         
         for vid in voter_ids:
             try:
@@ -55,6 +58,8 @@ class CommunicationEngine:
                     sent_by=sent_by_user,
                     response_metadata={"simulated": True}
                 )
+                logged_booths.add(voter.booth_id)
+                logged_owners.add(voter.created_by_id)
                 
                 if success:
                     results["success"] += 1
@@ -64,7 +69,9 @@ class CommunicationEngine:
             except Exception as e:
                 logger.error(f"Failed to send to voter {vid}: {str(e)}")
                 results["failed"] += 1
-                
+
+        if logged_booths:
+            bump_stats_versions('comm', logged_booths, logged_owners)
         return results
 
     @staticmethod
@@ -89,19 +96,34 @@ class CommunicationEngine:
         return True
 
     @staticmethod
-    def get_comm_stats(user_profile):
+    def get_comm_stats(user_profile, use_cache=True):
         """Get summary of communications within user scope"""
+        if use_cache:
+            return stats_cache.cached(
+                'comm', 'comm', stats_scope(user_profile), {},
+                lambda: CommunicationEngine.get_comm_stats(user_profile, use_cache=False),
+            )
+
         voters = user_profile.get_accessible_voters()
         logs = CommunicationLog.objects.filter(voter__in=voters)
-        
+        counts = logs.aggregate(
+            total=Count('id'),
+            wa=Count('id', filter=Q(msg_type='WA')),
+            sms=Count('id', filter=Q(msg_type='SMS')),
+            call=Count('id', filter=Q(msg_type='CALL')),
+            delivered=Count('id', filter=Q(status='DELIVERED')),
+            sent=Count('id', filter=Q(status='SENT')),
+            failed=Count('id', filter=Q(status='FAILED')),
+        )
+
         return {
-            "total_sent": logs.count(),
-            "whatsapp": logs.filter(msg_type='WA').count(),
-            "sms": logs.filter(msg_type='SMS').count(),
-            "calls": logs.filter(msg_type='CALL').count(),
+            "total_sent": counts['total'],
+            "whatsapp": counts['wa'],
+            "sms": counts['sms'],
+            "calls": counts['call'],
             "status_dist": {
-                "delivered": logs.filter(status='DELIVERED').count(),
-                "sent": logs.filter(status='SENT').count(),
-                "failed": logs.filter(status='FAILED').count(),
+                "delivered": counts['delivered'],
+                "sent": counts['sent'],
+                "failed": counts['failed'],
             }
         }
@@ -1,10 +1,15 @@
 
 import os
+import re
+import json
+import base64
+import hashlib
+import logging
 import django
 import sys
 from django.conf import settings
-from django.db import transaction
-from django.db.models import Q
+from django.db import connection, transaction
+from django.db.models import Prefetch, Q, Sum
 
 # Setup Django Environment for standalone script usage
 # Correctly resolve the project root relative to this file
@@ -18,7 +23,12 @@ if PROJECT_PATH not in sys.path:
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'voter_vault.settings')
 django.setup()
 
-from core_db.models import Voter, Booth, Constituency, LocalBody, PoliticalParty, UserProfile
+from core_db.models import Voter, Booth, BoothStats, Constituency, LocalBody, PoliticalParty, UserProfile
+from core import stats_cache, profile_cache
+from core.bulk_ingest import ingest_voters
+from core.transliteration import phonetic_key, voter_phonetic_key
+
+logger = logging.getLogger(__name__)
 
 def get_parties():
     """Fetch list of active political parties"""
@@ -45,7 +55,48 @@ def get_local_bodies(constituency_name=None):
         qs = qs.filter(constituency__name=constituency_name)
     return list(qs.values('id', 'name', 'body_type'))
 
-def save_booth_data(constituency_name, local_body_type, local_body_name, booth_number, voter_data_list, original_filename, polling_station_no="", polling_station_name="", user_id=None):
+def _uploader(user_id):
+    """User recorded as created_by for an import (None if unknown)"""
+    from django.contrib.auth.models import User
+    if not user_id:
+        return None
+    return User.objects.filter(id=user_id).first()
+
+def _voter_from_row(row, booth, created_by, source_file, status='VERIFIED'):
+    """Unsaved Voter for one pipeline record ("Full Name", "EPIC_ID", ... as produced by BatchProcessor)"""
+    # Sanitize Integer Fields
+    try:
+        age_val = int(row.get('Age')) if str(row.get('Age')).isdigit() else None
+    except ValueError:
+        age_val = None
+
+    try:
+        serial_val = int(row.get('Serial_OCR')) if str(row.get('Serial_OCR')).isdigit() else 0
+    except ValueError:
+        serial_val = 0
+
+    full_name = row.get('Full Name', 'N/A')
+    house_name = row.get('House Name', '')
+    return Voter(
+        booth=booth,
+        constituency_id=booth.constituency_id,
+        local_body_id=booth.local_body_id,
+        serial_no=serial_val,
+        epic_id=row.get('EPIC_ID', 'UNK'),
+        full_name=full_name,
+        relation_type=row.get('Relation Type', ''),
+        relation_name=row.get('Relation Name', ''),
+        house_no=row.get('House Number', ''),
+        house_name=house_name,
+        phonetic_key=voter_phonetic_key(full_name, house_name),
+        age=age_val,
+        gender=Voter.gender.field.canonical(row.get('Gender')) or '',
+        source_file=source_file,
+        status=status,
+        created_by=created_by  # Track who uploaded this batch
+    )
+
+def save_booth_data(constituency_name, local_body_type, local_body_name, booth_number, voter_data_list, original_filename, polling_station_no="", polling_station_name="", user_id=None, ingest_method='auto'):
     """
     Saves a list of voters to the database with Local Body categorization.
     
@@ -59,6 +110,7 @@ def save_booth_data(constituency_name, local_body_type, local_body_name, booth_n
         polling_station_no (str): Optional Polling Station Number
         polling_station_name (str): Optional Polling Station Name
         user_id (int): Optional ID of the user who uploaded this batch
+        ingest_method (str): 'auto', 'copy' or 'bulk_create' (see core/bulk_ingest.py)
     
     Returns:
         (bool, str): (Success status, Message)
@@ -77,7 +129,7 @@ def save_booth_data(constituency_name, local_body_type, local_body_name, booth_n
 
             # 3. Check for Duplicate Booth
             if Booth.objects.filter(constituency=constituency, number=booth_number).exists():
-                return False, f"Booth {booth_number} already exists in {constituency_name}. Please delete it from Admin before re-uploading."
+                return False, f"Booth {booth_number} already exists in {constituency_name}. Use revision mode to apply a revised roll to it."
 
             # 4. Create Booth
             booth = Booth.objects.create(
@@ -88,268 +140,719 @@ def save_booth_data(constituency_name, local_body_type, local_body_name, booth_n
                 polling_station_name=polling_station_name,
                 name=polling_station_name or f"Booth {booth_number}"
             )
+            refresh_booth_scopes([booth])
+            bump_location_versions(constituency.id, local_body.id, booth.id)
             
             # Get User object if user_id provided
-            from django.contrib.auth.models import User
-            created_by_user = None
-            if user_id:
-                try:
-                    created_by_user = User.objects.get(id=user_id)
-                except User.DoesNotExist:
-                    pass
+            created_by_user = _uploader(user_id)
             
             # 4. Prepare Voter Objects
-            voters_to_create = []
-            for row in voter_data_list:
-                # Sanitize Integer Fields
-                try:
-                    age_val = int(row.get('Age')) if str(row.get('Age')).isdigit() else None
-                except:
-                    age_val = None
-                    
-                try:
-                    serial_val = int(row.get('Serial_OCR')) if str(row.get('Serial_OCR')).isdigit() else 0
-                except:
-                    serial_val = 0
-
-                voter = Voter(
-                    booth=booth,
-                    serial_no=serial_val,
-                    epic_id=row.get('EPIC_ID', 'UNK'),
-                    full_name=row.get('Full Name', 'N/A'),
-                    relation_type=row.get('Relation Type', ''),
-                    relation_name=row.get('Relation Name', ''),
-                    house_no=row.get('House Number', ''),
-                    house_name=row.get('House Name', ''),
-                    age=age_val,
-                    gender=row.get('Gender', ''),
-                    source_file=original_filename,
-                    status='VERIFIED',
-                    created_by=created_by_user  # Track who uploaded this batch
-                )
-                voters_to_create.append(voter)
+            voters_to_create = [
+                _voter_from_row(row, booth, created_by_user, original_filename) for row in voter_data_list
+            ]
             
-            # 5. Bulk Insert (Fast)
-            Voter.objects.bulk_create(voters_to_create)
+            # 5. Bulk Insert (COPY through a staging table on PostgreSQL)
+            ingest = ingest_voters(voters_to_create, method=ingest_method)
+
+            # 6. Booth rollup for the dashboards (new booth, so counts are just these voters)
+            BoothStats.objects.create(booth=booth, **BoothStats.sum_counters(voters_to_create))
+            bump_stats_versions('voters', [booth.id], [user_id])
             
-            return True, f"Successfully saved {len(voters_to_create)} voters to Booth {booth_number} ({constituency_name})"
+            return True, (f"Successfully saved {ingest['rows']} voters to Booth {booth_number} ({constituency_name}) "
+                          f"in {ingest['seconds']:.2f}s, {ingest['rows_per_sec']:,} rows/sec")
 
     except Exception as e:
         return False, f"Database Error: {str(e)}"
 
-def get_dashboard_stats(user_profile, constituency_id=None, booth_id=None):
-    """Fetch aggregate stats for the dashboard based on user scope and filters"""
-    voters = user_profile.get_accessible_voters()
-    
-    if constituency_id:
-        voters = voters.filter(booth__constituency_id=constituency_id)
-    if booth_id:
-        voters = voters.filter(booth_id=booth_id)
-        
-    total = voters.count()
-    male = voters.filter(gender__iexact='Male').count()
-    female = voters.filter(gender__iexact='Female').count()
-    
-    # Campaign Intelligence Stats
-    sentiment = {
-        "UDF": voters.filter(voter_leaning='UDF').count(),
-        "LDF": voters.filter(voter_leaning='LDF').count(),
-        "NDA": voters.filter(voter_leaning='NDA').count(),
-        "Neutral": voters.filter(voter_leaning='NEUTRAL').count(),
-    }
-    
-    location = {
-        "local": voters.filter(current_location='LOCAL').count(),
-        "abroad": voters.filter(current_location='ABROAD').count(),
-        "state": voters.filter(current_location='STATE').count(),
-        "district": voters.filter(current_location='DISTRICT').count(),
-    }
+def import_voter_records(records, constituency_name, local_body_type, local_body_name, original_filename,
+                         booth_number=None, polling_station_no="", polling_station_name="", user_id=None,
+                         ingest_method='auto'):
+    """
+    Saves structured roll records (see core/structured_import.py) in one transaction.
+    Records are streamed into the bulk ingest layer as they are read; a record's
+    'Booth' value (or booth_number when the file has no booth column) picks its
+    booth, which must not exist yet. Records that failed validation are stored
+    as FLAGGED for review.
 
-    outreach = {
-        "with_phone": voters.filter(phone_no__isnull=False).exclude(phone_no='').count(),
-        "total": total
-    }
-    
-    # Age Distribution
-    age_dist = {
-        "18_25": voters.filter(age__gte=18, age__lte=25).count(),
-        "26_35": voters.filter(age__gte=26, age__lte=35).count(),
-        "36_45": voters.filter(age__gte=36, age__lte=45).count(),
-        "46_60": voters.filter(age__gte=46, age__lte=60).count(),
-        "60_plus": voters.filter(age__gt=60).count(),
+    Returns:
+        dict: success, message, rows, flagged, booths, rows_per_sec and the first flagged lines
+    """
+    summary = {"rows": 0, "flagged": 0, "booths": [], "flag_samples": []}
+    try:
+        with transaction.atomic():
+            constituency, _ = Constituency.objects.get_or_create(name=constituency_name)
+            local_body, _ = LocalBody.objects.get_or_create(
+                constituency=constituency,
+                name=local_body_name,
+                body_type=local_body_type
+            )
+            created_by_user = _uploader(user_id)
+            booths = {}
+            counters = {}
+
+            def booth_for(number):
+                number = str(number or booth_number or '').strip()
+                if not number:
+                    raise ValueError("Record without a booth: add a booth column or pass booth_number")
+                if number not in booths:
+                    if Booth.objects.filter(constituency=constituency, number=number).exists():
+                        raise ValueError(f"Booth {number} already exists in {constituency_name}. Use revision mode to apply a revised roll to it.")
+                    single = not booth_number or number == str(booth_number)
+                    booths[number] = Booth.objects.create(
+                        constituency=constituency,
+                        local_body=local_body,
+                        number=number,
+                        polling_station_no=polling_station_no if single else "",
+                        polling_station_name=polling_station_name if single else "",
+                        name=(polling_station_name if single else "") or f"Booth {number}"
+                    )
+                    counters[booths[number].id] = dict.fromkeys(BoothStats.FIELDS, 0)
+                return booths[number]
+
+            def voters():
+                for record in records:
+                    booth = booth_for(record.get('Booth'))
+                    flagged = record.get('Status', '').startswith('⚠️')
+                    voter = _voter_from_row(record, booth, created_by_user, original_filename,
+                                            status='FLAGGED' if flagged else 'VERIFIED')
+                    totals = counters[booth.id]
+                    for name, value in BoothStats.counters_for(voter).items():
+                        totals[name] += value
+                    summary["rows"] += 1
+                    if flagged:
+                        summary["flagged"] += 1
+                        if len(summary["flag_samples"]) < 20:
+                            summary["flag_samples"].append({"line": record.get('Line'), "flags": record.get('Flags')})
+                    yield voter
+
+            ingest = ingest_voters(voters(), method=ingest_method)
+
+            BoothStats.objects.bulk_create([BoothStats(booth_id=b_id, **totals) for b_id, totals in counters.items()])
+            refresh_booth_scopes(list(booths.values()))
+            for booth in booths.values():
+                bump_location_versions(constituency.id, local_body.id, booth.id)
+            bump_stats_versions('voters', [b.id for b in booths.values()], [user_id])
+
+        summary["booths"] = sorted(booths)
+        message = (f"Imported {ingest['rows']} voters into {len(booths)} booth(s) of {constituency_name} "
+                   f"in {ingest['seconds']:.2f}s, {ingest['rows_per_sec']:,} rows/sec ({summary['flagged']} flagged)")
+        return {"success": True, "message": message, **summary,
+                "seconds": ingest['seconds'], "rows_per_sec": ingest['rows_per_sec']}
+
+    except Exception as e:
+        return {"success": False, "message": f"Import Error: {str(e)}", **summary}
+
+# Roll columns a revision may change; campaign fields (phone, leaning, location,
+# probability) and created_by are never touched
+REVISION_FIELDS = ['serial_no', 'epic_id', 'full_name', 'relation_type', 'relation_name',
+                   'house_no', 'house_name', 'age', 'gender']
+REVISION_MODES = ('full', 'supplementary')
+_EPIC_RE = re.compile(r'^[A-Z]{3}[0-9]{7}$')
+
+def _is_deletion(record):
+    return str(record.get('Action', '')).strip().upper() in ('D', 'DEL', 'DELETE', 'DELETION', 'DELETED')
+
+def _match_revision(existing, incoming):
+    """
+    Pairs incoming Voters with existing rows: first by EPIC (valid and unique on
+    both sides), then by serial number. Returns ({incoming index: existing row}, counts).
+    """
+    def unique(keys):
+        seen = {}
+        for key in keys:
+            seen[key] = seen.get(key, 0) + 1
+        return {key for key, n in seen.items() if n == 1}
+
+    matches = {}
+    counts = {"epic": 0, "serial": 0}
+    epics_in = unique(v.epic_id for v in incoming if _EPIC_RE.match(v.epic_id or ''))
+    epics_existing = unique(row['epic_id'] for row in existing)
+    by_epic = {row['epic_id']: row for row in existing if row['epic_id'] in epics_existing}
+    for i, voter in enumerate(incoming):
+        row = by_epic.get(voter.epic_id) if voter.epic_id in epics_in else None
+        if row is not None:
+            matches[i] = row
+            counts["epic"] += 1
+
+    used = {row['id'] for row in matches.values()}
+    left = [row for row in existing if row['id'] not in used]
+    serials_left = unique(row['serial_no'] for row in left)
+    by_serial = {row['serial_no']: row for row in left if row['serial_no'] in serials_left}
+    serials_in = unique(v.serial_no for i, v in enumerate(incoming) if i not in matches)
+    for i, voter in enumerate(incoming):
+        if i in matches or voter.serial_no not in serials_in:
+            continue
+        row = by_serial.get(voter.serial_no)
+        # A serial match whose EPIC disagrees is a different person (re-numbered roll)
+        if row is not None and (not _EPIC_RE.match(row['epic_id'] or '') or not _EPIC_RE.match(voter.epic_id or '')
+                                or row['epic_id'] == voter.epic_id):
+            matches[i] = row
+            counts["serial"] += 1
+    return matches, counts
+
+def _revise_booth(booth, records, original_filename, created_by, mode, dry_run):
+    """Diffs one booth against its revision records; applies it unless dry_run. Returns the booth summary."""
+    existing = list(Voter.objects.filter(booth=booth).order_by().values('id', *REVISION_FIELDS))
+    deletions = [r for r in records if _is_deletion(r)]
+    upserts = [r for r in records if not _is_deletion(r)]
+    incoming = [
+        _voter_from_row(r, booth, created_by, original_filename,
+                        status='FLAGGED' if str(r.get('Status', '')).startswith('⚠️') else 'VERIFIED')
+        for r in upserts
+    ]
+    removed = [_voter_from_row(r, booth, created_by, original_filename) for r in deletions]
+
+    matches, matched_by = _match_revision(existing, incoming)
+    to_add, to_update, changes = [], [], []
+    for i, voter in enumerate(incoming):
+        row = matches.get(i)
+        if row is None:
+            to_add.append(voter)
+            continue
+        diff = {f: [row[f], getattr(voter, f)] for f in REVISION_FIELDS if row[f] != getattr(voter, f)}
+        if diff:
+            voter.id = row['id']
+            to_update.append(voter)
+            if len(changes) < 50:
+                changes.append({"id": row['id'], "epic_id": row['epic_id'], "serial_no": row['serial_no'], "fields": diff})
+
+    matched_ids = {row['id'] for row in matches.values()}
+    delete_rows = []
+    not_found = 0
+    if removed:
+        del_matches, _ = _match_revision([r for r in existing if r['id'] not in matched_ids], removed)
+        delete_rows = list(del_matches.values())
+        not_found = len(removed) - len(delete_rows)
+    if mode == 'full':
+        deleted_ids = {r['id'] for r in delete_rows}
+        delete_rows += [r for r in existing if r['id'] not in matched_ids and r['id'] not in deleted_ids]
+
+    summary = {
+        "booth": booth.number,
+        "existing": len(existing),
+        "added": len(to_add),
+        "updated": len(to_update),
+        "deleted": len(delete_rows),
+        "unchanged": len(matches) - len(to_update),
+        "matched_by_epic": matched_by["epic"],
+        "matched_by_serial": matched_by["serial"],
+        "deletions_not_found": not_found,
+        "changes": changes,
+        "deletions": [{"id": r['id'], "epic_id": r['epic_id'], "serial_no": r['serial_no'], "full_name": r['full_name']}
+                      for r in delete_rows[:50]],
     }
+    if dry_run:
+        return summary
+
+    if delete_rows:
+        Voter.objects.filter(id__in=[r['id'] for r in delete_rows]).delete()
+    if to_update:
+        from django.utils import timezone
+        now = timezone.now()
+        for voter in to_update:
+            voter.updated_at = now
+        Voter.objects.bulk_update(
+            to_update, REVISION_FIELDS + ['phonetic_key', 'source_file', 'status', 'updated_at'], batch_size=1000)
+    if to_add:
+        ingest_voters(to_add)
+    return summary
+
+def revise_voter_records(records, constituency_name, original_filename, booth_number=None, user_id=None,
+                         mode='full', dry_run=False):
+    """
+    Revision import: applies a revised or supplementary roll to existing booths
+    without deleting them, so the campaign data collected on voters survives.
+
+    Records (OCR results or structured rows) are matched to the booth's voters by
+    EPIC ID, then by serial number. Matched voters get only their roll fields
+    rewritten (REVISION_FIELDS), unmatched records are added, and records whose
+    'Action' is D are deleted. mode='full' treats the records as the whole new
+    roll and also deletes voters missing from it; 'supplementary' leaves them.
+    dry_run computes the same diff without writing.
+
+    Returns:
+        dict: success, message, totals and a per-booth diff summary
+    """
+    if mode not in REVISION_MODES:
+        return {"success": False, "message": f"Invalid revision mode (expected one of {', '.join(REVISION_MODES)})"}
+    try:
+        with transaction.atomic():
+            constituency = Constituency.objects.filter(name=constituency_name).first()
+            if constituency is None:
+                raise ValueError(f"Constituency {constituency_name} does not exist")
+            by_booth = {}
+            for record in records:
+                number = str(record.get('Booth') or booth_number or '').strip()
+                if not number:
+                    raise ValueError("Record without a booth: add a booth column or pass booth_number")
+                by_booth.setdefault(number, []).append(record)
 
-    # Tagging Progress (anyone with either leaning, location, or phone)
-    tagged = voters.filter(
-        Q(voter_leaning__isnull=False) | 
-        Q(current_location__isnull=False) | 
-        Q(phone_no__isnull=False)
-    ).exclude(
-        voter_leaning='', 
-        current_location='', 
-        phone_no=''
-    ).count()
+            booths = {b.number: b for b in Booth.objects.filter(constituency=constituency, number__in=list(by_booth))}
+            missing = sorted(set(by_booth) - set(booths))
+            if missing:
+                raise ValueError(f"Booth(s) {', '.join(missing)} do not exist in {constituency_name}; import them as new booths first")
+
+            created_by_user = _uploader(user_id)
+            summaries = [
+                _revise_booth(booths[number], booth_records, original_filename, created_by_user, mode, dry_run)
+                for number, booth_records in sorted(by_booth.items())
+            ]
+            totals = {key: sum(s[key] for s in summaries) for key in ('added', 'updated', 'deleted', 'unchanged')}
+
+            if not dry_run:
+                booth_ids = [b.id for b in booths.values()]
+                BoothStats.rebuild(booth_ids=booth_ids)
+                bump_stats_versions('voters', booth_ids, [user_id])
+
+        verb = "Would apply" if dry_run else "Applied"
+        message = (f"{verb} revision to {len(summaries)} booth(s) of {constituency_name}: "
+                   f"{totals['added']} added, {totals['updated']} updated, {totals['deleted']} deleted, "
+                   f"{totals['unchanged']} unchanged")
+        return {"success": True, "message": message, "dry_run": dry_run, "mode": mode, **totals, "booths": summaries}
+
+    except Exception as e:
+        return {"success": False, "message": f"Revision Error: {str(e)}"}
+
+def _format_dashboard_stats(counts):
+    """Shapes a BoothStats-style counter dict into the dashboard response"""
+    total = counts['total']
 
     return {
         "total": total,
-        "male": male,
-        "female": female,
-        "age_dist": age_dist,
-        "sentiment": sentiment,
-        "location": location,
-        "outreach": outreach,
-        "tagging_progress": tagged
+        "male": counts['male'],
+        "female": counts['female'],
+        # Age Distribution
+        "age_dist": {
+            "18_25": counts['age_18_25'],
+            "26_35": counts['age_26_35'],
+            "36_45": counts['age_36_45'],
+            "46_60": counts['age_46_60'],
+            "60_plus": counts['age_60_plus'],
+        },
+        # Campaign Intelligence Stats
+        "sentiment": {
+            "UDF": counts['udf'],
+            "LDF": counts['ldf'],
+            "NDA": counts['nda'],
+            "Neutral": counts['neutral'],
+        },
+        "location": {
+            "local": counts['loc_local'],
+            "abroad": counts['loc_abroad'],
+            "state": counts['loc_state'],
+            "district": counts['loc_district'],
+        },
+        "probability": {
+            "confirmed": counts['prob_confirmed'],
+            "likely": counts['prob_likely'],
+            "unlikely": counts['prob_unlikely'],
+            "out_of_station": counts['prob_out_of_station'],
+        },
+        "outreach": {
+            "with_phone": counts['with_phone'],
+            "total": total
+        },
+        # Tagging Progress (anyone with either leaning, location, or phone)
+        "tagging_progress": counts['tagged']
     }
 
-def get_voter_list(user_profile, search=None, page=1, page_size=50, constituency_id=None, lb_id=None, booth_id=None, gender=None, age_from=None, age_to=None, leaning=None):
-    """Fetch paginated voters with advanced filters"""
+def stats_scope(user_profile):
+    """Resolves a profile to the (role, level, ids) scope used by the stats cache"""
+    role = user_profile.role
+    if role in ('SUPERUSER', 'MANAGER'):
+        return (role, stats_cache.GLOBAL, [])
+    if role == 'OPERATOR':
+        return (role, stats_cache.USER, [user_profile.user_id])
+    if role == 'CONSTITUENCY_ADMIN':
+        return (role, stats_cache.CONSTITUENCY, list(user_profile.assigned_constituencies.values_list('id', flat=True)))
+    if role == 'LOCAL_BODY_HEAD':
+        return (role, stats_cache.LOCAL_BODY, list(user_profile.assigned_local_bodies.values_list('id', flat=True)))
+    if role in ('ZONE_COMMANDER', 'BOOTH_AGENT'):
+        return (role, stats_cache.BOOTH, list(user_profile.assigned_booths.values_list('id', flat=True)))
+    return (role, stats_cache.BOOTH, [])
+
+def bump_stats_versions(topic, booth_ids, user_ids=()):
+    """
+    Invalidates cached stats for every scope containing these booths, once the
+    current transaction commits (so no reader can cache pre-commit data under
+    the new version). topic: 'voters' or 'comm'.
+    """
+    booth_ids = set(booth_ids)
+    user_ids = set(user_ids)
+
+    def bump():
+        try:
+            booths = Booth.objects.filter(id__in=booth_ids).values_list('id', 'local_body_id', 'constituency_id')
+            stats_cache.bump(topic, booths=list(booths), user_ids=user_ids)
+        except Exception as e:
+            # The write already committed; cached entries still expire after the TTL
+            logger.warning(f"Stats cache invalidation failed: {e}")
+
+    transaction.on_commit(bump)
+
+def refresh_booth_scopes(booths):
+    """Re-resolves the scoped users that new or moved booths affect (see UserProfile.scope_booth_ids)"""
+    user_ids = UserProfile.refresh_scopes_for_booths(booths)
+    transaction.on_commit(lambda: [profile_cache.invalidate_user(uid) for uid in user_ids])
+
+def get_dashboard_stats(user_profile, constituency_id=None, booth_id=None, use_rollups=True, use_cache=True):
+    """
+    Fetch aggregate stats for the dashboard based on user scope and filters.
+    Booth-shaped scopes sum the BoothStats rollups; the OPERATOR scope (own
+    batches) or use_rollups=False counts Voter rows in a single scan.
+    Results are cached per scope until a write inside it (see stats_cache).
+    """
+    if use_cache and use_rollups:
+        return stats_cache.cached(
+            'dashboard', 'voters', stats_scope(user_profile),
+            {"constituency_id": constituency_id, "booth_id": booth_id},
+            lambda: get_dashboard_stats(user_profile, constituency_id, booth_id, use_cache=False),
+        )
+
+    booths = user_profile.get_accessible_booths() if use_rollups else None
+
+    if booths is not None:
+        if constituency_id:
+            booths = booths.filter(constituency_id=constituency_id)
+        if booth_id:
+            booths = booths.filter(id=booth_id)
+        sums = BoothStats.objects.filter(booth__in=booths).aggregate(
+            **{name: Sum(name) for name in BoothStats.FIELDS}
+        )
+        counts = {name: value or 0 for name, value in sums.items()}
+    else:
+        voters = user_profile.get_accessible_voters()
+        if constituency_id:
+            voters = voters.filter(constituency_id=constituency_id)
+        if booth_id:
+            voters = voters.filter(booth_id=booth_id)
+        # One scan: every bucket is a filtered COUNT over the same scoped rows
+        counts = voters.aggregate(**BoothStats.aggregates())
+
+    return _format_dashboard_stats(counts)
+
+# EPIC numbers are 3 letters + 7 digits: a query shaped like the start of one can
+# only match an EPIC as a prefix, a narrower probe of the UPPER(epic_id) trigram index.
+EPIC_PREFIX_RE = re.compile(r'^[A-Za-z]{3}[0-9]{1,7}$')
+
+def voter_search_filter(search):
+    """
+    Q for the voter search box; matches are served by the pg_trgm GIN indexes
+    (case-insensitive, so EPICs saved in lower case are found too).
+    Latin ("Sindhu") and Malayalam ("സിന്ധു") spellings also meet on phonetic_key.
+    """
+    term = search.strip()
+    epic = Q(epic_id__istartswith=term) if EPIC_PREFIX_RE.match(term) else Q(epic_id__icontains=search)
+    q = (
+        Q(full_name__icontains=search) |
+        epic |
+        Q(house_name__icontains=search)
+    )
+    key = phonetic_key(term)
+    # Shorter keys have no trigram to probe and would match most rows anyway
+    if len(key) >= 3:
+        q |= Q(phonetic_key__contains=key)
+    return q
+
+def encode_voter_cursor(booth_id, serial_no, voter_id):
+    """Opaque keyset token for the voter after which the next page starts"""
+    raw = json.dumps([booth_id, serial_no, voter_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_voter_cursor(token):
+    """Returns (booth_id, serial_no, voter_id); raises ValueError for malformed tokens"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        booth_id, serial_no, voter_id = json.loads(raw)
+        return int(booth_id), int(serial_no), int(voter_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+COUNT_MODES = ('exact', 'estimate', 'has_more', 'auto')
+# auto: scopes the planner puts below this get an exact (cached) count
+AUTO_EXACT_LIMIT = int(os.getenv('VOTER_COUNT_AUTO_EXACT_LIMIT', 50000))
+
+def estimate_count(queryset):
+    """Planner row estimate for a queryset (EXPLAIN, no scan)"""
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+def _count_voters(user_profile, voters, count_mode, filters):
+    """Returns (total or None, strategy used) for the voter list"""
+    if count_mode == 'has_more':
+        return None, 'has_more'
+    if count_mode in ('estimate', 'auto'):
+        estimate = estimate_count(voters)
+        if count_mode == 'estimate' or estimate >= AUTO_EXACT_LIMIT:
+            return estimate, 'estimate'
+    # Exact counts are cached per scope + filters until a voter write in that scope
+    total = stats_cache.cached(
+        'voter_count', 'voters', stats_scope(user_profile), filters,
+        lambda: voters.count(),
+    )
+    return total, 'exact'
+
+# (output key, ORM path) of every voter list / export column, in output order
+VOTER_LIST_COLUMNS = (
+    ("id", "id"),
+    ("serial_no", "serial_no"),
+    ("full_name", "full_name"),
+    ("epic_id", "epic_id"),
+    ("house_name", "house_name"),
+    ("house_no", "house_no"),
+    ("age", "age"),
+    ("gender", "gender"),
+    ("constituency", "constituency__name"),
+    ("local_body", "local_body__name"),
+    ("booth_no", "booth__number"),
+    ("ps_no", "booth__polling_station_no"),
+    ("ps_name", "booth__polling_station_name"),
+    ("phone_no", "phone_no"),
+    ("current_location", "current_location"),
+    ("voter_leaning", "voter_leaning"),
+    ("voting_probability", "voting_probability"),
+)
+VOTER_LIST_KEYS = tuple(key for key, _ in VOTER_LIST_COLUMNS)
+_LOCAL_BODY_COL = VOTER_LIST_KEYS.index("local_body")
+
+def voter_list_values(voters):
+    """
+    Projects a voter queryset onto the list columns as tuples (no model
+    hydration; the booth joins come from the column paths). booth_id is
+    appended as a trailing column for cursor building; voter_list_dict drops it.
+    """
+    paths = [path for _, path in VOTER_LIST_COLUMNS]
+    return voters.values_list(*paths, 'booth_id')
+
+def voter_list_dict(row):
+    """Row tuple from voter_list_values -> API result dict"""
+    item = dict(zip(VOTER_LIST_KEYS, row))
+    if row[_LOCAL_BODY_COL] is None:
+        item["local_body"] = "N/A"
+    return item
+
+def filter_voters(user_profile, search=None, constituency_id=None, lb_id=None, booth_id=None, gender=None, age_from=None, age_to=None, leaning=None):
+    """Voters visible to the user, narrowed by the list / export filters"""
     voters = user_profile.get_accessible_voters()
     
     if search:
-        voters = voters.filter(
-            Q(full_name__icontains=search) | 
-            Q(epic_id__icontains=search) |
-            Q(house_name__icontains=search)
-        )
+        voters = voters.filter(voter_search_filter(search))
     
     if constituency_id:
-        voters = voters.filter(booth__constituency_id=constituency_id)
+        voters = voters.filter(constituency_id=constituency_id)
     if lb_id:
-        voters = voters.filter(booth__local_body_id=lb_id)
+        voters = voters.filter(local_body_id=lb_id)
     if booth_id:
         voters = voters.filter(booth_id=booth_id)
     if gender:
-        voters = voters.filter(gender__iexact=gender)
+        # Case-insensitive via the coded field's aliases; a plain code equality
+        voters = voters.filter(gender=gender)
     if age_from:
         voters = voters.filter(age__gte=age_from)
     if age_to:
         voters = voters.filter(age__lte=age_to)
     if leaning:
         voters = voters.filter(voter_leaning=leaning)
+    return voters
 
-    total_count = voters.count()
-    
+def get_voter_list(user_profile, search=None, page=1, page_size=50, constituency_id=None, lb_id=None, booth_id=None, gender=None, age_from=None, age_to=None, leaning=None, cursor=None, count_mode='exact'):
+    """
+    Fetch paginated voters with advanced filters.
+    Pass cursor ("" for the first page, then the returned next_cursor) for keyset
+    pagination on (booth_id, serial_no, id): every page is one index range read
+    of the voter_booth_serial_id index, however deep. Without a cursor, pages
+    use OFFSET on the default booth / serial ordering.
+
+    count_mode picks how "total" is produced (reported back as count_strategy):
+    exact (cached COUNT), estimate (planner estimate), has_more (no total; use
+    has_more for infinite scroll), auto (exact for small scopes, else estimate).
+    """
+    if count_mode not in COUNT_MODES:
+        raise ValueError(f"Invalid count_mode (expected one of {', '.join(COUNT_MODES)})")
+
+    voters = filter_voters(user_profile, search, constituency_id, lb_id, booth_id, gender, age_from, age_to, leaning)
+
+    filters = {
+        "search": search, "constituency_id": constituency_id, "lb_id": lb_id, "booth_id": booth_id,
+        "gender": gender, "age_from": age_from, "age_to": age_to, "leaning": leaning,
+    }
+    total_count, count_strategy = _count_voters(user_profile, voters, count_mode, filters)
+    next_cursor = None
+    has_more = False
+
+    if cursor is not None:
+        voters = voters.order_by('booth_id', 'serial_no', 'id')
+        if cursor:
+            after_booth, after_serial, after_id = decode_voter_cursor(cursor)
+            # booth_id__gte bounds the index range; the OR picks up mid-booth
+            voters = voters.filter(booth_id__gte=after_booth).filter(
+                Q(booth_id__gt=after_booth) |
+                Q(booth_id=after_booth, serial_no__gt=after_serial) |
+                Q(booth_id=after_booth, serial_no=after_serial, id__gt=after_id)
+            )
+        rows = list(voter_list_values(voters)[:page_size + 1])
+        has_more = len(rows) > page_size
+        if has_more:
+            rows = rows[:page_size]
+            last = voter_list_dict(rows[-1])
+            next_cursor = encode_voter_cursor(rows[-1][-1], last["serial_no"], last["id"])
+        page = None
     # Handle pagination if page is not None
-    if page:
+    elif page:
         start = (page - 1) * page_size
         end = start + page_size
-        voters_slice = voters.select_related('booth', 'booth__constituency', 'booth__local_body')[start:end]
+        # One row past the page tells us whether another page exists
+        rows = list(voter_list_values(voters)[start:end + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
     else:
-        voters_slice = voters.select_related('booth', 'booth__constituency', 'booth__local_body')
+        rows = voter_list_values(voters)
+
+    results = [voter_list_dict(row) for row in rows]
 
-    results = []
-    for v in voters_slice:
-        results.append({
-            "id": v.id,
-            "serial_no": v.serial_no,
-            "full_name": v.full_name,
-            "epic_id": v.epic_id,
-            "house_name": v.house_name,
-            "house_no": v.house_no,
-            "age": v.age,
-            "gender": v.gender,
-            "constituency": v.booth.constituency.name,
-            "local_body": v.booth.local_body.name if v.booth.local_body else "N/A",
-            "booth_no": v.booth.number,
-            "ps_no": v.booth.polling_station_no,
-            "ps_name": v.booth.polling_station_name,
-            "phone_no": v.phone_no,
-            "current_location": v.current_location,
-            "voter_leaning": v.voter_leaning,
-            "voting_probability": v.voting_probability
-        })
-    
     return {
         "total": total_count,
         "results": results,
         "page": page,
-        "page_size": page_size
+        "page_size": page_size,
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+        "count_strategy": count_strategy
     }
 
+def iter_voter_export(user_profile, chunk_size=2000, **filters):
+    """
+    Yields export rows (tuples in VOTER_LIST_KEYS order) from a server-side
+    cursor, chunk_size rows per fetch. Must be consumed on a single thread.
+    """
+    voters = filter_voters(user_profile, **filters)
+    for row in voter_list_values(voters).iterator(chunk_size=chunk_size):
+        if row[_LOCAL_BODY_COL] is None:
+            row = row[:_LOCAL_BODY_COL] + ("N/A",) + row[_LOCAL_BODY_COL + 1:]
+        yield row[:-1]
+
 def update_voter_in_db(voter_id, data):
     """Update a single voter's data in the database"""
     try:
-        voter = Voter.objects.get(id=voter_id)
-        if 'full_name' in data: voter.full_name = data['full_name']
-        if 'epic_id' in data: voter.epic_id = data['epic_id']
-        if 'house_name' in data: voter.house_name = data['house_name']
-        if 'house_no' in data: voter.house_no = data['house_no']
-        if 'age' in data: voter.age = int(data['age']) if str(data['age']).isdigit() else voter.age
-        if 'gender' in data: voter.gender = data['gender']
-        if 'phone_no' in data: voter.phone_no = data['phone_no'] if data['phone_no'] else None
-        if 'current_location' in data: voter.current_location = data['current_location'] if data['current_location'] else None
-        if 'voter_leaning' in data: voter.voter_leaning = data['voter_leaning'] if data['voter_leaning'] else None
-        if 'voting_probability' in data: voter.voting_probability = data['voting_probability'] if data['voting_probability'] else None
-        voter.save()
+        with transaction.atomic():
+            voter = Voter.objects.select_for_update().get(id=voter_id)
+            before = BoothStats.counters_for(voter)
+            _apply_voter_edits(voter, data)
+            voter.save()
+            after = BoothStats.counters_for(voter)
+            BoothStats.apply_delta(voter.booth_id, {name: after[name] - before[name] for name in after})
+            bump_stats_versions('voters', [voter.booth_id], [voter.created_by_id])
         return True, "Voter updated successfully"
     except Exception as e:
         return False, str(e)
 
+def _apply_voter_edits(voter, data):
+    """Copies editable fields from an API payload onto a Voter (no save)"""
+    if 'full_name' in data: voter.full_name = data['full_name']
+    # Stored the way the import pipeline stores it: upper case, no spaces
+    if 'epic_id' in data: voter.epic_id = re.sub(r'\s+', '', str(data['epic_id'] or '')).upper()
+    if 'house_name' in data: voter.house_name = data['house_name']
+    if 'house_no' in data: voter.house_no = data['house_no']
+    if 'age' in data: voter.age = int(data['age']) if str(data['age']).isdigit() else voter.age
+    if 'phone_no' in data: voter.phone_no = data['phone_no'] if data['phone_no'] else None
+    # Coded attributes: canonical spelling, '' clears, unknown values raise ValueError
+    for name in ('gender', 'current_location', 'voter_leaning', 'voting_probability'):
+        if name in data: setattr(voter, name, Voter._meta.get_field(name).normalize(data[name]))
+    if 'full_name' in data or 'house_name' in data:
+        voter.phonetic_key = voter_phonetic_key(voter.full_name, voter.house_name)
+
+def locations_scope(user_profile):
+    """Stats-cache scope of the location tree (OPERATOR sees the full tree, unlike its stats)"""
+    if not user_profile or user_profile.role in ('SUPERUSER', 'MANAGER', 'OPERATOR'):
+        return ('ALL', stats_cache.GLOBAL, [])
+    return stats_scope(user_profile)
+
+def bump_location_versions(constituency_id, local_body_id=None, booth_id=None):
+    """Invalidates cached location trees covering a new constituency / local body / booth (on commit)"""
+    def bump():
+        try:
+            stats_cache.bump('locations', booths=[(booth_id, local_body_id, constituency_id)])
+        except Exception as e:
+            logger.warning(f"Location cache invalidation failed: {e}")
+
+    transaction.on_commit(bump)
+
+def get_locations_tree(user_profile=None):
+    """
+    Returns (etag, tree) for the user's scope, cached until a location is added
+    inside it. The ETag is a hash of the serialized tree.
+    """
+    def compute():
+        tree = get_all_locations(user_profile)
+        raw = json.dumps(tree, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return {"etag": '"' + hashlib.sha1(raw.encode()).hexdigest() + '"', "tree": tree}
+
+    entry = stats_cache.cached('locations', 'locations', locations_scope(user_profile), {}, compute)
+    return entry["etag"], entry["tree"]
+
 def get_all_locations(user_profile=None):
-    """Fetch the hierarchy for admin view, optionally filtered by user occupancy"""
-    data = []
-    
-    # Get base constituency queryset
-    if user_profile and user_profile.role not in ['SUPERUSER', 'MANAGER', 'OPERATOR']:
-        # For localized roles, we need to filter
-        if user_profile.role == 'CONSTITUENCY_ADMIN':
-            c_qs = user_profile.assigned_constituencies.all()
-        else:
-            # For lower roles, they are still within a constituency
-            # Determine constituencies from their lower-level assignments
-            c_ids = set()
-            if user_profile.role == 'LOCAL_BODY_HEAD':
-                c_ids.update(user_profile.assigned_local_bodies.values_list('constituency_id', flat=True))
-            elif user_profile.role in ['ZONE_COMMANDER', 'BOOTH_AGENT']:
-                c_ids.update(user_profile.assigned_booths.values_list('constituency_id', flat=True))
-            c_qs = Constituency.objects.filter(id__in=c_ids)
-    else:
-        c_qs = Constituency.objects.all()
-
-    for c in c_qs:
-        c_node = {
-            "id": c.id, 
-            "name": c.name, 
-            "local_bodies": []
-        }
-        
-        # Filter Local Bodies
-        lb_qs = c.local_bodies.all()
-        if user_profile and user_profile.role not in ['SUPERUSER', 'MANAGER', 'OPERATOR', 'CONSTITUENCY_ADMIN']:
-            if user_profile.role == 'LOCAL_BODY_HEAD':
-                lb_qs = lb_qs.filter(id__in=user_profile.assigned_local_bodies.all())
-            elif user_profile.role in ['ZONE_COMMANDER', 'BOOTH_AGENT']:
-                # For Booth Level, determine local bodies from assigned booths
-                lb_ids = user_profile.assigned_booths.values_list('local_body_id', flat=True)
-                lb_qs = lb_qs.filter(id__in=lb_ids)
-        
-        for lb in lb_qs:
-            lb_node = {"id": lb.id, "name": lb.name, "type": lb.body_type, "booths": []}
-            
-            # Filter Booths
-            b_qs = lb.booths.all()
-            if user_profile and user_profile.role in ['ZONE_COMMANDER', 'BOOTH_AGENT']:
-                b_qs = b_qs.filter(id__in=user_profile.assigned_booths.all())
-                
-            for b in b_qs:
-                lb_node["booths"].append({
-                    "id": b.id, 
-                    "number": b.number, 
-                    "polling_station_no": b.polling_station_no,
-                    "name": b.name,
-                    "polling_station_name": b.polling_station_name
-                })
-            c_node["local_bodies"].append(lb_node)
-        data.append(c_node)
-    return data
+    """
+    Fetch the hierarchy for admin view, optionally filtered by user occupancy.
+    Three flat queries (booths, local bodies, constituencies) plus at most one
+    for the scope's assignments, joined into the tree in Python.
+    """
+    role = user_profile.role if user_profile else None
+    booths = Booth.objects.filter(local_body__isnull=False)
+    local_bodies = LocalBody.objects.all()
+    constituencies = Constituency.objects.all()
+
+    if role == 'CONSTITUENCY_ADMIN':
+        c_ids = list(user_profile.assigned_constituencies.values_list('id', flat=True))
+        booths = booths.filter(constituency_id__in=c_ids)
+        local_bodies = local_bodies.filter(constituency_id__in=c_ids)
+        constituencies = constituencies.filter(id__in=c_ids)
+    elif role == 'LOCAL_BODY_HEAD':
+        lb_ids = list(user_profile.assigned_local_bodies.values_list('id', flat=True))
+        booths = booths.filter(local_body_id__in=lb_ids)
+        local_bodies = local_bodies.filter(id__in=lb_ids)
+        constituencies = None
+    elif role in ('ZONE_COMMANDER', 'BOOTH_AGENT'):
+        # Only the assigned booths, and the local bodies / constituencies above them
+        booths = booths.filter(id__any=user_profile.scope_booth_ids)
+        local_bodies = constituencies = None
+
+    booth_rows = list(booths.values('id', 'local_body_id', 'number', 'polling_station_no', 'name', 'polling_station_name'))
+    if local_bodies is None:
+        local_bodies = LocalBody.objects.filter(id__in={b['local_body_id'] for b in booth_rows})
+    lb_rows = list(local_bodies.values('id', 'constituency_id', 'name', 'body_type'))
+    if constituencies is None:
+        constituencies = Constituency.objects.filter(id__in={lb['constituency_id'] for lb in lb_rows})
+
+    booths_by_lb = {}
+    for b in booth_rows:
+        booths_by_lb.setdefault(b.pop('local_body_id'), []).append(b)
+    lbs_by_const = {}
+    for lb in lb_rows:
+        lbs_by_const.setdefault(lb['constituency_id'], []).append(
+            {"id": lb['id'], "name": lb['name'], "type": lb['body_type'], "booths": booths_by_lb.get(lb['id'], [])}
+        )
+
+    return [
+        {"id": c['id'], "name": c['name'], "local_bodies": lbs_by_const.get(c['id'], [])}
+        for c in constituencies.values('id', 'name')
+    ]
 
 def add_constituency(name):
     c, created = Constituency.objects.get_or_create(name=name)
+    if created:
+        bump_location_versions(c.id)
     return {"id": c.id, "name": c.name, "created": created}
 
 def add_local_body(const_id, name, btype):
     c = Constituency.objects.get(id=const_id)
     lb, created = LocalBody.objects.get_or_create(constituency=c, name=name, body_type=btype)
+    if created:
+        bump_location_versions(c.id, lb.id)
     return {"id": lb.id, "name": lb.name, "created": created}
 
 def add_booth(const_id, lb_id, number, ps_name="", ps_no=""):
@@ -367,18 +870,59 @@ def add_booth(const_id, lb_id, number, ps_name="", ps_no=""):
     
     if ps_name or ps_no:
         b.save()
+    if created:
+        refresh_booth_scopes([b])
+    # New booths and polling station edits both show in the tree
+    bump_location_versions(c.id, lb.id, b.id)
         
     return {"id": b.id, "number": b.number, "created": created}
 
-def get_all_users():
-    """Fetch all users and their profile details for admin"""
+def get_all_users(page=None, page_size=100, role=None, constituency_id=None, lb_id=None, booth_id=None, search=None):
+    """
+    Fetch users and their profile details for admin.
+    Fixed query count: users + one prefetch per assignment table (+ a COUNT when paged).
+    Without page, returns the full list; with page, {"total", "results", "page", "page_size"}.
+    Scope filters match direct assignments and, for booths, any scope covering the booth.
+    """
     from django.contrib.auth.models import User
-    users = []
-    for u in User.objects.all().select_related('profile'):
-        profile = getattr(u, 'profile', None)
-        if not profile: continue
-        
-        users.append({
+    users = User.objects.filter(profile__isnull=False).select_related('profile').order_by('id')
+    if role:
+        users = users.filter(profile__role=role)
+    if search:
+        users = users.filter(username__icontains=search)
+    if constituency_id:
+        users = users.filter(
+            Q(profile__assigned_constituencies=constituency_id) |
+            Q(profile__assigned_local_bodies__constituency_id=constituency_id) |
+            Q(profile__assigned_booths__constituency_id=constituency_id)
+        ).distinct()
+    if lb_id:
+        users = users.filter(
+            Q(profile__assigned_local_bodies=lb_id) |
+            Q(profile__assigned_booths__local_body_id=lb_id)
+        ).distinct()
+    if booth_id:
+        users = users.filter(profile__scope_booth_ids__contains=[booth_id])
+
+    total = None
+    if page:
+        total = users.count()
+        start = (page - 1) * page_size
+        users = users[start:start + page_size]
+
+    users = users.prefetch_related(
+        Prefetch('profile__assigned_constituencies', queryset=Constituency.objects.only('id', 'name')),
+        Prefetch('profile__assigned_local_bodies', queryset=LocalBody.objects.only('id', 'name')),
+        Prefetch('profile__assigned_booths', queryset=Booth.objects.only('id', 'number')),
+    )
+
+    results = []
+    for u in users:
+        profile = u.profile
+        constituencies = list(profile.assigned_constituencies.all())
+        local_bodies = list(profile.assigned_local_bodies.all())
+        booths = list(profile.assigned_booths.all())
+        results.append({
             "id": u.id,
             "username": u.username,
             "role": profile.role,
@@ -388,14 +932,17 @@ def get_all_users():
             "can_edit_voters": profile.can_edit_voters,
             "can_send_broadcasts": profile.can_send_broadcasts,
             "can_manage_system": profile.can_manage_system,
-            "constituencies": list(profile.assigned_constituencies.values_list('name', flat=True)),
-            "constituency_ids": list(profile.assigned_constituencies.values_list('id', flat=True)),
-            "local_bodies": list(profile.assigned_local_bodies.values_list('name', flat=True)),
-            "local_body_ids": list(profile.assigned_local_bodies.values_list('id', flat=True)),
-            "booths": list(profile.assigned_booths.values_list('number', flat=True)),
-            "booth_ids": list(profile.assigned_booths.values_list('id', flat=True)),
+            "constituencies": [c.name for c in constituencies],
+            "constituency_ids": [c.id for c in constituencies],
+            "local_bodies": [lb.name for lb in local_bodies],
+            "local_body_ids": [lb.id for lb in local_bodies],
+            "booths": [b.number for b in booths],
+            "booth_ids": [b.id for b in booths],
         })
-    return users
+
+    if page:
+        return {"total": total, "results": results, "page": page, "page_size": page_size}
+    return results
 
 def create_managed_user(username, password, role, assignments):
     """Create a new user with specific role and scope assignments"""
@@ -444,6 +991,7 @@ def create_managed_user(username, password, role, assignments):
                 profile.assigned_booths.add(*assignments['booths'])
             
             profile.save()
+            profile.refresh_scope()
             return True, "User created successfully"
     except Exception as e:
         return False, str(e)
@@ -456,6 +1004,7 @@ def delete_user(user_id):
         if user.is_superuser:
             return False, "Cannot delete root superuser"
         user.delete()
+        profile_cache.invalidate_user(user_id)
         return True, "User deleted successfully"
     except Exception as e:
         return False, str(e)
@@ -493,6 +1042,9 @@ def update_user_profile(user_id, data):
                     profile.assigned_booths.set(assignments['booths'])
             
             profile.save()
+            profile.refresh_scope()
+            # Cached request profiles must not outlive a role / scope change
+            transaction.on_commit(lambda: profile_cache.invalidate_user(user.id))
             return True, "User updated successfully"
     except Exception as e:
         return False, str(e)
@@ -0,0 +1,145 @@
+"""
+DB Executor
+Runs the synchronous Django ORM calls of the API on a bounded thread pool,
+instead of asgiref's single thread_sensitive thread, so a slow export or
+dashboard no longer queues every login and voter edit behind it.
+
+Each pool thread keeps its own Django connection (recycled through
+close_old_connections around every call, per CONN_MAX_AGE / health checks).
+Every endpoint group also has a concurrency limit, so one kind of heavy
+request cannot take all DB_THREADS threads (and connections):
+
+    group       default   env override
+    auth           16     DB_LIMIT_AUTH
+    read            8     DB_LIMIT_READ       (locations, users, parties ...)
+    dashboard       4     DB_LIMIT_DASHBOARD
+    voters          6     DB_LIMIT_VOTERS
+    write           4     DB_LIMIT_WRITE
+    export          2     DB_LIMIT_EXPORT     (streamed exports, own thread each)
+
+Requests over a group's limit wait for a slot; exports over the limit are
+refused (see try_acquire), since each holds a connection for minutes.
+"""
+
+import os
+import time
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections
+
+DEFAULT_THREADS = 12
+DEFAULT_LIMITS = {
+    'auth': 16,
+    'read': 8,
+    'dashboard': 4,
+    'voters': 6,
+    'write': 4,
+    'export': 2,
+}
+
+
+def _limit(group):
+    return int(os.getenv(f'DB_LIMIT_{group.upper()}', DEFAULT_LIMITS[group]))
+
+
+class _Group:
+    """Concurrency limit plus counters for one endpoint group."""
+
+    def __init__(self, name):
+        self.name = name
+        self.limit = _limit(name)
+        self._semaphore = None  # created on the event loop's first use
+        self._thread_slots = threading.BoundedSemaphore(self.limit)
+        self._lock = threading.Lock()  # counters change on the loop and on export threads
+        self.in_flight = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+
+    @property
+    def semaphore(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.limit)
+        return self._semaphore
+
+    def count(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def snapshot(self):
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.wait_seconds / self.completed * 1000, 2) if self.completed else 0.0,
+        }
+
+
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('DB_THREADS', DEFAULT_THREADS)),
+    thread_name_prefix='db',
+)
+_groups = {name: _Group(name) for name in DEFAULT_LIMITS}
+
+
+def _run(func, args, kwargs):
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+def db_async(func, group='read'):
+    """Async wrapper running func on the DB pool under the group's limit."""
+    limits = _groups[group]
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        queued = time.perf_counter()
+        limits.count(waiting=1)
+        async with limits.semaphore:
+            limits.count(waiting=-1, in_flight=1, wait_seconds=time.perf_counter() - queued)
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(_executor, _run, func, args, kwargs)
+            finally:
+                limits.count(in_flight=-1, completed=1)
+
+    return wrapper
+
+
+def try_acquire(group):
+    """
+    Takes a slot for work that runs on its own thread (streamed exports).
+    Returns a release callable, or None when the group is at its limit.
+    """
+    limits = _groups[group]
+    if not limits._thread_slots.acquire(blocking=False):
+        limits.count(rejected=1)
+        return None
+    limits.count(in_flight=1)
+    released = threading.Lock()
+
+    def release():
+        # Idempotent: called from the producer thread's exit hook
+        if released.acquire(blocking=False):
+            limits.count(in_flight=-1, completed=1)
+            limits._thread_slots.release()
+
+    return release
+
+
+def stats():
+    """Per-group limits and counters (system-health endpoint)."""
+    return {
+        "threads": _executor._max_workers,
+        "groups": {name: group.snapshot() for name, group in _groups.items()},
+    }
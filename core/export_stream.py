@@ -0,0 +1,254 @@
+"""
+Export Streams
+Incremental CSV / gzip / XLSX encoders for downloads, so an export never holds
+the whole dataset (or an encoded copy of it) in memory.
+
+Every encoder takes a header and an iterable of row tuples and yields bytes
+chunks that can be handed straight to a StreamingResponse. Rows coming from a
+Django server-side cursor must be read on one thread; ThreadedChunks moves
+such a generator onto a dedicated producer thread and hands its chunks over
+through a bounded queue, stopping it when the response is closed.
+"""
+
+import io
+import re
+import csv
+import zlib
+import time
+import asyncio
+import queue
+import zipfile
+import threading
+from xml.sax.saxutils import escape
+
+CSV_ROWS_PER_CHUNK = 1000
+XLSX_ROWS_PER_CHUNK = 500
+
+# Control characters XML 1.0 does not allow (OCR output occasionally has them)
+_XML_ILLEGAL = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def csv_stream(header, rows, rows_per_chunk=CSV_ROWS_PER_CHUNK):
+    """UTF-8 (with BOM, for Excel) CSV, one chunk per rows_per_chunk rows."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(header)
+    pending = 0
+    first = True
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= rows_per_chunk:
+            yield buf.getvalue().encode('utf-8-sig' if first else 'utf-8')
+            buf.seek(0)
+            buf.truncate()
+            pending = 0
+            first = False
+    yield buf.getvalue().encode('utf-8-sig' if first else 'utf-8')
+
+
+def gzip_stream(chunks, level=6):
+    """Gzip-compresses a bytes stream on the fly."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable file object that zipfile streams into."""
+
+    def __init__(self):
+        self._parts = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts.clear()
+        return data
+
+
+_XLSX_STATIC = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="{sheet}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _xlsx_cell(value):
+    if value is None or value == '':
+        return '<c/>'
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c><v>{value}</v></c>'
+    text = _XML_ILLEGAL.sub('', escape(str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(row):
+    return '<row>' + ''.join(_xlsx_cell(value) for value in row) + '</row>'
+
+
+def xlsx_stream(header, rows, sheet_name='Voters', rows_per_chunk=XLSX_ROWS_PER_CHUNK):
+    """
+    Single-sheet XLSX written as a streamed zip (data descriptors, no seeking).
+    Cells are inline strings / numbers, so no shared-strings table is kept.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, body in _XLSX_STATIC.items():
+            archive.writestr(name, body.replace('{sheet}', escape(sheet_name[:31])))
+        yield sink.drain()
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+                + _xlsx_row(header)
+            ).encode('utf-8'))
+            parts = []
+            for row in rows:
+                parts.append(_xlsx_row(row))
+                if len(parts) >= rows_per_chunk:
+                    sheet.write(''.join(parts).encode('utf-8'))
+                    parts.clear()
+                    data = sink.drain()
+                    if data:
+                        yield data
+            sheet.write((''.join(parts) + '</sheetData></worksheet>').encode('utf-8'))
+    yield sink.drain()
+
+
+def encode_export(header, rows, fmt='csv', compress=False):
+    """Returns (chunks, media_type, file extension) for an export format."""
+    if fmt == 'xlsx':
+        # Already deflated; gzip on top would only cost CPU
+        return (xlsx_stream(header, rows),
+                'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx')
+    if fmt != 'csv':
+        raise ValueError("Invalid export format (expected csv or xlsx)")
+    chunks = csv_stream(header, rows)
+    if compress:
+        return gzip_stream(chunks), 'application/gzip', 'csv.gz'
+    return chunks, 'text/csv', 'csv'
+
+
+_DONE = object()
+
+
+class ThreadedChunks:
+    """
+    Iterates make_chunks() on its own producer thread and yields its chunks.
+    Database cursors opened by the producer stay on that thread; at most
+    max_pending chunks are buffered ahead of a slow client.
+
+    Hand it to StreamingResponse as is: it is async-iterable, and the async
+    iteration closes it when the response ends or is cancelled (client
+    disconnect), which stops the producer at its next chunk. Starlette never
+    closes sync iterators, so plain iteration must call close() itself. A
+    consumer that stalls for stall_timeout seconds stops the producer too.
+    """
+
+    def __init__(self, make_chunks, max_pending=8, on_exit=None, stall_timeout=300):
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._stall_timeout = stall_timeout
+        self._stop = threading.Event()
+        self._on_exit = on_exit
+        self._thread = threading.Thread(target=self._produce, args=(make_chunks,), daemon=True)
+        self._thread.start()
+
+    def _put(self, item):
+        # Gives up if the consumer stops reading without closing (dropped client)
+        deadline = time.monotonic() + self._stall_timeout
+        while not self._stop.is_set() and time.monotonic() < deadline:
+            try:
+                self._queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self, make_chunks):
+        try:
+            for chunk in make_chunks():
+                if not self._put(chunk):
+                    break
+            self._put(_DONE)
+        except Exception as e:
+            self._put(e)
+        finally:
+            if self._on_exit:
+                self._on_exit()
+
+    def _get(self):
+        # Polls so a getter thread is not left waiting forever after close()
+        while not self._stop.is_set():
+            try:
+                return self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        item = self._get()
+        if item is _DONE:
+            raise StopIteration
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    async def __aiter__(self):
+        try:
+            while True:
+                item = await asyncio.to_thread(self._get)
+                if item is _DONE:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            self.close()
+
+    def close(self):
+        self._stop.set()
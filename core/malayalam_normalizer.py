@@ -3,18 +3,21 @@ Malayalam Unicode Normalization
 Converts composite forms to modern atomic chillu forms
 """
 
-def normalize_malayalam(text):
+import re
+
+def legacy_normalize_malayalam(text):
     """
     Normalize Malayalam text to use atomic chillu characters.
     Converts composite forms (consonant + virama) to single chillu characters
     ONLY when they appear at word boundaries (end of word or before space).
     Preserves conjunct consonants like ന്ധ, ന്ത, etc.
+
+    Reference implementation kept for equivalence checks and benchmarks
+    (scripts/benchmark_normalizer.py). Use normalize_malayalam() instead.
     """
     if not text or text == "N/A":
         return text
     
-    import re
-    
     # 1. Global Safe Chillu Forms
     # ONLY 'Ra' (ര്) is safe to replace globally because it doesn't form geminates via Virama.
     # Replacing 'La', 'Lla', 'Nna' etc globally breaks geminates like 'Alla' (ല്ല), 'Ellam' (ള്ള), 'Mannu' (ണ്ണ).
@@ -51,3 +54,114 @@ def normalize_malayalam(text):
     normalized = normalized.replace("പൂണര്ത", "പൂണർത") # Redundant now but safe to keep
 
     return normalized
+
+
+# ----------------------------------------------------------------
+# PRECOMPILED SINGLE-PASS NORMALIZER
+# ----------------------------------------------------------------
+
+GLOBAL_SAFE_CHILLUS = {
+    'ര്': 'ർ',
+}
+SENSITIVE_CHILLUS = {
+    'ന്': 'ൻ',
+    'ല്': 'ൽ',
+    'ള': 'ൾ',
+    'ള്': 'ൾ',
+    'ണ്': 'ൺ',
+    'ക്': 'ൿ',
+}
+_CHILLU_MAP = {**GLOBAL_SAFE_CHILLUS, **SENSITIVE_CHILLUS}
+
+# One alternation does the work of the global replace plus the three boundary
+# passes (end of string, before whitespace, before . , ! ?) for every sensitive form.
+# Replacements never create or consume a boundary and no two forms overlap, so a
+# single left-to-right pass gives the same result as the sequential passes.
+_CHILLU_RE = re.compile(
+    "|".join(re.escape(k) for k in GLOBAL_SAFE_CHILLUS)
+    + "|(?:" + "|".join(re.escape(k) for k in sorted(SENSITIVE_CHILLUS, key=len, reverse=True)) + ")"
+    + r"(?=[\s.,!?]|\Z)"
+)
+_VIRAMA = '്'
+_LLA = 'ള'
+# Joins bulk input into one string; starts with whitespace so the end of every item
+# still counts as a word boundary, and contains nothing the pattern can match.
+_BULK_SEPARATOR = "\n\x00\n"
+
+
+def _replace_chillu(match):
+    return _CHILLU_MAP[match.group(0)]
+
+
+def normalize_malayalam(text):
+    """
+    Normalize Malayalam text to use atomic chillu characters.
+    Converts composite forms (consonant + virama) to single chillu characters
+    ONLY when they appear at word boundaries (end of word or before space).
+    Preserves conjunct consonants like ന്ധ, ന്ത, etc.
+    Output is identical to legacy_normalize_malayalam().
+    """
+    if not text or text == "N/A":
+        return text
+    if _VIRAMA not in text and _LLA not in text:
+        return text
+    # legacy's final "പൂണര്ത" fix-up is a no-op once every ര് has become ർ
+    return _CHILLU_RE.sub(_replace_chillu, text)
+
+
+def normalize_many(texts):
+    """
+    Bulk version of normalize_malayalam().
+    Returns a list with exactly [normalize_malayalam(t) for t in texts], but runs the
+    pattern once over the whole batch instead of once per value.
+    """
+    texts = list(texts)
+    idx = [i for i, t in enumerate(texts) if t and t != "N/A" and isinstance(t, str)]
+    if not idx:
+        return texts
+
+    if any("\x00" in texts[i] for i in idx):
+        # A value contains the separator's marker byte; fall back to per-value calls
+        return [normalize_malayalam(t) for t in texts]
+
+    joined = _BULK_SEPARATOR.join(texts[i] for i in idx)
+    parts = _CHILLU_RE.sub(_replace_chillu, joined).split(_BULK_SEPARATOR)
+    for i, part in zip(idx, parts):
+        texts[i] = part
+    return texts
+
+
+# ----------------------------------------------------------------
+# CONJUNCT REPAIR
+# ----------------------------------------------------------------
+
+# Reverse mapping: Chillu -> Consonant + Virama (when before another consonant)
+CHILLU_TO_COMPOSITE = {
+    'ൻ': 'ന്',  # Chillu N -> NA + Virama
+    'ൺ': 'ണ്',  # Chillu NN -> NNA + Virama
+    'ർ': 'ര്',  # Chillu R -> RA + Virama
+    'ൽ': 'ല്',  # Chillu L -> LA + Virama
+    'ൾ': 'ള്',  # Chillu LL -> LLA + Virama
+    'ൿ': 'ക്',  # Chillu K -> KA + Virama
+}
+# Applied one chillu at a time, in this order: a replacement can expose a new
+# chillu + consonant pair for a later entry (e.g. ർൻക -> ർന്ക -> ര്ന്ക).
+_CHILLU_BEFORE_CONSONANT = [
+    (re.compile(f'{re.escape(chillu)}(?=[\u0D15-\u0D39])'), composite)
+    for chillu, composite in CHILLU_TO_COMPOSITE.items()
+]
+_ANY_CHILLU = re.compile('[' + ''.join(CHILLU_TO_COMPOSITE) + ']')
+
+
+def reverse_incorrect_chillu_conversions(text):
+    """
+    Reverse chillu characters that appear before consonants (incorrect conjuncts)
+    സിൻധു -> സിന്ധു
+    """
+    if not text or text == "N/A":
+        return text
+    if not _ANY_CHILLU.search(text):
+        return text
+    for pattern, composite in _CHILLU_BEFORE_CONSONANT:
+        text = pattern.sub(composite, text)
+    return text
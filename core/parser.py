@@ -264,3 +264,252 @@ class VoterParser:
                 data["Gender"] = "Female"
 
         return data
+
+
+# ----------------------------------------------------------------
+# COMPILED PARSER MODE
+# Same output as VoterParser, but every regex is compiled once at import
+# and each line is classified with a single gate search before the
+# per-field patterns run.
+# ----------------------------------------------------------------
+
+_STUBS = [
+    r"വീട്ടു\s*നമ്പ[ർര]", r"വിട്ടു\s*നമ്പ[ർര]", r"ു\s*നമ്പ[ർര]", r"ം\s*നമ്പ[ർര]",
+    r"പേര[്]?", r"പേര്", r"പേര്‍", r"പെര[്]?",
+    r"അച്ഛന്റെ", r"ഭർത്താവിന്റെ", r"അമ്മയുടെ", r"മറ്റുള്ളവ"
+]
+# Stubs must still be removed one after another (a value can start with two of them),
+# but the combined alternation rejects the common case - no stub at all - in one match.
+_STUB_RES = [re.compile(f"^{stub}\\s*[:\\+]?\\s*", re.IGNORECASE) for stub in _STUBS]
+_ANY_STUB = re.compile("|".join(f"(?:{stub})" for stub in _STUBS), re.IGNORECASE)
+
+_JUNK = r'[^a-zA-Z0-9\u0D05-\u0D39\u0D3E-\u0D4D\u0D7A-\u0D7F\u200C\u200D]'
+_LEADING_JUNK = re.compile(f"^{_JUNK}+")
+_TRAILING_JUNK = re.compile(f"{_JUNK}+$")
+_LEADING_SIGNS = re.compile(r'^[\u0D3E-\u0D4D\u200C\u200D]+')
+
+_LINE_NOISE = re.compile(r'^[+.\-_\s*]+', re.MULTILINE)
+
+_HOUSE_KEYWORDS = re.compile(r'^(?:വീട്ടു|വിട്ടു|നമ്പർ|നന്പർ|നമ്പര്|നമ്പര്‍|house|no|number)\s*', re.IGNORECASE)
+_HOUSE_LEADING = re.compile(r'^[^a-zA-Z0-9\u0D00-\u0D7F]+')
+_TRAILING_COMMA_DOT = re.compile(r'[,.]$')
+_HOUSE_SUFFIXES = frozenset({"എ", "ഏ", "ബി", "സി", "ഡി", "ഇ"})
+
+# healing_map applied as one substitution. The sequential str.replace chain turns the
+# first five spellings into "ഹൗസ്" and then the "ഹൗസ" rule appends another virama to
+# every "ഹൗസ", so those five map straight to "ഹൗസ്്" to keep the output byte-identical.
+_HEALING = {
+    "ഹയസ്": "ഹൗസ്്",
+    "ഹൊസ്": "ഹൗസ്്",
+    "ഹോസ്": "ഹൗസ്്",
+    "ഹസ്": "ഹൗസ്്",
+    "ഹാസ്": "ഹൗസ്്",
+    "ഹൗസ": "ഹൗസ്",
+    "വിട്ടു": "വീട്ടു",
+    "വിട്ടില്‍": "വീട്ടില്‍",
+}
+_HEALING_RE = re.compile("|".join(re.escape(k) for k in sorted(_HEALING, key=len, reverse=True)))
+
+# Leading (mandatory) keyword groups of every field pattern, plus the continuity breakers.
+# A line that matches none of these can only be a continuation line.
+_LINE_GATE = re.compile(
+    r"പ്രായ|പ്രായമ|പ്രായമു|ായം|പം|പായം|യം"
+    r"|അച്ഛ|അച്ച|അച|അചഛ|അച്ചന|അചഛന|അച്ചൻ"
+    r"|ഭർത്താ|ഭര്‍ത്താ|ഭർത്ത|ഭര്‍ത്ത|ഭർത്താവി|ഭര്‍ത്താവി"
+    r"|അമ്മ|അമമ|അമ|അാമമ"
+    r"|മറ്റുള്ളവ|മറ്റുള്ള|മറ്റുള്ളവര്‍|മറ്റുള്ളവര്|മറ്റുളളവ|മറ്റുളളവര്‍"
+    r"|പേര|പേര്‍|പേര്|പെര|പെര്|രേര്|റേര്|രര"
+    r"|വീട്ട|വീട്ടു|വീട|വീടു|വിട്ടു|വിട്ട"
+    r"|:"
+)
+_REL_LEAD = re.compile(
+    r"അച്ഛ|അച്ച|അച|അചഛ|അച്ചന|അചഛന|അച്ചൻ"
+    r"|ഭർത്താ|ഭര്‍ത്താ|ഭർത്ത|ഭര്‍ത്ത|ഭർത്താവി|ഭര്‍ത്താവി"
+    r"|അമ്മ|അമമ|അമ|അാമമ"
+    r"|മറ്റുള്ളവ|മറ്റുള്ള|മറ്റുള്ളവര്‍|മറ്റുള്ളവര്|മറ്റുളളവ|മറ്റുളളവര്‍"
+)
+_REL_KEYWORDS = re.compile("അച്ഛ|അച്ച|ഭർത്താ|ഭര്‍ത്താ|അമ്മ|അമമ|മറ്റുള്ള")
+_CONTINUITY_BREAK = re.compile(":|പേര്|പ്രായ|വീട്ടു|വിട്ടു")
+_MALE_MARKERS = re.compile("പുരുഷൻ|പുരുഷന്|Male")
+
+_NAME_PREFIX_ID = re.compile(r'^[^\u0D05-\u0D39\u0D7A-\u0D7F]*\d+\s*')
+_HAS_MALAYALAM = re.compile(r'[\u0D05-\u0D39\u0D7A-\u0D7F]')
+_AGE_SCAVENGER = re.compile(r'(?:പ്രായം|ായം|പം|യം)\s*[:\+]?\s*([^\s]{2,3})')
+_AGE_DIGITS = re.compile(r'\b(1[89]|[2-9][0-9])\b')
+
+
+class CompiledVoterParser(VoterParser):
+    """
+    Drop-in replacement for VoterParser with identical output.
+    All patterns are precompiled module constants; keyword lists are single
+    alternations and each line runs one gate search before field matching.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._relations = [("Father", self.patterns["rel_father"]),
+                           ("Husband", self.patterns["rel_husband"]),
+                           ("Mother", self.patterns["rel_mother"]),
+                           ("Others", self.patterns["rel_others"])]
+
+    def clean_text(self, text):
+        text = text.replace("|", "").replace("[", "").replace("]", "")
+        text = _LINE_NOISE.sub('', text)
+        return text.strip()
+
+    def _strip_value(self, val):
+        if not val: return ""
+
+        if _ANY_STUB.match(val):
+            for stub_re in _STUB_RES:
+                val = stub_re.sub("", val)
+
+        val = val.strip().strip(':.-_=+* ')
+        val = _LEADING_JUNK.sub("", val)
+        val = _TRAILING_JUNK.sub("", val)
+        val = _LEADING_SIGNS.sub('', val)
+        val = val.strip().strip(':.-_=+* ')
+
+        return val.strip()
+
+    def _split_house_info(self, house_text):
+        if not house_text or house_text == "N/A":
+            return "N/A", "N/A"
+
+        house_text = _HOUSE_KEYWORDS.sub('', house_text)
+        house_text = _HOUSE_LEADING.sub('', house_text).strip()
+
+        num_parts = []
+        name_parts = []
+        reached_name = False
+        for word in house_text.split():
+            if reached_name:
+                name_parts.append(word)
+            elif any(char.isdigit() for char in word) or "/" in word or "-" in word \
+                    or _TRAILING_COMMA_DOT.sub('', word) in _HOUSE_SUFFIXES:
+                num_parts.append(word)
+            else:
+                reached_name = True
+                name_parts.append(word)
+
+        house_num = " ".join(num_parts) if num_parts else "N/A"
+        house_name = " ".join(name_parts) if name_parts else "N/A"
+        return house_num, house_name
+
+    def parse_text_block(self, raw_text):
+        data = {
+            "Full Name": "N/A",
+            "Relation Type": "N/A",
+            "Relation Name": "N/A",
+            "House Number": "N/A",
+            "House Name": "N/A",
+            "Age": "N/A",
+            "Gender": "N/A"
+        }
+
+        raw_text = self.clean_text(raw_text)
+        raw_text = _HEALING_RE.sub(lambda m: _HEALING[m.group(0)], raw_text)
+
+        lines = [line.strip() for line in raw_text.split("\n") if line.strip()]
+
+        strip = self._strip_value
+        age_gender = self.patterns["age_gender"]
+        name_pattern = self.patterns["name"]
+        house_pattern = self.patterns["house"]
+
+        house_raw_accumulator = []
+        collecting_house = False
+        collecting_name = False
+        collecting_rel = False
+        unassigned_lines = []
+
+        for line in lines:
+            if _LINE_GATE.search(line):
+                # 1. Age/Gender
+                match = age_gender.search(line)
+                if match:
+                    data["Age"] = self._map_ocr_age(match.group(1).strip())
+                    data["Gender"] = "Male" if _MALE_MARKERS.search(match.group(2).strip()) else "Female"
+                    collecting_house = collecting_name = collecting_rel = False
+                    continue
+
+                # 2. Relation (ordered priority)
+                if _REL_LEAD.search(line):
+                    rel_found = False
+                    for rel_type, pattern in self._relations:
+                        match = pattern.search(line)
+                        if match:
+                            data["Relation Name"] = strip(match.group(1))
+                            data["Relation Type"] = rel_type
+                            rel_found = True
+                            collecting_rel = True
+                            collecting_name = collecting_house = False
+                            break
+                    if rel_found: continue
+
+                # 3. Name
+                name_match = name_pattern.search(line)
+                if name_match and not _REL_KEYWORDS.search(line):
+                    extracted_name = strip(name_match.group(1))
+                    if extracted_name:
+                        clean_name = _NAME_PREFIX_ID.sub('', extracted_name).strip()
+                        if clean_name:
+                            data["Full Name"] = clean_name
+                            collecting_name = True
+                            collecting_house = collecting_rel = False
+                            continue
+
+                # 4. House
+                match = house_pattern.search(line)
+                if match:
+                    val = strip(match.group(1))
+                    if val: house_raw_accumulator.append(val)
+                    collecting_house = True
+                    collecting_name = collecting_rel = False
+                    continue
+
+                # 5. Unrecognised field line
+                if _CONTINUITY_BREAK.search(line):
+                    collecting_name = collecting_rel = collecting_house = False
+                    unassigned_lines.append(line)
+                    continue
+
+            if collecting_name:
+                data["Full Name"] += " " + strip(line)
+            elif collecting_rel:
+                data["Relation Name"] += " " + strip(line)
+            elif collecting_house:
+                house_raw_accumulator.append(line)
+            else:
+                unassigned_lines.append(line)
+
+        if data["Full Name"] == "N/A" and unassigned_lines:
+            for cand in unassigned_lines[:2]:
+                if _REL_KEYWORDS.search(cand):
+                    continue
+                val = strip(cand)
+                if len(val) > 2 and _HAS_MALAYALAM.search(val):
+                    data["Full Name"] = val
+                    break
+
+        h_num, h_name = self._split_house_info(" ".join(house_raw_accumulator))
+        data["House Number"] = h_num
+        data["House Name"] = h_name
+
+        if data["Age"] == "N/A":
+            scavenger_match = _AGE_SCAVENGER.search(raw_text)
+            if scavenger_match:
+                data["Age"] = self._map_ocr_age(scavenger_match.group(1).strip())
+
+        if data["Age"] == "N/A":
+            digit_matches = _AGE_DIGITS.findall(raw_text)
+            if digit_matches:
+                data["Age"] = digit_matches[-1]
+
+        if data["Gender"] == "N/A":
+            if "പുരുഷൻ" in raw_text or "പുരുഷന്" in raw_text:
+                data["Gender"] = "Male"
+            else:
+                data["Gender"] = "Female"
+
+        return data
@@ -0,0 +1,106 @@
+"""
+Profile Cache
+Per-process cache of resolved users for request authentication, so an API call
+does not re-read User and UserProfile on every request.
+
+Entries live for PROFILE_CACHE_TTL seconds (default 60). update_user_profile
+and delete_user bump a per-user version counter in the stats cache backend;
+with STATS_CACHE_BACKEND=redis that counter is shared, so a permission change
+made through one worker is seen by the others on their next request.
+"""
+
+import os
+import time
+import logging
+import threading
+
+from core import stats_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 60
+
+_entries = {}
+_lock = threading.Lock()
+
+
+def _ttl():
+    return int(os.getenv('PROFILE_CACHE_TTL', DEFAULT_TTL))
+
+
+def _version_name(user_id):
+    return f'profiles:user:{user_id}'
+
+
+def _current_version(user_id):
+    """The user's version counter, or None when the cache backend is unreachable (entries then live out their TTL)"""
+    try:
+        version, = stats_cache.get_backend().get_versions([_version_name(user_id)])
+        return version
+    except Exception as e:
+        logger.warning(f"Profile cache: version lookup failed ({e}); relying on the {_ttl()}s TTL")
+        return None
+
+
+def user_info(profile):
+    """Permission summary handed to request handlers (and returned on login)"""
+    user = profile.user
+    return {
+        "id": user.id,
+        "username": user.username,
+        "role": profile.role,
+        "can_download": profile.can_download,
+        "can_upload": profile.can_upload,
+        "can_verify": profile.can_verify,
+        "can_edit_voters": profile.can_edit_voters,
+        "can_send_broadcasts": profile.can_send_broadcasts,
+        "can_manage_system": profile.can_manage_system,
+    }
+
+
+def resolve_user(username):
+    """
+    Returns (profile, info) for a username, or None.
+    The profile comes with its user loaded; treat it as read-only, it is
+    shared between requests until the entry expires or is invalidated.
+    """
+    from core_db.models import UserProfile
+
+    with _lock:
+        entry = _entries.get(username)
+    if entry is not None:
+        expires, version, profile, info = entry
+        if expires > time.monotonic():
+            current = _current_version(profile.user_id)
+            if current is None or version == current:
+                return profile, info
+
+    profile = UserProfile.objects.select_related('user').filter(user__username=username).first()
+    if profile is None:
+        with _lock:
+            _entries.pop(username, None)
+        return None
+    # A bump racing this fetch can leave one stale entry; the TTL bounds it
+    version = _current_version(profile.user_id)
+    info = user_info(profile)
+    with _lock:
+        _entries[username] = (time.monotonic() + _ttl(), version, profile, info)
+    return profile, info
+
+
+def invalidate_user(user_id):
+    """Drops cached entries for a user in every worker (after role/scope edits or deletion)"""
+    try:
+        stats_cache.get_backend().incr_versions([_version_name(user_id)])
+    except Exception as e:
+        # Runs after the change committed: never fail it, other workers catch up within the TTL
+        logger.warning(f"Profile cache: invalidating user {user_id} failed ({e})")
+    with _lock:
+        for username, entry in list(_entries.items()):
+            if entry[2].user_id == user_id:
+                del _entries[username]
+
+
+def clear():
+    with _lock:
+        _entries.clear()
@@ -0,0 +1,210 @@
+"""
+Stats Cache
+Caches dashboard and communication stats per resolved user scope.
+
+Invalidation is driven by version counters instead of deletes: every write
+bumps a counter for the booth it touched and for that booth's local body,
+constituency and the global scope (plus the uploading operator). A cache key
+embeds the current versions of the scope it was computed for, so a write
+inside the scope changes the key and the old entry is never read again.
+Entries also expire after STATS_CACHE_TTL seconds as a backstop for writes
+made outside the app.
+
+Backends (STATS_CACHE_BACKEND):
+    local   In-process LRU (default). Exact for a single worker process.
+    redis   Shared Redis-compatible server at STATS_CACHE_URL, for several
+            uvicorn workers. Needs the `redis` package; startup fails
+            when the server cannot be reached.
+    none    Caching disabled.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+DEFAULT_TTL = 300
+DEFAULT_SIZE = 2048
+
+# Scope levels, broadest first. A bump touches every level above the booth.
+GLOBAL, CONSTITUENCY, LOCAL_BODY, BOOTH, USER = 'global', 'constituency', 'local_body', 'booth', 'user'
+
+
+class LocalBackend:
+    """Thread-safe LRU with per-entry TTL; version counters are never evicted."""
+
+    def __init__(self, max_entries=DEFAULT_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_versions(self, names):
+        with self._lock:
+            return [self._versions.get(name, 0) for name in names]
+
+    def incr_versions(self, names):
+        with self._lock:
+            for name in names:
+                self._versions[name] = self._versions.get(name, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisBackend:
+    """Redis-backed cache shared by all worker processes."""
+
+    def __init__(self, url, prefix='stats'):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(f'{self.prefix}:entry:{key}')
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl):
+        self.client.set(f'{self.prefix}:entry:{key}', json.dumps(value), ex=ttl)
+
+    def get_versions(self, names):
+        if not names:
+            return []
+        return [int(v or 0) for v in self.client.mget([f'{self.prefix}:ver:{n}' for n in names])]
+
+    def incr_versions(self, names):
+        pipe = self.client.pipeline(transaction=False)
+        for name in names:
+            pipe.incr(f'{self.prefix}:ver:{name}')
+        pipe.execute()
+
+    def clear(self):
+        for key in self.client.scan_iter(f'{self.prefix}:entry:*'):
+            self.client.delete(key)
+
+
+class NullBackend:
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+    def get_versions(self, names):
+        return [0] * len(names)
+
+    def incr_versions(self, names):
+        pass
+
+    def clear(self):
+        pass
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Builds the configured backend on first use."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _create_backend()
+    return _backend
+
+
+def set_backend(backend):
+    """Replaces the active backend (e.g. NullBackend() for checks that count queries)."""
+    global _backend
+    _backend = backend
+
+
+def _create_backend():
+    kind = os.getenv('STATS_CACHE_BACKEND', 'local').lower()
+    if kind == 'none':
+        return NullBackend()
+    if kind == 'redis':
+        url = os.getenv('STATS_CACHE_URL', 'redis://localhost:6379/0')
+        try:
+            backend = RedisBackend(url)
+            backend.client.ping()
+            return backend
+        except Exception as e:
+            # A per-process fallback would serve stale stats across workers: refuse to start
+            raise RuntimeError(f"STATS_CACHE_BACKEND=redis but Redis at {url} is unavailable ({e})") from e
+    return LocalBackend(int(os.getenv('STATS_CACHE_SIZE', DEFAULT_SIZE)))
+
+
+def _ttl():
+    return int(os.getenv('STATS_CACHE_TTL', DEFAULT_TTL))
+
+
+def _version_name(topic, level, ident=None):
+    return f'{topic}:{level}' if ident is None else f'{topic}:{level}:{ident}'
+
+
+def bump(topic, booths=(), user_ids=()):
+    """
+    Invalidates every cached scope containing the given booths.
+    booths: iterable of (booth_id, local_body_id, constituency_id); booth_id may
+    be None for changes above booth level (a new local body or constituency).
+    user_ids: operators whose own-batch scope changed.
+    """
+    names = {_version_name(topic, GLOBAL)}
+    for booth_id, local_body_id, constituency_id in booths:
+        if booth_id is not None:
+            names.add(_version_name(topic, BOOTH, booth_id))
+        if local_body_id is not None:
+            names.add(_version_name(topic, LOCAL_BODY, local_body_id))
+        if constituency_id is not None:
+            names.add(_version_name(topic, CONSTITUENCY, constituency_id))
+    for user_id in user_ids:
+        if user_id is not None:
+            names.add(_version_name(topic, USER, user_id))
+    get_backend().incr_versions(sorted(names))
+
+
+def cached(namespace, topic, scope, filters, compute):
+    """
+    Returns compute() for (namespace, scope, filters), from cache when the
+    scope's versions have not moved since it was stored.
+    scope: (role, level, ids) where level is one of the scope levels and ids
+    the assigned ids at that level (ignored for GLOBAL).
+    """
+    backend = get_backend()
+    role, level, ids = scope
+    ids = sorted(ids)
+    names = [_version_name(topic, GLOBAL)] if level == GLOBAL else [_version_name(topic, level, i) for i in ids]
+    versions = backend.get_versions(names)
+
+    raw = json.dumps([namespace, role, level, ids, filters, versions], sort_keys=True, default=str)
+    key = f'{namespace}:{hashlib.sha1(raw.encode()).hexdigest()}'
+
+    value = backend.get(key)
+    if value is None:
+        value = compute()
+        backend.set(key, value, _ttl())
+    return value
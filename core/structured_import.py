@@ -0,0 +1,207 @@
+"""
+Structured Import
+Reads voter rolls that arrive as spreadsheets (CSV / XLSX) and turns them into
+the same records the OCR pipeline produces ("Full Name", "EPIC_ID", ...), so
+they can be saved without going through PDFs.
+
+Rows are streamed: CSV through csv.reader, XLSX by iterparsing the first
+worksheet straight out of the zip (no spreadsheet library, nothing held but
+the shared strings table). Records are cleaned in chunks with the pipeline's
+own rules: normalize_many() on the Malayalam text fields, age healing and the
+Integrity Shield checks (missing critical fields, EPIC pattern).
+
+Unlike OCR output, EPIC numbers are only upper-cased and stripped of spaces,
+never truncated or look-alike healed: a spreadsheet value is authoritative and
+an unexpected format is flagged for review instead.
+"""
+
+import re
+import csv
+import zipfile
+from itertools import islice
+from xml.etree.ElementTree import iterparse
+
+from core.malayalam_normalizer import normalize_many
+from core.batch_processor import MALAYALAM_FIELDS, heal_age, integrity_flags
+
+CHUNK_SIZE = 5000
+
+# Record key -> accepted header spellings (compared lower-case, alphanumerics only)
+COLUMN_ALIASES = {
+    'Serial_OCR': ['serial', 'serialno', 'slno', 'sno', 'serialnumber', 'sl'],
+    'EPIC_ID': ['epic', 'epicid', 'epicno', 'epicnumber', 'voterid', 'idcardno', 'idcard'],
+    'Full Name': ['name', 'fullname', 'votername', 'electorname'],
+    'Relation Type': ['relationtype', 'relation'],
+    'Relation Name': ['relationname', 'fathername', 'guardianname', 'relativename', 'husbandname'],
+    'House Number': ['houseno', 'housenumber', 'housenum', 'doorno'],
+    'House Name': ['housename', 'house', 'address'],
+    'Age': ['age'],
+    'Gender': ['gender', 'sex'],
+    'Booth': ['booth', 'boothno', 'boothnumber', 'partno', 'partnumber'],
+    # Supplementary lists: A(ddition) / D(eletion) / M(odification), see revise_voter_records
+    'Action': ['action', 'change', 'revision', 'changetype'],
+}
+
+
+def _header_key(text):
+    return re.sub(r'[^a-z0-9]', '', str(text or '').lower())
+
+
+def map_columns(header, overrides=None):
+    """
+    Returns {column index: record key} for a header row.
+    overrides maps record keys to exact header names and wins over the aliases.
+    """
+    keys = [_header_key(h) for h in header]
+    mapping = {}
+    for record_key, name in (overrides or {}).items():
+        if record_key not in COLUMN_ALIASES:
+            raise ValueError(f"Unknown field {record_key!r} (expected one of {', '.join(COLUMN_ALIASES)})")
+        if _header_key(name) not in keys:
+            raise ValueError(f"Column {name!r} not found in the header")
+        mapping[keys.index(_header_key(name))] = record_key
+    for record_key, aliases in COLUMN_ALIASES.items():
+        if record_key in mapping.values():
+            continue
+        for alias in aliases:
+            if alias in keys and keys.index(alias) not in mapping:
+                mapping[keys.index(alias)] = record_key
+                break
+    if 'Full Name' not in mapping.values() and 'EPIC_ID' not in mapping.values():
+        raise ValueError("No name or EPIC column found; pass a column mapping")
+    return mapping
+
+
+def read_csv_rows(path):
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        yield from csv.reader(f)
+
+
+_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_PKG_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+
+def _column_index(ref):
+    """'C12' -> 2"""
+    index = 0
+    for char in ref:
+        if not char.isalpha():
+            break
+        index = index * 26 + ord(char.upper()) - 64
+    return index - 1
+
+
+def _first_sheet_path(archive):
+    names = set(archive.namelist())
+    try:
+        with archive.open('xl/workbook.xml') as f:
+            first = next(el for _, el in iterparse(f) if el.tag == f'{_NS}sheet')
+        rel_id = first.get(f'{_REL_NS}id')
+        with archive.open('xl/_rels/workbook.xml.rels') as f:
+            for _, el in iterparse(f):
+                if el.tag == f'{_PKG_REL_NS}Relationship' and el.get('Id') == rel_id:
+                    target = el.get('Target').lstrip('/')
+                    path = target if target.startswith('xl/') else f'xl/{target}'
+                    if path in names:
+                        return path
+    except (KeyError, StopIteration):
+        pass
+    return 'xl/worksheets/sheet1.xml'
+
+
+def _shared_strings(archive):
+    if 'xl/sharedStrings.xml' not in archive.namelist():
+        return []
+    strings = []
+    with archive.open('xl/sharedStrings.xml') as f:
+        for _, el in iterparse(f):
+            if el.tag == f'{_NS}si':
+                strings.append(''.join(t.text or '' for t in el.iter(f'{_NS}t')))
+                el.clear()
+    return strings
+
+
+def read_xlsx_rows(path):
+    """Rows of the first worksheet as lists of strings (empty cells -> '')."""
+    with zipfile.ZipFile(path) as archive:
+        strings = _shared_strings(archive)
+        with archive.open(_first_sheet_path(archive)) as f:
+            for _, el in iterparse(f):
+                if el.tag != f'{_NS}row':
+                    continue
+                row = []
+                for cell in el.iter(f'{_NS}c'):
+                    ref = cell.get('r')
+                    if ref:
+                        row.extend([''] * (_column_index(ref) - len(row)))
+                    kind = cell.get('t')
+                    if kind == 'inlineStr':
+                        value = ''.join(t.text or '' for t in cell.iter(f'{_NS}t'))
+                    else:
+                        v = cell.find(f'{_NS}v')
+                        value = v.text if v is not None and v.text is not None else ''
+                        if kind == 's' and value:
+                            value = strings[int(value)]
+                        elif kind in (None, 'n') and value.endswith('.0'):
+                            value = value[:-2]  # whole numbers stored as floats
+                    row.append(value)
+                el.clear()
+                yield row
+
+
+def read_rows(path):
+    lower = str(path).lower()
+    if lower.endswith('.csv'):
+        return read_csv_rows(path)
+    if lower.endswith('.xlsx'):
+        return read_xlsx_rows(path)
+    raise ValueError("Unsupported file type (expected .csv or .xlsx)")
+
+
+def clean_chunk(records):
+    """Applies normalization and the Integrity Shield to a list of records in place."""
+    for field in MALAYALAM_FIELDS:
+        values = normalize_many(re.sub(r'\s+', ' ', r.get(field, '')).strip() for r in records)
+        for record, value in zip(records, values):
+            record[field] = value
+    for record in records:
+        record['EPIC_ID'] = re.sub(r'\s+', '', record.get('EPIC_ID', '')).upper()
+        if record.get('Age'):
+            record['Age'] = heal_age(record['Age'].strip())
+        flags = integrity_flags(record)
+        record['Flags'] = ", ".join(flags)
+        record['Status'] = "⚠️ REVIEW" if flags else "✅ OK"
+    return records
+
+
+def iter_records(rows, column_map=None, chunk_size=CHUNK_SIZE):
+    """
+    Turns spreadsheet rows (header first) into cleaned records, chunk by chunk.
+    Each record carries its 1-based spreadsheet line as 'Line'; rows without a
+    serial get their position within their booth.
+    """
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        return
+    mapping = map_columns(header, column_map)
+    positions = {}
+    line = 1
+    while True:
+        batch = list(islice(rows, chunk_size))
+        if not batch:
+            return
+        chunk = []
+        for row in batch:
+            line += 1
+            if not any(str(v).strip() for v in row):
+                continue
+            record = {key: str(row[i]).strip() if i < len(row) else '' for i, key in mapping.items()}
+            record['Line'] = line
+            booth = record.get('Booth', '')
+            positions[booth] = positions.get(booth, 0) + 1
+            if not record.get('Serial_OCR', '').isdigit():
+                record['Serial_OCR'] = str(positions[booth])
+            chunk.append(record)
+        yield from clean_chunk(chunk)
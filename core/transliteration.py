@@ -0,0 +1,130 @@
+"""
+Malayalam / Manglish phonetic keys.
+
+romanize() turns Malayalam script into a plain Latin spelling; phonetic_key()
+then collapses the distinctions Manglish typing does not make reliably
+(aspiration, voicing, vowel length, doubled letters, retroflex vs dental).
+Both scripts reduce to the same key:
+
+    phonetic_key("സിന്ധു")          == phonetic_key("Sindhu")          == "sint"
+    phonetic_key("പള്ളിപ്പറമ്പിൽ")  == phonetic_key("Pallipparambil")  == "paliparampil"
+
+Keys are stored per voter as "<name>|<house>" (see voter_phonetic_key) and
+searched with a substring match on a pg_trgm index.
+"""
+
+import re
+
+# Independent vowels
+VOWELS = {
+    'അ': 'a', 'ആ': 'aa', 'ഇ': 'i', 'ഈ': 'ii', 'ഉ': 'u', 'ഊ': 'uu', 'ഋ': 'ri',
+    'എ': 'e', 'ഏ': 'e', 'ഐ': 'ai', 'ഒ': 'o', 'ഓ': 'o', 'ഔ': 'au',
+}
+
+# Dependent vowel signs (replace the consonant's inherent 'a')
+VOWEL_SIGNS = {
+    'ാ': 'aa', 'ി': 'i', 'ീ': 'ii', 'ു': 'u', 'ൂ': 'uu', 'ൃ': 'ri',
+    'െ': 'e', 'േ': 'e', 'ൈ': 'ai', 'ൊ': 'o', 'ോ': 'o', 'ൌ': 'au', 'ൗ': 'au',
+}
+
+CONSONANTS = {
+    'ക': 'k', 'ഖ': 'kh', 'ഗ': 'g', 'ഘ': 'gh', 'ങ': 'ng',
+    'ച': 'ch', 'ഛ': 'chh', 'ജ': 'j', 'ഝ': 'jh', 'ഞ': 'nj',
+    'ട': 't', 'ഠ': 'th', 'ഡ': 'd', 'ഢ': 'dh', 'ണ': 'n',
+    'ത': 'th', 'ഥ': 'th', 'ദ': 'd', 'ധ': 'dh', 'ന': 'n',
+    'പ': 'p', 'ഫ': 'ph', 'ബ': 'b', 'ഭ': 'bh', 'മ': 'm',
+    'യ': 'y', 'ര': 'r', 'റ': 'r', 'ല': 'l', 'ള': 'l', 'ഴ': 'zh', 'വ': 'v',
+    'ശ': 'sh', 'ഷ': 'sh', 'സ': 's', 'ഹ': 'h', 'ഺ': 't',
+}
+
+# Clusters whose pronunciation is not the sum of their parts
+CLUSTERS = {
+    'ന്റ': 'nt',   # "ente", "Santhosh" style spellings
+    'റ്റ': 'tt',
+    'ഞ്ഞ': 'nj',
+    'ങ്ങ': 'ng',
+    'ക്ഷ': 'ksh',
+}
+
+CHILLUS = {'ൺ': 'n', 'ൻ': 'n', 'ർ': 'r', 'ൽ': 'l', 'ൾ': 'l', 'ൿ': 'k', 'ൔ': 'm', 'ൕ': 'y', 'ൖ': 'zh'}
+
+OTHER_SIGNS = {'ം': 'm', 'ഃ': 'h'}
+
+VIRAMA = '്'
+ZERO_WIDTH = {'\u200c', '\u200d'}  # ZWNJ, ZWJ
+
+_WORDS = re.compile(r'[a-z]+')
+_REPEATS = re.compile(r'([a-z])\1+')
+# Latin distinctions Manglish spelling does not keep: voicing, f/ph, w/v, z/zh/s,
+# and the inherent vowel written as 'e' ("Puthen" for പുത്തൻ)
+_MERGE = str.maketrans('bdgfwze', 'ptkpvsa')
+
+
+def romanize(text):
+    """Malayalam script -> Latin letters; characters outside the Malayalam block pass through."""
+    if not text:
+        return ''
+    out = []
+    pending = False  # a consonant is waiting for its inherent 'a'
+    i, n = 0, len(text)
+    while i < n:
+        ch = text[i]
+        cluster = next((c for c in CLUSTERS if text.startswith(c, i)), None)
+        if cluster or ch in CONSONANTS:
+            if pending:
+                out.append('a')
+            out.append(CLUSTERS[cluster] if cluster else CONSONANTS[ch])
+            pending = True
+            i += len(cluster) if cluster else 1
+            continue
+
+        if ch in VOWEL_SIGNS:
+            out.append(VOWEL_SIGNS[ch])
+            pending = False
+        elif ch == VIRAMA:
+            pending = False
+        elif ch in ZERO_WIDTH:
+            pass
+        else:
+            if pending:
+                out.append('a')
+                pending = False
+            if ch in VOWELS:
+                out.append(VOWELS[ch])
+            elif ch in CHILLUS:
+                out.append(CHILLUS[ch])
+            elif ch in OTHER_SIGNS:
+                out.append(OTHER_SIGNS[ch])
+            else:
+                out.append(ch)
+        i += 1
+    if pending:
+        out.append('a')
+    return ''.join(out)
+
+
+def collapse(latin):
+    """Reduces a Latin spelling to its phonetic key (lowercase letters only)."""
+    words = []
+    for word in _WORDS.findall(latin.lower()):
+        word = word.replace('ee', 'i').replace('oo', 'u')
+        word = word.replace('ck', 'k').replace('x', 'ks').replace('q', 'k')
+        word = word.replace('h', '')  # kh gh ch th dh ph bh sh zh -> unaspirated
+        word = _REPEATS.sub(r'\1', word.translate(_MERGE))
+        # Word-final virama is often typed as a 'u' ("Kizhakkedathu" for കിഴക്കേടത്ത്)
+        if len(word) > 2 and word.endswith('u'):
+            word = word[:-1]
+        words.append(word)
+    return ''.join(words)
+
+
+def phonetic_key(text):
+    """Script-independent key for a name typed in Malayalam or Manglish."""
+    if not text or text == "N/A":
+        return ''
+    return collapse(romanize(text))
+
+
+def voter_phonetic_key(full_name, house_name):
+    """Stored search key: "<name key>|<house key>" (the separator stops matches spanning both)."""
+    return f"{phonetic_key(full_name)}|{phonetic_key(house_name)}"
@@ -0,0 +1,79 @@
+"""
+Normalizer Benchmark: legacy vs precompiled normalize_malayalam
+Generates synthetic Malayalam names (default 1M), checks that
+normalize_malayalam() and normalize_many() return exactly what the legacy
+function returns, and reports throughput for each.
+
+Usage:
+    python scripts/benchmark_normalizer.py
+    python scripts/benchmark_normalizer.py --count 200000 --seed 3
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from core.malayalam_normalizer import legacy_normalize_malayalam, normalize_malayalam, normalize_many
+
+# Syllables chosen to hit every rule: global ര്, boundary-sensitive ന് ല് ള ള് ണ് ക്,
+# protected conjuncts (ന്ധ ല്ല ള്ള ണ്ണ ക്ക) and already-atomic chillus.
+ONSETS = ["സി", "രാ", "ബി", "മോ", "ഗീ", "ശ്രീ", "കൃ", "പ", "വി", "ജോ", "അ", "ഷാ", "ലക്ഷ്", "മ", "നാ", "ക"]
+MIDDLES = ["ന്ധു", "ല്ലി", "ള്ള", "ണ്ണ", "ക്ക", "ര്ജ", "ന്ദ", "പ്പ", "റ", "ത്ത", "ജ", "ഹ", "മ്പ", "ന", "ട്ട"]
+CODAS = ["ന്", "ല്", "ള്", "ള", "ണ്", "ക്", "ര്", "ൻ", "ൽ", "ർ", "ൾ", "ം", "ു", "ി", "", "് "]
+PUNCT = ["", "", "", ".", ",", "!", "?", " "]
+
+
+def synthetic_names(count, seed=1):
+    rng = random.Random(seed)
+    names = []
+    for _ in range(count):
+        words = []
+        for _ in range(rng.randint(1, 3)):
+            word = rng.choice(ONSETS) + "".join(rng.choice(MIDDLES) for _ in range(rng.randint(0, 2))) + rng.choice(CODAS)
+            words.append(word + rng.choice(PUNCT))
+        names.append(" ".join(words).rstrip() if rng.random() < 0.9 else " ".join(words))
+    # Values the pipeline passes through untouched
+    names[::997] = ["N/A"] * len(names[::997])
+    names[::1999] = [""] * len(names[::1999])
+    return names
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Malayalam normalizer.")
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    names = synthetic_names(args.count, args.seed)
+
+    expected, t_legacy = timed(lambda: [legacy_normalize_malayalam(n) for n in names])
+    single, t_single = timed(lambda: [normalize_malayalam(n) for n in names])
+    bulk, t_bulk = timed(lambda: normalize_many(names))
+
+    changed = sum(1 for a, b in zip(names, expected) if a != b)
+    mismatches = sum(1 for a, b in zip(expected, single) if a != b) + sum(1 for a, b in zip(expected, bulk) if a != b)
+
+    print("=" * 60)
+    print(f"Names: {len(names):,} ({changed:,} changed by normalization)")
+    print(f"legacy_normalize_malayalam  {t_legacy:.2f}s   {len(names) / t_legacy:,.0f} names/sec")
+    print(f"normalize_malayalam         {t_single:.2f}s   {len(names) / t_single:,.0f} names/sec   ({t_legacy / t_single:.1f}x)")
+    print(f"normalize_many              {t_bulk:.2f}s   {len(names) / t_bulk:,.0f} names/sec   ({t_legacy / t_bulk:.1f}x)")
+    print(f"Identical output: {'YES' if not mismatches else f'NO ({mismatches} mismatches)'}")
+    print("=" * 60)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
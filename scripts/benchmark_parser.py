@@ -0,0 +1,179 @@
+"""
+Parser Microbenchmark: VoterParser vs CompiledVoterParser
+Replays a corpus of C_TEXT strings (the Malayalam text zone returned by
+OCREngine.extract_raw_data) through both parsers, asserts the outputs are
+identical and reports per-block timings.
+
+Usage:
+    python scripts/benchmark_parser.py                         # synthetic OCR-like corpus
+    python scripts/benchmark_parser.py --corpus data/c_text.json
+    python scripts/benchmark_parser.py --collect data/voter_crops/<batch_id> --save-corpus data/c_text.json
+
+Corpus formats: JSON list of strings, JSONL with a "C_TEXT" key per line,
+or a directory of .txt files (one block per file).
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from core.parser import VoterParser, CompiledVoterParser
+
+# OCR-style spelling variants taken from the parser's own keyword alternations
+NAME_KEYS = ["പേര്", "പേര", "പേര്‍", "പെര്", "രേര്", "റേര്", "രര"]
+REL_KEYS = [
+    "അച്ഛന്റെ പേര്", "അച്ചന്റെ പേര്", "അചഛന്‍ പേര്", "ഭർത്താവിന്റെ പേര്", "ഭര്‍ത്താവിന്റെ പേര",
+    "അമ്മയുടെ പേര്", "അമമയുടെ പേര്", "മറ്റുള്ളവർ", "മറ്റുളളവ പേര്",
+]
+HOUSE_KEYS = ["വീട്ടു നമ്പർ", "വിട്ടു നമ്പര്", "വീട്ടു നമ്പര്‍", "വീട് നമ്പർ", "വീടു നന്പം"]
+AGE_KEYS = ["പ്രായം", "പ്രായമ", "ായം", "പായം", "യം"]
+GENDER_KEYS = ["ലിംഗം", "ലിംഗ", "ലിഗം", "ിഗം"]
+GENDERS = ["പുരുഷൻ", "പുരുഷന്", "സ്ത്രീ", "Male", "Female", "സ്‌"]
+NAMES = ["സിന്ധു", "രാജൻ", "അനിത", "സുരേഷ്", "ബിന്ദു", "മോഹനൻ", "ശ്രീജ", "ജോസഫ്", "അബ്ദുൾ",
+         "കൃഷ്ണൻ", "വിനോദ്", "ലക്ഷ്മി", "ഷാജി കുമാർ", "മേരി ജോസ്"]
+HOUSES = ["പള്ളിപ്പറമ്പിൽ", "കിഴക്കേടത്ത്", "പുത്തൻവീട്", "ഹയസ് നമ്പർ", "റോസ് ഹൊസ്", "ഹൗസ",
+          "ഗ്രീൻ ഹോസ്", "തെക്കേമഠം", "വിട്ടില്‍", "ബി ഹസ്", "ഹാസ്"]
+AGES = ["45", "82", "3ട", "ദ5", "റ7", "G9", "4", "119", "മയ"]
+SEPARATORS = [":", " :", "+", " ", ": ", ":.", " - "]
+NOISE = ["|", "[", "]", ".", "_", "*", "+", "-"]
+
+
+def synthetic_corpus(n, seed=7):
+    """Builds OCR-like C_TEXT blocks: keyword variants, noise, wrapped lines, dropped lines."""
+    rng = random.Random(seed)
+
+    def noisy(line):
+        if rng.random() < 0.3:
+            line = rng.choice(NOISE) + line
+        if rng.random() < 0.2:
+            pos = rng.randint(0, len(line))
+            line = line[:pos] + rng.choice(NOISE) + line[pos:]
+        return line
+
+    corpus = []
+    for _ in range(n):
+        lines = []
+        if rng.random() < 0.5:
+            lines.append(f"{rng.randint(1, 1500)}")
+        name = rng.choice(NAMES)
+        if rng.random() < 0.15:
+            # Name wrapped over two lines
+            lines.append(f"{rng.choice(NAME_KEYS)}{rng.choice(SEPARATORS)}{name}")
+            lines.append(rng.choice(NAMES))
+        elif rng.random() < 0.1:
+            lines.append(name)  # keyword lost by OCR
+        else:
+            lines.append(f"{rng.choice(NAME_KEYS)}{rng.choice(SEPARATORS)}{'ABC1234567 ' if rng.random() < 0.05 else ''}{name}")
+        if rng.random() < 0.9:
+            lines.append(f"{rng.choice(REL_KEYS)}{rng.choice(SEPARATORS)}{rng.choice(NAMES)}")
+        if rng.random() < 0.9:
+            house = f"{rng.randint(1, 999)}{rng.choice(['', '/A', ' ബി', '-2'])} {rng.choice(HOUSES)}"
+            if rng.random() < 0.2:
+                head, _, rest = house.partition(" ")
+                lines.append(f"{rng.choice(HOUSE_KEYS)}{rng.choice(SEPARATORS)}{head}")
+                lines.append(rest)
+            else:
+                lines.append(f"{rng.choice(HOUSE_KEYS)}{rng.choice(SEPARATORS)}{house}")
+        if rng.random() < 0.85:
+            lines.append(f"{rng.choice(AGE_KEYS)}{rng.choice(SEPARATORS)}{rng.choice(AGES)} {rng.choice(GENDER_KEYS)}{rng.choice(SEPARATORS)}{rng.choice(GENDERS)}")
+        elif rng.random() < 0.5:
+            lines.append(f"{rng.choice(AGES)} {rng.choice(GENDERS)}")
+        if rng.random() < 0.1:
+            lines.insert(rng.randint(0, len(lines)), rng.choice(["ഫോട്ടോ", "Photo", "ലഭ്യമല്ല", ":", "..."]))
+        corpus.append("\n".join(noisy(line) for line in lines))
+    return corpus
+
+
+def load_corpus(path):
+    if os.path.isdir(path):
+        corpus = []
+        for name in sorted(os.listdir(path)):
+            if name.endswith(".txt"):
+                with open(os.path.join(path, name), encoding="utf-8") as f:
+                    corpus.append(f.read())
+        return corpus
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if text.lstrip().startswith("["):
+        return [item["C_TEXT"] if isinstance(item, dict) else item for item in json.loads(text)]
+    return [json.loads(line)["C_TEXT"] for line in text.splitlines() if line.strip()]
+
+
+def collect_corpus(crops_dir):
+    """OCRs saved voter crops (e.g. data/voter_crops/<batch_id>) and returns their C_TEXT strings."""
+    import cv2
+    from core.ocr_engine import OCREngine
+    engine = OCREngine()
+    corpus = []
+    for name in sorted(os.listdir(crops_dir)):
+        if not name.endswith(".png"):
+            continue
+        img = cv2.imread(os.path.join(crops_dir, name))
+        if img is not None:
+            corpus.append(engine.extract_raw_data(img)["C_TEXT"])
+    return corpus
+
+
+def time_parser(parser, corpus, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for block in corpus:
+            parser.parse_text_block(block)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Compare VoterParser and CompiledVoterParser.")
+    arg_parser.add_argument("--corpus", help="Saved C_TEXT corpus (JSON list, JSONL or directory of .txt)")
+    arg_parser.add_argument("--collect", help="OCR the crops in this directory to build the corpus (needs Tesseract)")
+    arg_parser.add_argument("--save-corpus", help="Write the corpus used to this JSON file")
+    arg_parser.add_argument("--synthetic", type=int, default=20000, help="Synthetic corpus size when no corpus is given")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="Timing runs per parser (best is reported)")
+    args = arg_parser.parse_args(argv)
+
+    if args.collect:
+        corpus = collect_corpus(args.collect)
+    elif args.corpus:
+        corpus = load_corpus(args.corpus)
+    else:
+        corpus = synthetic_corpus(args.synthetic)
+
+    if args.save_corpus:
+        with open(args.save_corpus, "w", encoding="utf-8") as f:
+            json.dump(corpus, f, ensure_ascii=False, indent=1)
+
+    legacy, compiled = VoterParser(), CompiledVoterParser()
+
+    mismatches = 0
+    for block in corpus:
+        expected, actual = legacy.parse_text_block(block), compiled.parse_text_block(block)
+        if expected != actual:
+            mismatches += 1
+            if mismatches <= 5:
+                print("MISMATCH:", json.dumps({"C_TEXT": block, "legacy": expected, "compiled": actual}, ensure_ascii=False))
+
+    t_legacy = time_parser(legacy, corpus, args.repeat)
+    t_compiled = time_parser(compiled, corpus, args.repeat)
+
+    n = max(len(corpus), 1)
+    print("=" * 60)
+    print(f"Corpus: {len(corpus)} blocks")
+    print(f"legacy    {t_legacy:.3f}s   {t_legacy / n * 1e6:.1f} us/block")
+    print(f"compiled  {t_compiled:.3f}s   {t_compiled / n * 1e6:.1f} us/block   ({t_legacy / t_compiled:.2f}x)")
+    print(f"Identical output: {'YES' if not mismatches else f'NO ({mismatches} mismatches)'}")
+    print("=" * 60)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
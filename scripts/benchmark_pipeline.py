@@ -0,0 +1,240 @@
+"""
+End-to-End OCR Pipeline Benchmark
+Runs PDFProcessor -> VoterDetector -> BatchProcessor on a synthetic roll (see
+generate_synthetic_roll.py) and reports throughput, per-stage latency and
+field-level accuracy against the ground truth.
+
+Usage:
+    python scripts/benchmark_pipeline.py --pages 3
+    python scripts/benchmark_pipeline.py --roll data/synthetic/roll_01 --workers 4 --json report.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+import concurrent.futures
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from core.pdf_processor import PDFProcessor
+from core.detector import VoterDetector
+from core.batch_processor import BatchProcessor
+from core.malayalam_normalizer import normalize_malayalam
+from generate_synthetic_roll import generate_roll
+
+FIELDS = ["Serial_OCR", "EPIC_ID", "Full Name", "Relation Type", "Relation Name",
+          "House Number", "House Name", "Age", "Gender"]
+NORMALIZED_FIELDS = {"Full Name", "Relation Name", "House Name"}
+
+_processor = None
+
+
+def _init_worker():
+    global _processor
+    _processor = BatchProcessor()
+
+
+def _ocr_task(args):
+    """Worker: OCR + parse one crop, timing only process_box itself."""
+    crop_path, expected_serial = args
+    start = time.perf_counter()
+    res = _processor.process_box(crop_path, expected_serial)
+    res["_latency"] = time.perf_counter() - start
+    res["_crop"] = crop_path
+    return res
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def _latency_summary(values):
+    return {
+        "count": len(values),
+        "total_s": round(sum(values), 4),
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "max_ms": round(max(values) * 1000, 2) if values else 0.0,
+    }
+
+
+def _match_boxes(detected, expected, scale, tolerance):
+    """Pairs detected (x, y, w, h) boxes with ground-truth boxes by nearest centre."""
+    pairs = {}
+    used = set()
+    for d_idx, (x, y, w, h) in enumerate(detected):
+        cx, cy = (x + w / 2) / scale, (y + h / 2) / scale
+        best, best_dist = None, None
+        for t_idx, truth in enumerate(expected):
+            if t_idx in used:
+                continue
+            tx, ty, tw, th = truth["box"]
+            dist = abs(tx + tw / 2 - cx) + abs(ty + th / 2 - cy)
+            if best_dist is None or dist < best_dist:
+                best, best_dist = t_idx, dist
+        if best is not None and best_dist <= tolerance:
+            used.add(best)
+            pairs[d_idx] = expected[best]
+    return pairs
+
+
+def run_benchmark(roll_dir, work_dir, dpi=300, workers=None):
+    with open(os.path.join(roll_dir, "ground_truth.json"), encoding="utf-8") as f:
+        truth = json.load(f)
+
+    pdf_path = os.path.join(roll_dir, truth["pdf"])
+    pages_dir = os.path.join(work_dir, "pages")
+    crops_dir = os.path.join(work_dir, "crops")
+    # Detected boxes are in process-DPI pixels, truth boxes in render-DPI pixels
+    scale = dpi / truth["dpi"]
+
+    pdf_processor = PDFProcessor()
+    detector = VoterDetector()
+
+    wall_start = time.perf_counter()
+
+    # Stage 1: PDF -> page images
+    t0 = time.perf_counter()
+    page_images = pdf_processor.convert_to_images(pdf_path, pages_dir, dpi=dpi)
+    extract_total = time.perf_counter() - t0
+
+    # Stage 2: box detection + crop
+    detect_latencies = []
+    crop_truth = {}
+    total_voters = 0
+    for page_no, page_path in enumerate(page_images, start=1):
+        t0 = time.perf_counter()
+        boxes = detector.detect_voter_boxes(page_path)
+        if boxes:
+            count = detector.crop_and_save(page_path, boxes, crops_dir, page_no, start_index=total_voters)
+        else:
+            count = 0
+        detect_latencies.append(time.perf_counter() - t0)
+
+        expected = [v for v in truth["voters"] if v["page"] == page_no]
+        for d_idx, voter in _match_boxes(boxes, expected, scale, tolerance=60).items():
+            crop_name = f"voter_{total_voters + d_idx:04d}_pg{page_no:03d}_box{d_idx:02d}.png"
+            crop_truth[crop_name] = voter
+        total_voters += count
+
+    # Stage 3: OCR + parse + integrity shield (parallel, like run_processing)
+    crop_files = sorted(os.listdir(crops_dir)) if os.path.isdir(crops_dir) else []
+    tasks = [(os.path.join(crops_dir, name), i + 1) for i, name in enumerate(crop_files)]
+    workers = workers or max(1, min(multiprocessing.cpu_count() - 1, 8))
+    t0 = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        results = list(executor.map(_ocr_task, tasks, chunksize=4))
+    ocr_wall = time.perf_counter() - t0
+
+    wall = time.perf_counter() - wall_start
+
+    # Accuracy
+    field_hits = {f: 0 for f in FIELDS}
+    matched = 0
+    ok_status = 0
+    for res in results:
+        expected = crop_truth.get(os.path.basename(res["_crop"]))
+        if res.get("Status") == "✅ OK":
+            ok_status += 1
+        if not expected:
+            continue
+        matched += 1
+        for field in FIELDS:
+            want = str(expected[field])
+            if field in NORMALIZED_FIELDS:
+                want = normalize_malayalam(want)
+            if str(res.get(field, "")).strip() == want:
+                field_hits[field] += 1
+
+    n_pages = len(page_images)
+    n_expected = len(truth["voters"])
+    return {
+        "roll": roll_dir,
+        "render_dpi": truth["dpi"],
+        "process_dpi": dpi,
+        "noise": truth.get("noise"),
+        "skew": truth.get("skew"),
+        "workers": workers,
+        "pages": n_pages,
+        "voters_expected": n_expected,
+        "voters_detected": total_voters,
+        "voters_matched": matched,
+        "detection_recall": round(matched / n_expected, 4) if n_expected else 0.0,
+        "wall_s": round(wall, 3),
+        "pages_per_sec": round(n_pages / wall, 3) if wall else 0.0,
+        "voters_per_sec": round(len(results) / wall, 3) if wall else 0.0,
+        "stages": {
+            "extract": {"total_s": round(extract_total, 4), "per_page_ms": round(extract_total / max(n_pages, 1) * 1000, 2)},
+            "detect": _latency_summary(detect_latencies),
+            "ocr": dict(_latency_summary([r["_latency"] for r in results]), wall_s=round(ocr_wall, 4)),
+        },
+        "status_ok_rate": round(ok_status / len(results), 4) if results else 0.0,
+        "field_accuracy": {f: round(field_hits[f] / matched, 4) if matched else 0.0 for f in FIELDS},
+    }
+
+
+def print_report(report):
+    print("=" * 60)
+    print(f"Roll: {report['roll']}  (render {report['render_dpi']} DPI -> process {report['process_dpi']} DPI, noise={report['noise']}, skew={report['skew']})")
+    print(f"Pages: {report['pages']}   Voters: {report['voters_detected']}/{report['voters_expected']} detected, recall {report['detection_recall']:.1%}")
+    print(f"Wall: {report['wall_s']}s   {report['pages_per_sec']} pages/sec   {report['voters_per_sec']} voters/sec   ({report['workers']} OCR workers)")
+    print("-" * 60)
+    s = report["stages"]
+    print(f"extract   total {s['extract']['total_s']}s   {s['extract']['per_page_ms']} ms/page")
+    print(f"detect    p50 {s['detect']['p50_ms']} ms   p95 {s['detect']['p95_ms']} ms   (per page)")
+    print(f"ocr       p50 {s['ocr']['p50_ms']} ms   p95 {s['ocr']['p95_ms']} ms   (per voter, wall {s['ocr']['wall_s']}s)")
+    print("-" * 60)
+    print(f"Status OK rate: {report['status_ok_rate']:.1%}")
+    for field, acc in report["field_accuracy"].items():
+        print(f"  {field:<15} {acc:.1%}")
+    print("=" * 60)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the OCR pipeline on a synthetic roll.")
+    parser.add_argument("--roll", help="Existing synthetic roll directory (skips generation)")
+    parser.add_argument("--pages", type=int, default=2)
+    parser.add_argument("--render-dpi", type=int, default=300)
+    parser.add_argument("--dpi", type=int, default=300, help="DPI used by PDFProcessor (same as the API)")
+    parser.add_argument("--noise", type=float, default=0.1)
+    parser.add_argument("--skew", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--json", dest="json_path", help="Write the report as JSON to this path")
+    parser.add_argument("--keep", action="store_true", help="Keep intermediate page images and crops")
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix="ocr_bench_")
+    try:
+        roll_dir = args.roll
+        if not roll_dir:
+            roll_dir = os.path.join(work_dir, "roll")
+            generate_roll(roll_dir, args.pages, args.render_dpi, args.noise, args.skew, args.seed)
+
+        report = run_benchmark(roll_dir, work_dir, dpi=args.dpi, workers=args.workers)
+        print_report(report)
+        if args.json_path:
+            with open(args.json_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+    finally:
+        if args.keep:
+            print(f"Intermediate files kept in {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""
+Voter Search Benchmark
+Seeds a synthetic constituency (default 5M voters, loaded with COPY) and
+measures get_voter_list() search latency per query class, optionally against
+a forced sequential scan to show what the trigram indexes buy.
+
+Usage:
+    python scripts/benchmark_voter_search.py --seed-rows 5000000      # seed once (slow), then benchmark
+    python scripts/benchmark_voter_search.py --queries 200 --seqscan  # reuse seeded data, compare with seq scan
+    python scripts/benchmark_voter_search.py --cleanup                # drop the synthetic constituency
+"""
+
+import os
+import io
+import sys
+import time
+import random
+import argparse
+import django
+
+# Setup Paths
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_PATH = os.path.join(BASE_DIR, 'voter_vault')
+for path in (BASE_DIR, PROJECT_PATH, os.path.dirname(os.path.abspath(__file__))):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'voter_vault.settings')
+django.setup()
+
+from django.db import connection, transaction
+from core_db.models import Booth, BoothStats, Constituency, LocalBody, UserProfile, Voter
+from core.db_bridge import get_voter_list
+from core.transliteration import voter_phonetic_key
+from generate_synthetic_roll import GIVEN_NAMES, HOUSE_NAMES, EPIC_LETTERS
+
+BENCH_CONSTITUENCY = "BENCH-SEARCH"
+VOTERS_PER_BOOTH = 1000
+HOUSE_SUFFIXES = ["", " വീട്", " ഹൗസ്", " പറമ്പ്", " ഭവൻ", " നിവാസ്", " മന", " കോട്ടേജ്"]
+# Latin spellings agents type for names in GIVEN_NAMES / HOUSE_NAMES
+MANGLISH_NAMES = ["Sindhu", "Rajan", "Suresh", "Bindu", "Mohanan", "Sreeja", "Joseph", "Krishnan",
+                  "Lakshmi", "Pallipparambil", "Kizhakkedathu", "Puthenveedu", "Maliyekkal", "Chirayil"]
+COPY_COLUMNS = [
+    'booth_id', 'constituency_id', 'local_body_id', 'serial_no', 'epic_id', 'full_name', 'relation_type', 'relation_name',
+    'house_no', 'house_name', 'age', 'gender_code', 'source_file', 'original_serial', 'status_code',
+    'phonetic_key', 'created_at', 'updated_at',
+]
+
+
+def _epic(rng):
+    return "".join(rng.choice(EPIC_LETTERS) for _ in range(3)) + f"{rng.randint(0, 9999999):07d}"
+
+
+def seed(rows, seed_value=11, batch=200_000):
+    """COPYs `rows` synthetic voters into the benchmark constituency."""
+    rng = random.Random(seed_value)
+    constituency, _ = Constituency.objects.get_or_create(name=BENCH_CONSTITUENCY)
+    local_body, _ = LocalBody.objects.get_or_create(constituency=constituency, name=BENCH_CONSTITUENCY, body_type='PANCHAYAT')
+    start_no = constituency.booths.count()
+    n_booths = -(-rows // VOTERS_PER_BOOTH)
+    Booth.objects.bulk_create([
+        Booth(constituency=constituency, local_body=local_body, number=f"B{start_no + i:05d}")
+        for i in range(n_booths)
+    ])
+    booth_ids = list(constituency.booths.order_by('-id').values_list('id', flat=True)[:n_booths])
+
+    table = Voter._meta.db_table
+    now = time.strftime('%Y-%m-%d %H:%M:%S+00')
+    written = 0
+    start = time.perf_counter()
+    while written < rows:
+        buf = io.StringIO()
+        for i in range(written, min(written + batch, rows)):
+            name = rng.choice(GIVEN_NAMES) + ("" if rng.random() < 0.6 else " " + rng.choice(GIVEN_NAMES))
+            house = rng.choice(HOUSE_NAMES) + rng.choice(HOUSE_SUFFIXES)
+            serial = i % VOTERS_PER_BOOTH + 1
+            buf.write("\t".join([
+                str(booth_ids[i // VOTERS_PER_BOOTH]), str(constituency.id), str(local_body.id), str(serial), _epic(rng), name, "Father",
+                rng.choice(GIVEN_NAMES), str(rng.randint(1, 999)), house, str(rng.randint(18, 95)),
+                str(Voter.GENDER_CODES[rng.choice(["Male", "Female"])]), "benchmark", str(serial),
+                str(Voter.STATUS_CODES["VERIFIED"]),
+                voter_phonetic_key(name, house), now, now,
+            ]) + "\n")
+        buf.seek(0)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.cursor.copy_expert(f"COPY {table} ({', '.join(COPY_COLUMNS)}) FROM STDIN", buf)
+        written = min(written + batch, rows)
+        print(f"Seeded {written:,}/{rows:,} voters ({written / (time.perf_counter() - start):,.0f} rows/sec)")
+
+    BoothStats.rebuild(booth_ids=booth_ids)
+    with connection.cursor() as cursor:
+        cursor.execute(f"ANALYZE {table}")
+    return constituency
+
+
+def cleanup():
+    constituency = Constituency.objects.filter(name=BENCH_CONSTITUENCY).first()
+    if not constituency:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {Voter._meta.db_table} WHERE booth_id IN "
+            f"(SELECT id FROM {Booth._meta.db_table} WHERE constituency_id = %s)",
+            [constituency.id],
+        )
+    constituency.delete()
+    print(f"Removed {BENCH_CONSTITUENCY}")
+
+
+def query_workload(n, seed_value=5):
+    """(class, term) pairs mirroring what agents type into the search box."""
+    rng = random.Random(seed_value)
+    sample = list(Voter.objects.filter(booth__constituency__name=BENCH_CONSTITUENCY)
+                  .order_by().values_list('epic_id', flat=True)[:5000])
+    classes = {
+        "name": lambda: rng.choice(GIVEN_NAMES),
+        "name_fragment": lambda: (lambda s: s[:max(3, len(s) // 2)])(rng.choice(GIVEN_NAMES)),
+        "house": lambda: rng.choice(HOUSE_NAMES),
+        "manglish": lambda: rng.choice(MANGLISH_NAMES),
+        "epic_full": lambda: rng.choice(sample) if sample else _epic(rng),
+        "epic_prefix": lambda: (rng.choice(sample) if sample else _epic(rng))[:6],
+        "miss": lambda: "".join(rng.choice("xyzq") for _ in range(6)),
+    }
+    return [(name, make()) for _ in range(n) for name, make in classes.items()]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def run(workload, constituency_id, force_seqscan=False):
+    profile = UserProfile(role='SUPERUSER')
+    timings = {}
+    with transaction.atomic(), connection.cursor() as cursor:
+        if force_seqscan:
+            cursor.execute("SET LOCAL enable_indexscan = off")
+            cursor.execute("SET LOCAL enable_bitmapscan = off")
+        for cls, term in workload:
+            start = time.perf_counter()
+            get_voter_list(profile, search=term, page=1, page_size=50, constituency_id=constituency_id)
+            timings.setdefault(cls, []).append(time.perf_counter() - start)
+    return timings
+
+
+def print_timings(label, timings):
+    print(f"--- {label} ---")
+    everything = [t for values in timings.values() for t in values]
+    for cls, values in list(timings.items()) + [("ALL", everything)]:
+        print(f"{cls:<14} n={len(values):<5} p50 {percentile(values, 50) * 1000:8.1f} ms   "
+              f"p95 {percentile(values, 95) * 1000:8.1f} ms   max {max(values) * 1000:8.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark voter search latency.")
+    parser.add_argument("--seed-rows", type=int, default=0, help="Seed this many synthetic voters first")
+    parser.add_argument("--queries", type=int, default=100, help="Queries per class")
+    parser.add_argument("--seqscan", action="store_true", help="Also run with index scans disabled (pre-index baseline)")
+    parser.add_argument("--cleanup", action="store_true", help="Remove the synthetic constituency and exit")
+    args = parser.parse_args(argv)
+
+    if args.cleanup:
+        cleanup()
+        return 0
+    if args.seed_rows:
+        seed(args.seed_rows)
+
+    constituency = Constituency.objects.filter(name=BENCH_CONSTITUENCY).first()
+    if not constituency:
+        print(f"No {BENCH_CONSTITUENCY} data: run with --seed-rows first")
+        return 1
+    total = Voter.objects.filter(booth__constituency=constituency).count()
+    print(f"{BENCH_CONSTITUENCY}: {total:,} voters")
+
+    workload = query_workload(args.queries)
+    print_timings("indexed", run(workload, constituency.id))
+    if args.seqscan:
+        print_timings("sequential scan", run(workload, constituency.id, force_seqscan=True))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
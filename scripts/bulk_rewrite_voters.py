@@ -0,0 +1,338 @@
+"""
+Bulk Rewrite: set-based, resumable maintenance passes over the Voter table
+Streams voters in id-ordered chunks over a server-side cursor, runs a text
+transform on each chunk in worker processes and writes only the changed rows
+back in one statement per chunk. Progress is checkpointed after every chunk,
+so an interrupted run picks up where it stopped.
+
+Usage:
+    python scripts/bulk_rewrite_voters.py normalize
+    python scripts/bulk_rewrite_voters.py fix-conjuncts --dry-run
+    python scripts/bulk_rewrite_voters.py normalize --workers 4 --chunk-size 5000 --restart
+
+Transforms:
+    normalize       normalize_malayalam() on full/relation/house name
+    fix-conjuncts   undo chillu-before-consonant damage, then normalize
+    phonetic-key    (re)compute the cross-script search key from name + house name
+
+Write methods:
+    temp-table      COPY changed rows into a temp table and UPDATE ... FROM it (PostgreSQL).
+                    Rows edited by someone else since they were read are left alone.
+    bulk-update     Django bulk_update (any database)
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import multiprocessing
+from collections import deque
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from core.malayalam_normalizer import normalize_many, reverse_incorrect_chillu_conversions
+from core.transliteration import voter_phonetic_key
+
+CHECKPOINT_DIR = os.path.join(BASE_DIR, 'data', 'checkpoints')
+REPORT_DIR = os.path.join(BASE_DIR, 'data', 'reports')
+
+MALAYALAM_FIELDS = ('full_name', 'relation_name', 'house_name')
+
+
+def _normalize_columns(columns):
+    return {field: normalize_many(columns[field]) for field in MALAYALAM_FIELDS}
+
+
+def _fix_conjunct_columns(columns):
+    return {
+        field: normalize_many([reverse_incorrect_chillu_conversions(v) for v in columns[field]])
+        for field in MALAYALAM_FIELDS
+    }
+
+
+def _phonetic_key_columns(columns):
+    return {'phonetic_key': [
+        voter_phonetic_key(name, house) for name, house in zip(columns['full_name'], columns['house_name'])
+    ]}
+
+
+# name -> (fields read, fields written, column transform)
+# A column transform takes {field: [values]} for the read fields and returns
+# {field: [new values]} for the written fields, in the same row order.
+TRANSFORMS = {
+    'normalize': (MALAYALAM_FIELDS, MALAYALAM_FIELDS, _normalize_columns),
+    'fix-conjuncts': (MALAYALAM_FIELDS, MALAYALAM_FIELDS, _fix_conjunct_columns),
+    'phonetic-key': (('full_name', 'house_name'), ('phonetic_key',), _phonetic_key_columns),
+}
+
+
+def selected_fields(name):
+    """Columns streamed for a transform: what it reads plus the current values of what it writes."""
+    reads, writes, _ = TRANSFORMS[name]
+    return tuple(reads) + tuple(f for f in writes if f not in reads)
+
+
+def transform_chunk(name, rows):
+    """
+    Worker: applies transform `name` to rows of (id, *selected_fields(name)).
+    Returns [(id, {field: old}, {field: new})] for the rows that changed,
+    with every written field present in both dicts.
+    """
+    _, writes, fn = TRANSFORMS[name]
+    columns = {field: [row[i + 1] for row in rows] for i, field in enumerate(selected_fields(name))}
+    new_columns = fn(columns)
+
+    changes = []
+    for idx, row in enumerate(rows):
+        old = {field: columns[field][idx] for field in writes}
+        new = {field: new_columns[field][idx] for field in writes}
+        if new != old:
+            changes.append((row[0], old, new))
+    return changes
+
+
+def _setup_django():
+    """Django is only needed in the parent; workers just run transforms."""
+    import django
+    project_path = os.path.join(BASE_DIR, 'voter_vault')
+    if project_path not in sys.path:
+        sys.path.insert(0, project_path)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'voter_vault.settings')
+    django.setup()
+
+
+def _stream_chunks(queryset, fields, after_id, chunk_size):
+    """Yields lists of (id, *fields) in id order, starting after `after_id`."""
+    rows = (
+        queryset.filter(id__gt=after_id)
+        .order_by('id')
+        .values_list('id', *fields)
+        .iterator(chunk_size=chunk_size)  # server-side cursor on PostgreSQL
+    )
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _copy_value(value):
+    """Text-format COPY encoding: \\N for NULL, backslash-escape the delimiters."""
+    if value is None:
+        return '\\N'
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+def write_temp_table(changes, writes):
+    """
+    Applies changes with COPY into a temp table and one UPDATE ... FROM.
+    Only rows whose written fields still hold the values we read are updated.
+    Returns the number of rows updated.
+    """
+    import io
+    from django.db import connection, transaction
+    from core_db.models import Voter
+
+    table = connection.ops.quote_name(Voter._meta.db_table)
+    cols = [Voter._meta.get_field(f).column for f in writes]
+    stage_cols = ['id bigint PRIMARY KEY'] + [f'new_{c} text' for c in cols] + [f'old_{c} text' for c in cols]
+    buf = io.StringIO()
+    for voter_id, old, new in changes:
+        values = [voter_id] + [new[f] for f in writes] + [old[f] for f in writes]
+        buf.write('\t'.join(_copy_value(v) for v in values) + '\n')
+    buf.seek(0)
+
+    set_clause = ', '.join(f'{connection.ops.quote_name(c)} = s.new_{c}' for c in cols)
+    guard = ' AND '.join(f'v.{connection.ops.quote_name(c)} IS NOT DISTINCT FROM s.old_{c}' for c in cols)
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f"CREATE TEMP TABLE voter_rewrite_stage ({', '.join(stage_cols)}) ON COMMIT DROP")
+            cursor.cursor.copy_expert("COPY voter_rewrite_stage FROM STDIN", buf)
+            cursor.execute(
+                f"UPDATE {table} v SET {set_clause}, updated_at = now() "
+                f"FROM voter_rewrite_stage s WHERE v.id = s.id AND {guard}"
+            )
+            return cursor.rowcount
+
+
+def write_bulk_update(changes, writes, batch_size=1000):
+    """Applies changes with bulk_update (portable, last write wins)."""
+    from django.db import transaction
+    from django.utils import timezone
+    from core_db.models import Voter
+
+    now = timezone.now()
+    objs = []
+    for voter_id, old, new in changes:
+        voter = Voter(id=voter_id, updated_at=now)
+        for field in writes:
+            setattr(voter, field, new[field])
+        objs.append(voter)
+    with transaction.atomic():
+        Voter.objects.bulk_update(objs, list(writes) + ['updated_at'], batch_size=batch_size)
+    return len(objs)
+
+
+def _load_checkpoint(path):
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    return None
+
+
+def _save_checkpoint(path, state):
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+def run(transform, dry_run=False, workers=None, chunk_size=2000, method='auto',
+        checkpoint=None, restart=False, report=None, limit=None):
+    """
+    Runs one bulk rewrite pass. Returns a summary dict.
+    """
+    _setup_django()
+    from django.db import connection
+    from core_db.models import Voter
+
+    _, writes, _ = TRANSFORMS[transform]
+    if method == 'auto':
+        method = 'temp-table' if connection.vendor == 'postgresql' else 'bulk-update'
+
+    checkpoint = checkpoint or os.path.join(CHECKPOINT_DIR, f'{transform}.json')
+    state = None if (restart or dry_run) else _load_checkpoint(checkpoint)
+    if state and state.get('completed'):
+        print(f"Previous '{transform}' run completed at {state['updated_at']}. Use --restart to run again.")
+        return state
+    if state:
+        print(f"Resuming '{transform}' after voter id {state['last_id']} ({state['processed']} processed so far)")
+    else:
+        state = {'transform': transform, 'method': method, 'last_id': 0, 'processed': 0,
+                 'changed': 0, 'updated': 0, 'started_at': time.strftime('%Y-%m-%d %H:%M:%S')}
+
+    report_writer = report_file = None
+    if dry_run:
+        report = report or os.path.join(REPORT_DIR, f'{transform}_dry_run.csv')
+        os.makedirs(os.path.dirname(report), exist_ok=True)
+        report_file = open(report, 'w', newline='', encoding='utf-8')
+        report_writer = csv.writer(report_file)
+        report_writer.writerow(['voter_id', 'field', 'before', 'after'])
+    else:
+        os.makedirs(os.path.dirname(checkpoint), exist_ok=True)
+
+    queryset = Voter.objects.all()
+    total = queryset.filter(id__gt=state['last_id']).count()
+    if limit:
+        total = min(total, limit)
+    print(f"{transform}: {total} voters to scan ({'dry run' if dry_run else method}, chunks of {chunk_size})")
+
+    workers = workers or max(1, min(multiprocessing.cpu_count() - 1, 8))
+    start = time.perf_counter()
+    scanned = 0
+
+    # count() above opened the DB connection: close it so forked workers do not
+    # inherit (and share) its socket; the parent reconnects on its next query
+    if workers > 1:
+        connection.close()
+    pool = multiprocessing.Pool(workers) if workers > 1 else None
+    try:
+        pending = deque()
+
+        def drain(block):
+            while pending and (block or not pool or pending[0][1].ready()):
+                last_id, result, size = pending.popleft()
+                changes = result.get() if pool else result
+                if dry_run:
+                    for voter_id, old, new in changes:
+                        for field, value in new.items():
+                            if value != old[field]:
+                                report_writer.writerow([voter_id, field, old[field], value])
+                    updated = 0
+                elif changes:
+                    writer = write_temp_table if method == 'temp-table' else write_bulk_update
+                    updated = writer(changes, writes)
+                else:
+                    updated = 0
+                state['last_id'] = last_id
+                state['processed'] += size
+                state['changed'] += len(changes)
+                state['updated'] += updated
+                state['updated_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+                if not dry_run:
+                    _save_checkpoint(checkpoint, state)
+                elapsed = time.perf_counter() - start
+                print(f"Processed {state['processed']} voters, {state['changed']} changed, "
+                      f"{state['updated']} written ({state['processed'] / elapsed if elapsed else 0:,.0f} rows/sec)")
+                if block:
+                    return
+
+        for chunk in _stream_chunks(queryset, selected_fields(transform), state['last_id'], chunk_size):
+            if limit and scanned >= limit:
+                break
+            if limit:
+                chunk = chunk[:limit - scanned]
+            scanned += len(chunk)
+            if pool:
+                pending.append((chunk[-1][0], pool.apply_async(transform_chunk, (transform, chunk)), len(chunk)))
+            else:
+                pending.append((chunk[-1][0], transform_chunk(transform, chunk), len(chunk)))
+            # Keep a bounded number of chunks in flight; results are applied in id order
+            if len(pending) >= workers * 2:
+                drain(block=True)
+            drain(block=False)
+        while pending:
+            drain(block=True)
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+        if report_file:
+            report_file.close()
+
+    elapsed = time.perf_counter() - start
+    if not dry_run and not limit:
+        state['completed'] = True
+        _save_checkpoint(checkpoint, state)
+
+    print("=" * 60)
+    print(f"{transform} {'dry run ' if dry_run else ''}complete in {elapsed:.1f}s")
+    print(f"Voters scanned: {scanned}")
+    print(f"Voters changed: {state['changed']}")
+    if dry_run:
+        print(f"Diff report: {report}")
+    else:
+        print(f"Voters written: {state['updated']}")
+        if state['updated'] < state['changed']:
+            print(f"Skipped (edited since read): {state['changed'] - state['updated']}")
+    return state
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resumable bulk rewrite of voter text fields.")
+    parser.add_argument("transform", choices=sorted(TRANSFORMS))
+    parser.add_argument("--dry-run", action="store_true", help="Write a CSV diff report instead of updating")
+    parser.add_argument("--report", help="Diff report path (dry run)")
+    parser.add_argument("--workers", type=int, default=None, help="Transform processes (1 = in-process)")
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--method", choices=["auto", "temp-table", "bulk-update"], default="auto")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: data/checkpoints/<transform>.json)")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many voters (no completion mark)")
+    args = parser.parse_args(argv)
+
+    run(args.transform, dry_run=args.dry_run, workers=args.workers, chunk_size=args.chunk_size,
+        method=args.method, checkpoint=args.checkpoint, restart=args.restart, report=args.report,
+        limit=args.limit)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,8 @@ import django
 # Setup Paths
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 PROJECT_PATH = os.path.join(BASE_DIR, 'voter_vault')
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
 if PROJECT_PATH not in sys.path:
     sys.path.insert(0, PROJECT_PATH)
 
@@ -13,15 +15,62 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'voter_vault.settings')
 django.setup()
 
 from django.contrib.auth.models import User
-from core.db_bridge import get_dashboard_stats
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from core.db_bridge import get_dashboard_stats, get_all_users
+from core_db.models import UserProfile
+
+# get_dashboard_stats must stay a single conditional-aggregate scan
+MAX_DASHBOARD_QUERIES = 1
+# get_all_users: users + three assignment prefetches (+ COUNT when paged), whatever the user count
+MAX_USER_LIST_QUERIES = 5
+
+
+def check_query_count(profile, **filters):
+    with CaptureQueriesContext(connection) as ctx:
+        stats = get_dashboard_stats(profile, use_cache=False, **filters)
+    count = len(ctx.captured_queries)
+    assert count <= MAX_DASHBOARD_QUERIES, (
+        f"get_dashboard_stats ran {count} queries for {profile.role} (max {MAX_DASHBOARD_QUERIES}):\n"
+        + "\n".join(q['sql'] for q in ctx.captured_queries)
+    )
+    return stats, count
+
+
+def check_user_list_queries(**kwargs):
+    with CaptureQueriesContext(connection) as ctx:
+        get_all_users(**kwargs)
+    count = len(ctx.captured_queries)
+    assert count <= MAX_USER_LIST_QUERIES, (
+        f"get_all_users({kwargs}) ran {count} queries (max {MAX_USER_LIST_QUERIES})"
+    )
+    return count
+
 
 def check_stats():
     try:
         user = User.objects.get(username='admin')
         print(f"User: {user.username}, Role: {user.profile.role}")
-        stats = get_dashboard_stats(user.profile)
-        print("Stats:")
+        stats, count = check_query_count(user.profile)
+        print(f"Stats ({count} query):")
         print(stats)
+
+        # Every role's scope must still resolve inside the one statement,
+        # and the BoothStats rollups must agree with a raw Voter scan
+        for profile in UserProfile.objects.select_related('user'):
+            rolled, count = check_query_count(profile)
+            scanned = get_dashboard_stats(profile, use_rollups=False)
+            assert rolled == scanned, (
+                f"BoothStats drift for {profile.user.username}: {rolled} != {scanned} "
+                "(run scripts/rebuild_booth_stats.py --verify)"
+            )
+            print(f"  {profile.user.username:<20} {profile.role:<20} {count} query, rollups match")
+
+        print(f"User listing: {check_user_list_queries()} queries (all), "
+              f"{check_user_list_queries(page=1, page_size=50)} queries (paged)")
+    except AssertionError as e:
+        print(f"FAIL: {e}")
+        sys.exit(1)
     except Exception as e:
         print(f"Error: {e}")
 
@@ -0,0 +1,233 @@
+"""
+Synthetic Electoral Roll Generator
+Renders realistic 3-column voter roll pages with known ground truth, so the
+OCR pipeline can be benchmarked without touching real (PII) rolls.
+
+Usage:
+    python scripts/generate_synthetic_roll.py --pages 5 --out data/synthetic/roll_01
+    python scripts/generate_synthetic_roll.py --pages 2 --dpi 200 --noise 0.3 --skew 1.5
+
+Output directory layout:
+    roll.pdf            Multi-page PDF (feed this to PDFProcessor)
+    page_001.png ...    The rendered page images (only with --png)
+    ground_truth.json   Per-voter expected fields + box coordinates
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont, features
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MALAYALAM_FONT = os.path.join(BASE_DIR, 'assets', 'fonts', 'NotoSansMalayalam.ttf')
+
+# Layout is designed in 300 DPI pixel units and scaled to the requested DPI.
+# Box size sits inside VoterDetector's 300 DPI window (750-850 x 310-370, ratio 2.1-2.6).
+BASE_DPI = 300
+PAGE_SIZE = (2480, 3508)          # A4 @ 300 DPI
+BOX_SIZE = (800, 320)
+COLUMNS = 3
+ROWS = 10
+COL_GAP = 15
+ROW_GAP = 8
+HEADER_HEIGHT = 150
+
+HAVE_RAQM = features.check("raqm")
+
+# Name inventories (Malayalam)
+GIVEN_NAMES = [
+    "സിന്ധു", "രാജൻ", "അനിത", "സുരേഷ്", "ബിന്ദു", "മോഹനൻ", "ലത", "ശ്രീജ",
+    "പ്രകാശ്", "രമേശൻ", "ഗീത", "ജോസഫ്", "മേരി", "അബ്ദുൾ", "ഫാത്തിമ", "കൃഷ്ണൻ",
+    "രാധ", "വിനോദ്", "സജി", "ബിജു", "അജിത", "ഷാജി", "സുനിത", "മനോജ്",
+    "ദിവ്യ", "അരുൺ", "നന്ദന", "ഗോപാലൻ", "ശോഭ", "വേണു", "ആനന്ദ്", "ലക്ഷ്മി",
+]
+HOUSE_NAMES = [
+    "പള്ളിപ്പറമ്പിൽ", "കിഴക്കേടത്ത്", "പുത്തൻവീട്", "തെക്കേമഠം", "കൊച്ചുപറമ്പിൽ",
+    "മാളിയേക്കൽ", "ചിറയിൽ", "വടക്കേക്കര", "ആലുങ്കൽ", "മുണ്ടയ്ക്കൽ", "കുന്നത്ത്",
+    "പാലത്തിങ്കൽ", "ചേരിയിൽ", "തൈപ്പറമ്പിൽ", "മഠത്തിൽ", "കാരിക്കൽ",
+]
+# (Relation Type, label printed on the roll)
+RELATIONS = [
+    ("Father", "അച്ഛന്റെ പേര്"),
+    ("Husband", "ഭർത്താവിന്റെ പേര്"),
+    ("Mother", "അമ്മയുടെ പേര്"),
+    ("Others", "മറ്റുള്ളവർ"),
+]
+GENDER_LABELS = {"Male": "പുരുഷൻ", "Female": "സ്ത്രീ"}
+EPIC_LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def _load_fonts(scale, latin_font=None):
+    """Malayalam text uses the bundled Noto font; Latin (serial/EPIC) needs a font with Latin glyphs."""
+    size = int(30 * scale)
+    layout = ImageFont.Layout.RAQM if HAVE_RAQM else ImageFont.Layout.BASIC
+    mal = ImageFont.truetype(MALAYALAM_FONT, size, layout_engine=layout)
+    try:
+        latin = ImageFont.truetype(latin_font or "DejaVuSans.ttf", int(34 * scale))
+    except OSError:
+        latin = ImageFont.load_default(int(34 * scale))
+    return mal, latin
+
+
+def random_voter(rng, serial):
+    """Builds one ground-truth voter record (keys match BatchProcessor output)."""
+    gender = rng.choice(["Male", "Female"])
+    rel_type, rel_label = rng.choice(RELATIONS)
+    if gender == "Male" and rel_type == "Husband":
+        rel_type, rel_label = RELATIONS[0]
+    house_no = str(rng.randint(1, 999))
+    if rng.random() < 0.15:
+        house_no += rng.choice(["/A", "/B", "-1"])
+    return {
+        "Serial_OCR": str(serial),
+        "EPIC_ID": "".join(rng.choice(EPIC_LETTERS) for _ in range(3)) + "".join(str(rng.randint(0, 9)) for _ in range(7)),
+        "Full Name": rng.choice(GIVEN_NAMES),
+        "Relation Type": rel_type,
+        "Relation Name": rng.choice(GIVEN_NAMES),
+        "House Number": house_no,
+        "House Name": rng.choice(HOUSE_NAMES),
+        "Age": str(rng.randint(18, 95)),
+        "Gender": gender,
+        "_relation_label": rel_label,
+    }
+
+
+def _draw_box(draw, origin, voter, scale, fonts):
+    mal, latin = fonts
+    x0, y0 = origin
+    w, h = int(BOX_SIZE[0] * scale), int(BOX_SIZE[1] * scale)
+    line = max(2, int(3 * scale))
+    draw.rectangle([x0, y0, x0 + w, y0 + h], outline=0, width=line)
+
+    # Photo placeholder on the right (outside the C_TEXT zone)
+    draw.rectangle([x0 + int(w * 0.77), y0 + int(h * 0.24), x0 + int(w * 0.96), y0 + int(h * 0.92)], outline=90, width=max(1, line - 1))
+
+    # Zone A (serial) and Zone B (EPIC)
+    draw.text((x0 + int(w * 0.06), y0 + int(h * 0.045)), voter["Serial_OCR"], font=latin, fill=0)
+    draw.text((x0 + int(w * 0.62), y0 + int(h * 0.035)), voter["EPIC_ID"], font=latin, fill=0)
+
+    # Zone C (Malayalam text block)
+    tx = x0 + int(w * 0.03)
+    lines = [
+        (0.24, f"പേര്: {voter['Full Name']}"),
+        (0.41, f"{voter['_relation_label']}: {voter['Relation Name']}"),
+        (0.58, f"വീട്ടു നമ്പർ: {voter['House Number']} {voter['House Name']}"),
+        (0.78, f"പ്രായം: {voter['Age']}  ലിംഗം: {GENDER_LABELS[voter['Gender']]}"),
+    ]
+    for rel_y, text in lines:
+        draw.text((tx, y0 + int(h * rel_y)), text, font=mal, fill=0)
+    return (x0, y0, w, h)
+
+
+def _degrade(page, rng, noise, skew):
+    """Applies skew (degrees) and scanner-like noise (0.0 - 1.0) to a grayscale page."""
+    if skew:
+        angle = rng.uniform(-skew, skew)
+        page = page.rotate(angle, resample=Image.BICUBIC, expand=False, fillcolor=255)
+    if noise:
+        arr = np.asarray(page, dtype=np.float32)
+        np_rng = np.random.default_rng(rng.randint(0, 2**31))
+        arr += np_rng.normal(0, 40 * noise, arr.shape)
+        # Salt & pepper speckle
+        speckle = np_rng.random(arr.shape)
+        arr[speckle < 0.002 * noise] = 0
+        arr[speckle > 1 - 0.002 * noise] = 255
+        page = Image.fromarray(np.clip(arr, 0, 255).astype(np.uint8))
+    return page
+
+
+def render_page(voters, dpi=BASE_DPI, noise=0.0, skew=0.0, rng=None, fonts=None, page_no=1):
+    """
+    Renders one roll page for up to COLUMNS * ROWS voters.
+    Returns (PIL.Image, list of box dicts) where boxes are in page pixel coordinates (pre-skew).
+    """
+    rng = rng or random.Random()
+    scale = dpi / BASE_DPI
+    fonts = fonts or _load_fonts(scale)
+    page = Image.new("L", (int(PAGE_SIZE[0] * scale), int(PAGE_SIZE[1] * scale)), 255)
+    draw = ImageDraw.Draw(page)
+
+    draw.text((int(60 * scale), int(50 * scale)), f"Synthetic Roll - Page {page_no}", font=fonts[1], fill=0)
+
+    grid_w = COLUMNS * BOX_SIZE[0] + (COLUMNS - 1) * COL_GAP
+    left = (PAGE_SIZE[0] - grid_w) // 2
+    boxes = []
+    for i, voter in enumerate(voters):
+        row, col = divmod(i, COLUMNS)
+        x = int((left + col * (BOX_SIZE[0] + COL_GAP)) * scale)
+        y = int((HEADER_HEIGHT + row * (BOX_SIZE[1] + ROW_GAP)) * scale)
+        rect = _draw_box(draw, (x, y), voter, scale, fonts)
+        boxes.append({"page": page_no, "index": i, "box": list(rect)})
+
+    return _degrade(page, rng, noise, skew), boxes
+
+
+def generate_roll(output_dir, pages=1, dpi=BASE_DPI, noise=0.0, skew=0.0, seed=None, voters_per_page=COLUMNS * ROWS, save_png=False, latin_font=None):
+    """
+    Generates a synthetic roll (PDF + ground truth JSON) in output_dir.
+    Returns the ground truth dictionary.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    rng = random.Random(seed)
+    fonts = _load_fonts(dpi / BASE_DPI, latin_font)
+
+    images = []
+    truth_voters = []
+    serial = 1
+    for page_no in range(1, pages + 1):
+        voters = [random_voter(rng, serial + i) for i in range(voters_per_page)]
+        serial += len(voters)
+        img, boxes = render_page(voters, dpi=dpi, noise=noise, skew=skew, rng=rng, fonts=fonts, page_no=page_no)
+        images.append(img)
+        if save_png:
+            img.save(os.path.join(output_dir, f"page_{page_no:03d}.png"))
+        for voter, box in zip(voters, boxes):
+            record = {k: v for k, v in voter.items() if not k.startswith("_")}
+            record.update(box)
+            truth_voters.append(record)
+
+    pdf_path = os.path.join(output_dir, "roll.pdf")
+    images[0].save(pdf_path, "PDF", save_all=True, append_images=images[1:], resolution=dpi)
+
+    truth = {
+        "pdf": "roll.pdf",
+        "pages": pages,
+        "dpi": dpi,
+        "noise": noise,
+        "skew": skew,
+        "seed": seed,
+        "complex_shaping": bool(HAVE_RAQM),
+        "voters": truth_voters,
+    }
+    with open(os.path.join(output_dir, "ground_truth.json"), "w", encoding="utf-8") as f:
+        json.dump(truth, f, ensure_ascii=False, indent=2)
+    return truth
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render synthetic 3-column electoral roll pages with ground truth.")
+    parser.add_argument("--out", default=os.path.join(BASE_DIR, "data", "synthetic", "roll"), help="Output directory")
+    parser.add_argument("--pages", type=int, default=2)
+    parser.add_argument("--dpi", type=int, default=BASE_DPI, help="Render resolution of the page images")
+    parser.add_argument("--noise", type=float, default=0.0, help="Scanner noise intensity (0.0 - 1.0)")
+    parser.add_argument("--skew", type=float, default=0.0, help="Max random page rotation in degrees")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--voters-per-page", type=int, default=COLUMNS * ROWS)
+    parser.add_argument("--latin-font", default=None, help="TTF used for serial/EPIC text (default: DejaVuSans)")
+    parser.add_argument("--png", action="store_true", help="Also save page PNGs")
+    args = parser.parse_args(argv)
+
+    if not HAVE_RAQM:
+        print("⚠️ Pillow was built without libraqm: Malayalam conjuncts will not be shaped. OCR accuracy will be pessimistic.")
+
+    truth = generate_roll(args.out, args.pages, args.dpi, args.noise, args.skew, args.seed,
+                          args.voters_per_page, args.png, args.latin_font)
+    print(f"✅ Generated {truth['pages']} pages / {len(truth['voters'])} voters in {args.out}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+Import Voter Roll: load a structured roll (CSV / XLSX) without OCR
+Maps spreadsheet columns to voter fields (see COLUMN_ALIASES in
+core/structured_import.py), cleans every row with the OCR pipeline's
+normalization and EPIC validation, and streams the result into the bulk ingest
+layer in one transaction. Rows failing validation are saved as FLAGGED.
+
+A "Booth" / "Part No" column spreads the rows over several new booths;
+without one, pass --booth.
+
+--revise applies a revised roll to booths that already exist instead: voters
+are matched by EPIC ID, then serial number, and only additions, deletions and
+roll-field changes are written (phone numbers, leanings and other campaign data
+stay). With --supplementary only the listed voters are touched (an "Action"
+column of D marks deletions); otherwise voters missing from the file are deleted.
+Combine with --dry-run to print the diff without writing.
+
+Usage:
+    python scripts/import_voter_roll.py roll.xlsx --constituency Kottayam --local-body "Kottayam Municipality" --local-body-type MUNICIPALITY
+    python scripts/import_voter_roll.py part_12.csv --constituency Pala --local-body Pala --booth 12 --ps-name "Govt HS"
+    python scripts/import_voter_roll.py roll.csv --map "Full Name=Elector Name (Malayalam)" --dry-run
+    python scripts/import_voter_roll.py revised_part_12.xlsx --constituency Pala --booth 12 --revise --dry-run
+    python scripts/import_voter_roll.py supplement_1.csv --constituency Pala --revise --supplementary
+"""
+
+import os
+import sys
+import time
+import argparse
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from core.structured_import import iter_records, read_rows, COLUMN_ALIASES
+
+
+def parse_mapping(pairs):
+    """['Full Name=Elector Name', ...] -> {'Full Name': 'Elector Name'}"""
+    mapping = {}
+    for pair in pairs or []:
+        field, sep, header = pair.partition('=')
+        if not sep or field.strip() not in COLUMN_ALIASES:
+            raise ValueError(f"Invalid --map {pair!r} (expected FIELD=Header, FIELD one of {', '.join(COLUMN_ALIASES)})")
+        mapping[field.strip()] = header.strip()
+    return mapping
+
+
+def dry_run(path, mapping):
+    """Validates the file without touching the database."""
+    start = time.perf_counter()
+    rows = flagged = 0
+    booths = set()
+    for record in iter_records(read_rows(path), mapping):
+        rows += 1
+        booths.add(record.get('Booth', ''))
+        if record['Flags']:
+            flagged += 1
+            if flagged <= 20:
+                print(f"⚠️ line {record['Line']}: {record['Flags']}")
+    elapsed = time.perf_counter() - start
+    print("=" * 60)
+    print(f"{rows:,} rows, {flagged:,} flagged, {len(booths)} booth(s) in {elapsed:.2f}s "
+          f"({rows / elapsed if elapsed else rows:,.0f} rows/sec)")
+    return 0
+
+
+def print_revision(result):
+    print("=" * 60)
+    print(f"{'✅' if result['success'] else '⚠️'} {result['message']}")
+    for booth in result.get('booths', []):
+        print(f"Booth {booth['booth']}: +{booth['added']} ~{booth['updated']} -{booth['deleted']} "
+              f"={booth['unchanged']} (matched {booth['matched_by_epic']} by EPIC, {booth['matched_by_serial']} by serial"
+              + (f", {booth['deletions_not_found']} deletions not found)" if booth['deletions_not_found'] else ")"))
+        for change in booth['changes'][:10]:
+            fields = ", ".join(f"{f}: {old!r} -> {new!r}" for f, (old, new) in change['fields'].items())
+            print(f"   ~ #{change['serial_no']} {change['epic_id']}: {fields}")
+        for gone in booth['deletions'][:10]:
+            print(f"   - #{gone['serial_no']} {gone['epic_id']} {gone['full_name']}")
+    return 0 if result['success'] else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import a CSV/XLSX voter roll without OCR.")
+    parser.add_argument("path", help=".csv or .xlsx file")
+    parser.add_argument("--constituency")
+    parser.add_argument("--local-body")
+    parser.add_argument("--local-body-type", choices=["PANCHAYAT", "MUNICIPALITY", "CORPORATION"], default="PANCHAYAT")
+    parser.add_argument("--booth", help="Booth number when the file has no booth column")
+    parser.add_argument("--ps-no", default="")
+    parser.add_argument("--ps-name", default="")
+    parser.add_argument("--user", help="Username recorded as uploader (created_by)")
+    parser.add_argument("--map", action="append", metavar="FIELD=Header", help="Explicit column mapping (repeatable)")
+    parser.add_argument("--ingest-method", choices=["auto", "copy", "bulk_create"], default="auto")
+    parser.add_argument("--dry-run", action="store_true", help="Validate and report only (with --revise: show the diff)")
+    parser.add_argument("--revise", action="store_true", help="Apply to existing booths (diff and upsert)")
+    parser.add_argument("--supplementary", action="store_true", help="With --revise: keep voters missing from the file")
+    args = parser.parse_args(argv)
+
+    mapping = parse_mapping(args.map)
+    if args.dry_run and not args.revise:
+        return dry_run(args.path, mapping)
+    if not args.constituency or (not args.local_body and not args.revise):
+        parser.error("--constituency and --local-body are required unless --dry-run")
+
+    from core.db_bridge import import_voter_records, revise_voter_records
+    user_id = None
+    if args.user:
+        from django.contrib.auth.models import User
+        user_id = User.objects.filter(username=args.user).values_list('id', flat=True).first()
+        if user_id is None:
+            parser.error(f"Unknown user {args.user!r}")
+
+    if args.revise:
+        return print_revision(revise_voter_records(
+            iter_records(read_rows(args.path), mapping), args.constituency, os.path.basename(args.path),
+            booth_number=args.booth, user_id=user_id,
+            mode='supplementary' if args.supplementary else 'full', dry_run=args.dry_run,
+        ))
+
+    result = import_voter_records(
+        iter_records(read_rows(args.path), mapping),
+        args.constituency, args.local_body_type, args.local_body, os.path.basename(args.path),
+        booth_number=args.booth, polling_station_no=args.ps_no, polling_station_name=args.ps_name,
+        user_id=user_id, ingest_method=args.ingest_method,
+    )
+    print("=" * 60)
+    print(f"{'✅' if result['success'] else '⚠️'} {result['message']}")
+    for sample in result.get('flag_samples', []):
+        print(f"   line {sample['line']}: {sample['flags']}")
+    return 0 if result['success'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,380 @@
+"""
+Ingest Booths: headless bulk load of booth PDFs for whole constituencies
+Runs the same PDFProcessor -> VoterDetector -> BatchProcessor -> save_booth_data
+pipeline as the upload screens, for every PDF in a directory or ZIP. Booths are
+OCRed in parallel worker processes (one booth per process); saving happens in
+the parent, one booth per transaction.
+
+Progress is recorded per file after every step, so an interrupted run resumes
+where it stopped: saved booths are skipped and booths whose OCR already
+finished are saved from their cached results without OCRing again.
+
+Manifest (CSV, UTF-8, header row; default: manifest.csv in the directory / ZIP):
+    file,constituency,local_body,local_body_type,booth_no,ps_no,ps_name
+    booth_001.pdf,Kottayam,Kottayam Municipality,MUNICIPALITY,1,1,Govt LP School
+
+    local_body_type defaults to PANCHAYAT; ps_no / ps_name are optional.
+
+Usage:
+    python scripts/ingest_booths.py data/rolls/kottayam
+    python scripts/ingest_booths.py rolls.zip --manifest rolls.csv --workers 6 --user operator1
+    python scripts/ingest_booths.py data/rolls/kottayam --ocr-only     # OCR + cache results, no DB writes
+    python scripts/ingest_booths.py data/rolls/kottayam --retry-failed
+    python scripts/ingest_booths.py data/rolls/kottayam_rev1 --revise --dry-run     # preview revised rolls for existing booths
+    python scripts/ingest_booths.py data/rolls/kottayam_rev1 --revise
+    python scripts/ingest_booths.py data/rolls/kottayam_supp1 --revise --supplementary
+
+--revise applies each PDF as a revised roll of its existing booth (see
+revise_voter_records). OCR misses and misread EPICs look like deletions in the
+default full mode, so preview with --dry-run first, or use --supplementary to
+never delete voters missing from the PDF. A dry run leaves the booths at
+ocr_done, so the next run applies them from the cached OCR results.
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import shutil
+import zipfile
+import argparse
+import multiprocessing
+import concurrent.futures
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from core.pdf_processor import PDFProcessor
+from core.detector import VoterDetector
+from core.batch_processor import BatchProcessor
+
+CHECKPOINT_DIR = os.path.join(BASE_DIR, 'data', 'checkpoints')
+WORK_DIR = os.path.join(BASE_DIR, 'data', 'ingest')
+
+MANIFEST_NAME = 'manifest.csv'
+REQUIRED_COLUMNS = ('file', 'constituency', 'local_body', 'booth_no')
+LOCAL_BODY_TYPES = ('PANCHAYAT', 'MUNICIPALITY', 'CORPORATION')
+
+_pdf_processor = None
+_detector = None
+_processor = None
+
+
+def _init_worker():
+    global _pdf_processor, _detector, _processor
+    _pdf_processor = PDFProcessor()
+    _detector = VoterDetector()
+    _processor = BatchProcessor()
+
+
+def ocr_booth(source, member, work_dir, dpi=300, keep_images=False):
+    """
+    Worker: PDF -> page images -> voter crops -> parsed rows for one booth.
+    `member` is the PDF's name inside a ZIP `source`, or None when source is the PDF.
+    Returns (results, stats) with results in roll order, as run_processing builds them.
+    """
+    start = time.perf_counter()
+    os.makedirs(work_dir, exist_ok=True)
+    pdf_path = source
+    if member is not None:
+        pdf_path = os.path.join(work_dir, 'booth.pdf')
+        with zipfile.ZipFile(source) as archive, archive.open(member) as src, open(pdf_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+
+    pages_dir = os.path.join(work_dir, 'pages')
+    crops_dir = os.path.join(work_dir, 'crops')
+    # Leftovers of an interrupted run would be read as extra voters
+    shutil.rmtree(pages_dir, ignore_errors=True)
+    shutil.rmtree(crops_dir, ignore_errors=True)
+    try:
+        page_images = _pdf_processor.convert_to_images(pdf_path, pages_dir, dpi=dpi)
+        total = 0
+        for page_num, page_path in enumerate(page_images, start=1):
+            boxes = _detector.detect_voter_boxes(page_path)
+            if boxes:
+                total += _detector.crop_and_save(page_path, boxes, crops_dir, page_num, start_index=total)
+
+        crops = sorted(f for f in os.listdir(crops_dir) if f.endswith('.png')) if total else []
+        results = []
+        for voter_id, name in enumerate(crops, start=1):
+            res = _processor.process_box(os.path.join(crops_dir, name), voter_id)
+            res['voter_id'] = voter_id
+            res['image_name'] = name
+            results.append(res)
+    finally:
+        if not keep_images:
+            shutil.rmtree(pages_dir, ignore_errors=True)
+            shutil.rmtree(crops_dir, ignore_errors=True)
+            if member is not None and os.path.exists(pdf_path):
+                os.remove(pdf_path)
+
+    stats = {
+        "pages": len(page_images),
+        "voters": len(results),
+        "flagged": sum(1 for r in results if r.get('Status') != '✅ OK'),
+        "ocr_seconds": round(time.perf_counter() - start, 2),
+    }
+    return results, stats
+
+
+def _load_checkpoint(path):
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    return None
+
+
+def _save_checkpoint(path, state):
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _file_key(path):
+    """Normalized relative path of a manifest file entry ('./north\\b1.pdf' -> 'north/b1.pdf')."""
+    parts = [p for p in path.replace('\\', '/').split('/') if p not in ('', '.', '..')]
+    return '/'.join(parts)
+
+
+def _read_manifest(handle):
+    reader = csv.DictReader(handle)
+    missing = [c for c in REQUIRED_COLUMNS if c not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"Manifest is missing column(s): {', '.join(missing)}")
+    entries = []
+    seen = {}
+    for line_no, row in enumerate(reader, start=2):
+        row = {k: (v or '').strip() for k, v in row.items() if k}
+        if not row['file']:
+            continue
+        key = _file_key(row['file'])
+        if key in seen:
+            raise ValueError(f"Manifest line {line_no}: {row['file']!r} is already listed on line {seen[key]}")
+        seen[key] = line_no
+        row['local_body_type'] = (row.get('local_body_type') or 'PANCHAYAT').upper()
+        if row['local_body_type'] not in LOCAL_BODY_TYPES:
+            raise ValueError(f"Manifest line {line_no}: invalid local_body_type {row['local_body_type']!r}")
+        if not row['constituency'] or not row['local_body'] or not row['booth_no']:
+            raise ValueError(f"Manifest line {line_no}: constituency, local_body and booth_no are required")
+        entries.append(row)
+    return entries
+
+
+def load_source(source, manifest=None):
+    """
+    Returns (entries, locate) for a directory or ZIP. locate(entry) gives the
+    (source, member) pair ocr_booth expects, or None when the PDF is missing.
+    """
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            names = [n for n in archive.namelist() if not n.endswith('/')]
+            if manifest:
+                with open(manifest, encoding='utf-8-sig', newline='') as f:
+                    entries = _read_manifest(f)
+            else:
+                inner = next((n for n in names if os.path.basename(n).lower() == MANIFEST_NAME), None)
+                if inner is None:
+                    raise ValueError(f"No {MANIFEST_NAME} in {source}; pass --manifest")
+                with archive.open(inner) as raw:
+                    entries = _read_manifest(raw.read().decode('utf-8-sig').splitlines())
+        by_path = {_file_key(n): n for n in names}
+        # Bare file names resolve to a nested member only when no other member shares the name
+        base_counts = {}
+        for n in names:
+            base_counts[os.path.basename(n)] = base_counts.get(os.path.basename(n), 0) + 1
+        by_base = {os.path.basename(n): n for n in names if base_counts[os.path.basename(n)] == 1}
+
+        def locate(entry):
+            key = _file_key(entry['file'])
+            member = by_path.get(key) or ('/' not in key and by_base.get(key))
+            return (source, member) if member else None
+
+        return entries, locate
+
+    if not os.path.isdir(source):
+        raise ValueError(f"{source} is neither a directory nor a ZIP file")
+    with open(manifest or os.path.join(source, MANIFEST_NAME), encoding='utf-8-sig', newline='') as f:
+        entries = _read_manifest(f)
+
+    def locate(entry):
+        path = os.path.join(source, entry['file'])
+        return (path, None) if os.path.isfile(path) else None
+
+    return entries, locate
+
+
+def _setup_django():
+    """Django is only needed in the parent; workers just run OCR."""
+    import django
+    project_path = os.path.join(BASE_DIR, 'voter_vault')
+    if project_path not in sys.path:
+        sys.path.insert(0, project_path)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'voter_vault.settings')
+    django.setup()
+
+
+def _resolve_user_id(username):
+    from django.contrib.auth.models import User
+    user_id = User.objects.filter(username=username).values_list('id', flat=True).first()
+    if user_id is None:
+        raise ValueError(f"Unknown user {username!r}")
+    return user_id
+
+
+def run(source, manifest=None, workers=None, dpi=300, checkpoint=None, restart=False,
+        retry_failed=False, ocr_only=False, user=None, ingest_method='auto', keep_images=False, revise=False,
+        revision_mode='full', dry_run=False):
+    entries, locate = load_source(source, manifest)
+    name = os.path.splitext(os.path.basename(os.path.normpath(source)))[0]
+    checkpoint = checkpoint or os.path.join(CHECKPOINT_DIR, f'ingest_{name}.json')
+    work_root = os.path.join(WORK_DIR, name)
+    os.makedirs(os.path.dirname(checkpoint), exist_ok=True)
+
+    state = None if restart else _load_checkpoint(checkpoint)
+    if state and state.get('source') != os.path.abspath(source):
+        print(f"⚠️ Checkpoint {checkpoint} belongs to {state.get('source')}; use --restart or --checkpoint")
+        return 1
+    state = state or {"source": os.path.abspath(source), "files": {}}
+    files = state['files']
+
+    save_booth_data = revise_voter_records = None
+    user_id = None
+    if not ocr_only:
+        _setup_django()
+        from core.db_bridge import save_booth_data, revise_voter_records
+        from import_voter_roll import print_revision
+        user_id = _resolve_user_id(user) if user else None
+
+    def results_path(entry):
+        # One work dir per manifest path: north/booth_001.pdf and south/booth_001.pdf never share one
+        return os.path.join(work_root, *_file_key(entry['file']).split('/'), 'results.json')
+
+    def record(entry, **fields):
+        files.setdefault(entry['file'], {}).update(fields, updated_at=time.strftime('%Y-%m-%d %H:%M:%S'))
+        _save_checkpoint(checkpoint, state)
+
+    def save(entry):
+        with open(results_path(entry), encoding='utf-8') as f:
+            results = json.load(f)
+        if revise:
+            # Existing booth: diff and upsert, campaign data on matched voters is kept
+            result = revise_voter_records(results, entry['constituency'], os.path.basename(entry['file']),
+                                          booth_number=entry['booth_no'], user_id=user_id,
+                                          mode=revision_mode, dry_run=dry_run)
+            print(f"{entry['file']}:")
+            print_revision(result)
+            if dry_run:
+                # Nothing written: stays ocr_done so the real run applies the cached results
+                record(entry, status='ocr_done', message=result['message'])
+            else:
+                record(entry, status='saved' if result['success'] else 'failed', message=result['message'])
+            return
+        success, msg = save_booth_data(
+            entry['constituency'], entry['local_body_type'], entry['local_body'], entry['booth_no'],
+            results, os.path.basename(entry['file']), entry.get('ps_no', ''), entry.get('ps_name', ''),
+            user_id, ingest_method=ingest_method,
+        )
+        record(entry, status='saved' if success else 'failed', message=msg)
+        print(f"{'✅' if success else '⚠️'} {entry['file']}: {msg}")
+
+    to_ocr, to_save = [], []
+    for entry in entries:
+        status = files.get(entry['file'], {}).get('status')
+        if status == 'saved' or (status == 'failed' and not retry_failed):
+            continue
+        if status in ('ocr_done', 'failed') and os.path.exists(results_path(entry)):
+            to_save.append(entry)
+            continue
+        if locate(entry) is None:
+            record(entry, status='failed', message='PDF not found')
+            print(f"⚠️ {entry['file']}: PDF not found in {source}")
+            continue
+        to_ocr.append(entry)
+
+    skipped = len(entries) - len(to_ocr) - len(to_save)
+    workers = workers or max(1, multiprocessing.cpu_count())
+    print("=" * 60)
+    print(f"{len(entries)} booths in manifest: {len(to_ocr)} to OCR, {len(to_save)} to save from cache, "
+          f"{skipped} already done or failed")
+    print(f"Workers: {workers}   Checkpoint: {checkpoint}")
+    print("=" * 60)
+
+    if not ocr_only:
+        for entry in to_save:
+            save(entry)
+
+    start = time.perf_counter()
+    done = 0
+    context = multiprocessing.get_context('spawn')  # workers never inherit the parent's DB connection
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                                initializer=_init_worker) as executor:
+        futures = {}
+        for entry in to_ocr:
+            src, member = locate(entry)
+            work_dir = os.path.dirname(results_path(entry))
+            futures[executor.submit(ocr_booth, src, member, work_dir, dpi, keep_images)] = entry
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                entry = futures[future]
+                done += 1
+                try:
+                    results, stats = future.result()
+                except Exception as e:
+                    record(entry, status='failed', message=f"OCR failed: {e}")
+                    print(f"⚠️ [{done}/{len(futures)}] {entry['file']}: OCR failed: {e}")
+                    continue
+                os.makedirs(os.path.dirname(results_path(entry)), exist_ok=True)
+                with open(results_path(entry), 'w', encoding='utf-8') as f:
+                    json.dump(results, f, ensure_ascii=False)
+                record(entry, status='ocr_done', **stats)
+                print(f"[{done}/{len(futures)}] {entry['file']}: {stats['voters']} voters "
+                      f"({stats['flagged']} flagged) in {stats['ocr_seconds']}s")
+                if not ocr_only:
+                    save(entry)
+        except KeyboardInterrupt:
+            print("Interrupted; progress saved, rerun the same command to resume.")
+            executor.shutdown(wait=False, cancel_futures=True)
+            return 130
+
+    elapsed = time.perf_counter() - start
+    counts = {}
+    for entry in entries:
+        status = files.get(entry['file'], {}).get('status', 'pending')
+        counts[status] = counts.get(status, 0) + 1
+    print("=" * 60)
+    print(f"Done in {elapsed:.0f}s: " + ", ".join(f"{n} {s}" for s, n in sorted(counts.items())))
+    return 0 if not counts.get('failed') else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-ingest booth PDFs from a directory or ZIP.")
+    parser.add_argument("source", help="Directory or ZIP of booth PDFs")
+    parser.add_argument("--manifest", help=f"Manifest CSV (default: {MANIFEST_NAME} in the source)")
+    parser.add_argument("--workers", type=int, default=None, help="OCR processes (default: all cores)")
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--user", help="Username recorded as uploader (created_by)")
+    parser.add_argument("--ingest-method", choices=["auto", "copy", "bulk_create"], default="auto")
+    parser.add_argument("--checkpoint", help="Progress file (default: data/checkpoints/ingest_<source>.json)")
+    parser.add_argument("--restart", action="store_true", help="Ignore existing progress")
+    parser.add_argument("--retry-failed", action="store_true", help="Retry booths that failed last time")
+    parser.add_argument("--ocr-only", action="store_true", help="OCR and cache results without saving")
+    parser.add_argument("--keep-images", action="store_true", help="Keep page images and crops for review")
+    parser.add_argument("--revise", action="store_true", help="Apply as revised rolls to existing booths")
+    parser.add_argument("--supplementary", action="store_true", help="With --revise: keep voters missing from the PDF")
+    parser.add_argument("--dry-run", action="store_true", help="With --revise: print each booth's diff without writing")
+    args = parser.parse_args(argv)
+    if (args.supplementary or args.dry_run) and not args.revise:
+        parser.error("--supplementary and --dry-run only apply with --revise")
+
+    return run(args.source, manifest=args.manifest, workers=args.workers, dpi=args.dpi,
+               checkpoint=args.checkpoint, restart=args.restart, retry_failed=args.retry_failed,
+               ocr_only=args.ocr_only, user=args.user, ingest_method=args.ingest_method,
+               keep_images=args.keep_images, revise=args.revise,
+               revision_mode='supplementary' if args.supplementary else 'full', dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
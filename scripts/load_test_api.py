@@ -0,0 +1,117 @@
+"""
+API Load Test
+Logs in once, then runs a mixed read workload against a running backend at
+increasing client concurrency and prints throughput and latency per level.
+With the bounded DB pool, req/s should keep rising with clients up to about
+DB_THREADS (and the per-group limits) instead of staying flat.
+
+Usage:
+    python scripts/load_test_api.py --user admin --password secret
+    python scripts/load_test_api.py --url http://localhost:8000 --concurrency 1,4,16,32 --duration 20
+    python scripts/load_test_api.py --mix voters --concurrency 1,2,4,8
+"""
+
+import sys
+import time
+import random
+import argparse
+import threading
+import requests
+
+# Endpoint mixes: (path, params) picked at random by every client
+MIXES = {
+    "read": [
+        ("/api/voters", {"page": 1, "page_size": 50}),
+        ("/api/voters", {"page": 1, "page_size": 50, "count_mode": "has_more"}),
+        ("/api/stats", {}),
+        ("/api/admin/locations", {}),
+        ("/api/comm/stats", {}),
+    ],
+    "voters": [
+        ("/api/voters", {"page": 1, "page_size": 50, "count_mode": "auto"}),
+        ("/api/voters", {"cursor": "", "page_size": 100}),
+        ("/api/voters", {"search": "sindhu", "page": 1, "page_size": 50}),
+    ],
+    "dashboard": [
+        ("/api/stats", {}),
+        ("/api/comm/stats", {}),
+    ],
+}
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def login(url, username, password):
+    response = requests.post(f"{url}/api/token", data={"username": username, "password": password}, timeout=30)
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def run_level(url, token, mix, clients, duration, seed=7):
+    """Runs `clients` threads for `duration` seconds; returns (latencies, errors)."""
+    deadline = time.perf_counter() + duration
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def client(index):
+        rng = random.Random(seed + index)
+        session = requests.Session()
+        session.headers["Authorization"] = f"Bearer {token}"
+        while time.perf_counter() < deadline:
+            path, params = rng.choice(MIXES[mix])
+            start = time.perf_counter()
+            try:
+                response = session.get(f"{url}{path}", params=params, timeout=120)
+                ok = response.status_code < 400
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                (latencies if ok else errors).append(elapsed)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure API throughput at increasing concurrency.")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--user", default="admin")
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", default="1,2,4,8,16", help="Comma-separated client counts")
+    parser.add_argument("--duration", type=float, default=15, help="Seconds per level")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="read")
+    args = parser.parse_args(argv)
+
+    token = login(args.url, args.user, args.password)
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    print("=" * 60)
+    print(f"{args.url}  mix={args.mix}  {args.duration:.0f}s per level")
+    print("=" * 60)
+    baseline = None
+    for clients in levels:
+        latencies, errors = run_level(args.url, token, args.mix, clients, args.duration)
+        if not latencies:
+            print(f"{clients:>3} clients: no successful requests ({len(errors)} errors)")
+            continue
+        rps = len(latencies) / args.duration
+        baseline = baseline or rps
+        print(f"{clients:>3} clients: {rps:8.1f} req/s  (x{rps / baseline:4.1f})   "
+              f"p50 {percentile(latencies, 50) * 1000:7.1f} ms   p95 {percentile(latencies, 95) * 1000:7.1f} ms   "
+              f"errors {len(errors)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
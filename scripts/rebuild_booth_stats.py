@@ -0,0 +1,86 @@
+"""
+Rebuild Booth Stats: recompute the BoothStats rollups from Voter rows
+The rollups are maintained incrementally on import and voter edits; run this
+after bulk changes made outside the app (SQL, restores) or to repair drift.
+
+Usage:
+    python scripts/rebuild_booth_stats.py                  # all booths
+    python scripts/rebuild_booth_stats.py --constituency 3
+    python scripts/rebuild_booth_stats.py --booth 12 --booth 13
+    python scripts/rebuild_booth_stats.py --verify         # report drift, change nothing
+"""
+
+import os
+import sys
+import time
+import argparse
+import django
+
+# Setup Paths
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_PATH = os.path.join(BASE_DIR, 'voter_vault')
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+if PROJECT_PATH not in sys.path:
+    sys.path.insert(0, PROJECT_PATH)
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'voter_vault.settings')
+django.setup()
+
+from core_db.models import Booth, BoothStats, Voter
+from core.db_bridge import bump_stats_versions
+
+
+def find_drift(booth_ids):
+    """Returns {booth_id: {counter: (rollup, actual)}} for booths whose rollup disagrees with Voter rows."""
+    actual = {
+        row.pop('booth_id'): row
+        for row in Voter.objects.filter(booth_id__in=booth_ids).order_by()
+        .values('booth_id').annotate(**BoothStats.aggregates())
+    }
+    stored = {
+        row.pop('booth_id'): row
+        for row in BoothStats.objects.filter(booth_id__in=booth_ids).values('booth_id', *BoothStats.FIELDS)
+    }
+    zero = dict.fromkeys(BoothStats.FIELDS, 0)
+    drift = {}
+    for booth_id in booth_ids:
+        have, want = stored.get(booth_id, zero), actual.get(booth_id, zero)
+        diff = {name: (have[name], want[name]) for name in BoothStats.FIELDS if have[name] != want[name]}
+        if diff:
+            drift[booth_id] = diff
+    return drift
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild BoothStats rollups from Voter rows.")
+    parser.add_argument("--booth", type=int, action="append", help="Booth id (repeatable)")
+    parser.add_argument("--constituency", type=int, help="Only booths in this constituency id")
+    parser.add_argument("--verify", action="store_true", help="Report drifting booths without rebuilding")
+    args = parser.parse_args(argv)
+
+    booths = Booth.objects.all()
+    if args.booth:
+        booths = booths.filter(id__in=args.booth)
+    if args.constituency:
+        booths = booths.filter(constituency_id=args.constituency)
+    booth_ids = list(booths.values_list('id', flat=True))
+
+    if args.verify:
+        drift = find_drift(booth_ids)
+        for booth_id, diff in sorted(drift.items()):
+            detail = ", ".join(f"{name} {have}->{want}" for name, (have, want) in diff.items())
+            print(f"Booth {booth_id}: {detail}")
+        print(f"{len(drift)} of {len(booth_ids)} booths drifted")
+        return 1 if drift else 0
+
+    start = time.perf_counter()
+    written = BoothStats.rebuild(booth_ids=booth_ids)
+    # Shared (redis) stats caches drop entries for these booths; in-process ones expire on TTL
+    bump_stats_versions('voters', booth_ids)
+    print(f"✅ Rebuilt stats for {written} booths in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
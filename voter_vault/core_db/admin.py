@@ -1,5 +1,38 @@
+import os
+import sys
+import logging
+
 from django.contrib import admin
-from .models import Constituency, Booth, Voter, UserProfile
+from django.db import transaction
+from .models import Constituency, Booth, BoothStats, Voter, UserProfile
+
+# core/ lives next to the Django project, as for the scripts
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from core import profile_cache, stats_cache
+
+logger = logging.getLogger(__name__)
+
+def _db_bridge():
+    """core.db_bridge, imported on first use: it runs django.setup(), which cannot nest inside app loading"""
+    from core import db_bridge
+    return db_bridge
+
+def _bump_booths(topic, booths, user_ids=()):
+    """
+    Invalidates cached `topic` entries on commit for booths given as (booth_id,
+    local_body_id, constituency_id): moved or deleted booths, whose old parents
+    bump_stats_versions can no longer look up
+    """
+    def bump():
+        try:
+            stats_cache.bump(topic, booths=booths, user_ids=user_ids)
+        except Exception as e:
+            logger.warning(f"Stats cache invalidation failed: {e}")
+
+    transaction.on_commit(bump)
 
 @admin.register(Constituency)
 class ConstituencyAdmin(admin.ModelAdmin):
@@ -7,6 +40,22 @@ class ConstituencyAdmin(admin.ModelAdmin):
     search_fields = ('name', 'code')
     ordering = ('name',)
 
+    # Constituencies show in the cached location trees
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        _db_bridge().bump_location_versions(obj.id)
+
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, Constituency.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        # Booths and voters go with the constituency
+        constituencies = [(None, None, pk) for pk in queryset.values_list('pk', flat=True)]
+        uploaders = set(Voter.objects.filter(constituency__in=queryset).values_list('created_by_id', flat=True).distinct())
+        super().delete_queryset(request, queryset)
+        _bump_booths('locations', constituencies)
+        _bump_booths('voters', constituencies, uploaders)
+
 @admin.register(Booth)
 class BoothAdmin(admin.ModelAdmin):
     list_display = ('number', 'constituency', 'name', 'created_at')
@@ -14,6 +63,30 @@ class BoothAdmin(admin.ModelAdmin):
     search_fields = ('number', 'name', 'constituency__name')
     ordering = ('constituency', 'number')
 
+    # New or moved booths change the materialized user scopes (and their cached profiles)
+    def save_model(self, request, obj, form, change):
+        old = Booth.objects.filter(pk=obj.pk).values_list('local_body_id', 'constituency_id').first() if change else None
+        super().save_model(request, obj, form, change)
+        bridge = _db_bridge()
+        bridge.refresh_booth_scopes([obj])
+        # New booths and edits both show in the location tree
+        bridge.bump_location_versions(obj.constituency_id, obj.local_body_id, obj.id)
+        if old and old != (obj.local_body_id, obj.constituency_id):
+            # The booth's voters leave the old parents' stats and join the new ones'
+            _bump_booths('locations', [(obj.id, *old)])
+            _bump_booths('voters', [(obj.id, *old)])
+            bridge.bump_stats_versions('voters', [obj.id])
+
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, Booth.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        booths = list(queryset.values_list('id', 'local_body_id', 'constituency_id'))
+        uploaders = set(Voter.objects.filter(booth__in=queryset).values_list('created_by_id', flat=True).distinct())
+        super().delete_queryset(request, queryset)
+        _bump_booths('locations', booths)
+        _bump_booths('voters', booths, uploaders)
+
 @admin.register(Voter)
 class VoterAdmin(admin.ModelAdmin):
     list_display = ('serial_no', 'epic_id', 'full_name', 'gender', 'age', 'booth', 'status')
@@ -39,6 +112,29 @@ class VoterAdmin(admin.ModelAdmin):
     
     readonly_fields = ('created_at', 'updated_at')
 
+    # Keep the booth rollups and the cached stats in step with admin edits
+    def save_model(self, request, obj, form, change):
+        booth_ids = {obj.booth_id}
+        if change:
+            old = Voter.objects.get(pk=obj.pk)
+            booth_ids.add(old.booth_id)
+        super().save_model(request, obj, form, change)
+        BoothStats.rebuild(booth_ids=booth_ids)
+        _db_bridge().bump_stats_versions('voters', booth_ids, [obj.created_by_id])
+
+    def delete_model(self, request, obj):
+        booth_id = obj.booth_id
+        super().delete_model(request, obj)
+        BoothStats.rebuild(booth_ids=[booth_id])
+        _db_bridge().bump_stats_versions('voters', [booth_id], [obj.created_by_id])
+
+    def delete_queryset(self, request, queryset):
+        rows = list(queryset.values_list('booth_id', 'created_by_id').distinct())
+        booth_ids = {booth_id for booth_id, _ in rows}
+        super().delete_queryset(request, queryset)
+        BoothStats.rebuild(booth_ids=booth_ids)
+        _db_bridge().bump_stats_versions('voters', booth_ids, {user_id for _, user_id in rows})
+
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
     list_display = ('user', 'role', 'get_constituencies', 'get_booths')
@@ -56,6 +152,24 @@ class UserProfileAdmin(admin.ModelAdmin):
         }),
     )
     
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        form.instance.refresh_scope()
+        self._invalidate([form.instance.user_id])
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        self._invalidate([obj.user_id])
+
+    def delete_queryset(self, request, queryset):
+        user_ids = list(queryset.values_list('user_id', flat=True))
+        super().delete_queryset(request, queryset)
+        self._invalidate(user_ids)
+
+    # Drop the cached profiles the API authenticates with, as update_user_profile does
+    def _invalidate(self, user_ids):
+        transaction.on_commit(lambda: [profile_cache.invalidate_user(uid) for uid in user_ids])
+    
     def get_constituencies(self, obj):
         return ", ".join([c.name for c in obj.assigned_constituencies.all()[:3]])
     get_constituencies.short_description = 'Assigned Constituencies'
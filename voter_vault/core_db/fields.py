@@ -0,0 +1,64 @@
+from django.db import models
+
+
+class CodedField(models.SmallIntegerField):
+    """
+    A choice column stored as a small-integer code.
+
+    Python code, ORM filters, Q objects, values() and the API all keep using the
+    string values; only the database sees the codes (2 bytes per row and per
+    index entry instead of a varchar). Matching is case-insensitive and accepts
+    aliases ("male", "M" -> "Male"); anything else is rejected on write.
+    """
+
+    def __init__(self, *args, codes=None, aliases=None, **kwargs):
+        self.codes = dict(codes or {})
+        self.aliases = dict(aliases or {})
+        self._by_code = {code: value for value, code in self.codes.items()}
+        self._canonical = {value.upper(): value for value in self.codes}
+        self._canonical.update({alias.upper(): value for alias, value in self.aliases.items()})
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['codes'] = self.codes
+        if self.aliases:
+            kwargs['aliases'] = self.aliases
+        return name, path, args, kwargs
+
+    @property
+    def validators(self):
+        # The integer range validators would compare against the string values
+        return []
+
+    def canonical(self, value):
+        """Stored spelling of a value, or None when it is not one of the codes."""
+        if value is None:
+            return None
+        return self._canonical.get(str(value).strip().upper())
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return None
+        return self._by_code.get(value)
+
+    def to_python(self, value):
+        if value is None or isinstance(value, str) and value == '' and '' not in self.codes:
+            return None
+        if isinstance(value, int):
+            return self._by_code.get(value)
+        return self.canonical(value) or value
+
+    def normalize(self, value):
+        """Stored spelling of value ('' / None -> the field's empty value); ValueError if unknown."""
+        if value is None or value == '':
+            return '' if '' in self.codes else None
+        canonical = self.canonical(value)
+        if canonical is None:
+            expected = ', '.join(repr(v) for v in self.codes)
+            raise ValueError(f"Invalid {self.name or 'value'}: {value!r} (expected one of {expected})")
+        return canonical
+
+    def get_prep_value(self, value):
+        value = self.normalize(value)
+        return None if value is None else self.codes[value]
@@ -0,0 +1,104 @@
+# Generated by Django 6.0.2 on 2026-10-19 09:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+COUNTERS = {
+    "male": Q(gender__iexact="Male"),
+    "female": Q(gender__iexact="Female"),
+    "age_18_25": Q(age__gte=18, age__lte=25),
+    "age_26_35": Q(age__gte=26, age__lte=35),
+    "age_36_45": Q(age__gte=36, age__lte=45),
+    "age_46_60": Q(age__gte=46, age__lte=60),
+    "age_60_plus": Q(age__gt=60),
+    "udf": Q(voter_leaning="UDF"),
+    "ldf": Q(voter_leaning="LDF"),
+    "nda": Q(voter_leaning="NDA"),
+    "neutral": Q(voter_leaning="NEUTRAL"),
+    "loc_local": Q(current_location="LOCAL"),
+    "loc_abroad": Q(current_location="ABROAD"),
+    "loc_state": Q(current_location="STATE"),
+    "loc_district": Q(current_location="DISTRICT"),
+    "prob_confirmed": Q(voting_probability="CONFIRMED"),
+    "prob_likely": Q(voting_probability="LIKELY"),
+    "prob_unlikely": Q(voting_probability="UNLIKELY"),
+    "prob_out_of_station": Q(voting_probability="OUT_OF_STATION"),
+    "with_phone": Q(phone_no__isnull=False) & ~Q(phone_no=""),
+    "tagged": (
+        Q(voter_leaning__isnull=False)
+        | Q(current_location__isnull=False)
+        | Q(phone_no__isnull=False)
+    )
+    & ~Q(voter_leaning="", current_location="", phone_no=""),
+}
+
+
+def backfill_booth_stats(apps, schema_editor):
+    Voter = apps.get_model("core_db", "Voter")
+    BoothStats = apps.get_model("core_db", "BoothStats")
+    rows = (
+        Voter.objects.order_by()
+        .values("booth_id")
+        .annotate(
+            total=Count("id"),
+            **{name: Count("id", filter=q) for name, q in COUNTERS.items()},
+        )
+    )
+    BoothStats.objects.bulk_create(
+        [BoothStats(**row) for row in rows.iterator(chunk_size=1000)],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core_db", "0020_userprofile_can_edit_voters_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BoothStats",
+            fields=[
+                (
+                    "booth",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="core_db.booth",
+                    ),
+                ),
+                ("total", models.PositiveIntegerField(default=0)),
+                ("male", models.PositiveIntegerField(default=0)),
+                ("female", models.PositiveIntegerField(default=0)),
+                ("age_18_25", models.PositiveIntegerField(default=0)),
+                ("age_26_35", models.PositiveIntegerField(default=0)),
+                ("age_36_45", models.PositiveIntegerField(default=0)),
+                ("age_46_60", models.PositiveIntegerField(default=0)),
+                ("age_60_plus", models.PositiveIntegerField(default=0)),
+                ("udf", models.PositiveIntegerField(default=0)),
+                ("ldf", models.PositiveIntegerField(default=0)),
+                ("nda", models.PositiveIntegerField(default=0)),
+                ("neutral", models.PositiveIntegerField(default=0)),
+                ("loc_local", models.PositiveIntegerField(default=0)),
+                ("loc_abroad", models.PositiveIntegerField(default=0)),
+                ("loc_state", models.PositiveIntegerField(default=0)),
+                ("loc_district", models.PositiveIntegerField(default=0)),
+                ("prob_confirmed", models.PositiveIntegerField(default=0)),
+                ("prob_likely", models.PositiveIntegerField(default=0)),
+                ("prob_unlikely", models.PositiveIntegerField(default=0)),
+                ("prob_out_of_station", models.PositiveIntegerField(default=0)),
+                ("with_phone", models.PositiveIntegerField(default=0)),
+                ("tagged", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name_plural": "Booth Stats",
+            },
+        ),
+        migrations.RunPython(backfill_booth_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:00
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction; building the
+    # indexes this way keeps the voter table writable on large databases.
+    atomic = False
+
+    dependencies = [
+        ("core_db", "0021_boothstats"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name="voter",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("full_name"),
+                    name="gin_trgm_ops",
+                ),
+                name="voter_full_name_trgm",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="voter",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("house_name"),
+                    name="gin_trgm_ops",
+                ),
+                name="voter_house_name_trgm",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="voter",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("epic_id"),
+                    name="gin_trgm_ops",
+                ),
+                name="voter_epic_id_trgm",
+            ),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:00
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Existing rows start with an empty key; fill them without locking the table:
+    #   python scripts/bulk_rewrite_voters.py phonetic-key
+    atomic = False
+
+    dependencies = [
+        ("core_db", "0022_voter_trigram_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="voter",
+            name="phonetic_key",
+            field=models.CharField(blank=True, default="", max_length=700),
+        ),
+        AddIndexConcurrently(
+            model_name="voter",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["phonetic_key"],
+                name="voter_phonetic_key_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0.2 on 2026-10-19 12:00
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("core_db", "0023_voter_phonetic_key"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="voter",
+            index=models.Index(
+                fields=["booth", "serial_no", "id"], name="voter_booth_serial_id"
+            ),
+        ),
+    ]
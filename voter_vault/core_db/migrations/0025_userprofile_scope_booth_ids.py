@@ -0,0 +1,42 @@
+# Generated by Django 6.0.2 on 2026-10-19 13:00
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+def backfill_scope_booth_ids(apps, schema_editor):
+    UserProfile = apps.get_model("core_db", "UserProfile")
+    Booth = apps.get_model("core_db", "Booth")
+    for profile in UserProfile.objects.all():
+        if profile.role == "CONSTITUENCY_ADMIN":
+            booths = Booth.objects.filter(constituency__in=profile.assigned_constituencies.all())
+        elif profile.role == "LOCAL_BODY_HEAD":
+            booths = Booth.objects.filter(local_body__in=profile.assigned_local_bodies.all())
+        elif profile.role in ("ZONE_COMMANDER", "BOOTH_AGENT"):
+            booths = profile.assigned_booths.all()
+        else:
+            continue
+        profile.scope_booth_ids = sorted(booths.values_list("id", flat=True))
+        profile.save(update_fields=["scope_booth_ids"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core_db", "0024_voter_booth_serial_id"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userprofile",
+            name="scope_booth_ids",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.BigIntegerField(),
+                blank=True,
+                default=list,
+                editable=False,
+                size=None,
+            ),
+        ),
+        migrations.RunPython(backfill_scope_booth_ids, migrations.RunPython.noop),
+    ]
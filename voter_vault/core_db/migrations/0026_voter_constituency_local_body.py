@@ -0,0 +1,121 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:00
+
+import django.db.models.deletion
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+BACKFILL_CHUNK = 50_000
+
+
+def backfill_voter_locations(apps, schema_editor):
+    """
+    Copies booth.constituency_id / booth.local_body_id onto voters in id ranges.
+    The migration is non-atomic, so every chunk commits on its own and row locks
+    are held for one chunk at a time; rerunning only touches rows still NULL.
+    """
+    Voter = apps.get_model("core_db", "Voter")
+    Booth = apps.get_model("core_db", "Booth")
+    voter_table = Voter._meta.db_table
+    booth_table = Booth._meta.db_table
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"SELECT MIN(id), MAX(id) FROM {voter_table}")
+        low, high = cursor.fetchone()
+        if low is None:
+            return
+        for start in range(low, high + 1, BACKFILL_CHUNK):
+            cursor.execute(
+                f"UPDATE {voter_table} v "
+                f"SET constituency_id = b.constituency_id, local_body_id = b.local_body_id "
+                f"FROM {booth_table} b "
+                f"WHERE v.booth_id = b.id AND v.id >= %s AND v.id < %s AND v.constituency_id IS NULL",
+                [start, start + BACKFILL_CHUNK],
+            )
+
+
+def _location_fk(db_constraint, **kwargs):
+    return models.ForeignKey(
+        blank=True,
+        db_index=False,
+        null=True,
+        related_name="voters",
+        db_constraint=db_constraint,
+        **kwargs,
+    )
+
+
+CONSTITUENCY_FK = dict(on_delete=django.db.models.deletion.CASCADE, to="core_db.constituency")
+LOCAL_BODY_FK = dict(on_delete=django.db.models.deletion.SET_NULL, to="core_db.localbody")
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("core_db", "0025_userprofile_scope_booth_ids"),
+    ]
+
+    operations = [
+        # Plain nullable columns first: ADD COLUMN is then a catalog-only change.
+        # An inline REFERENCES would validate every voter row under the
+        # ACCESS EXCLUSIVE lock; the FKs are added NOT VALID after the backfill.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.AddField(
+                    model_name="voter",
+                    name="constituency",
+                    field=_location_fk(False, **CONSTITUENCY_FK),
+                ),
+                migrations.AddField(
+                    model_name="voter",
+                    name="local_body",
+                    field=_location_fk(False, **LOCAL_BODY_FK),
+                ),
+            ],
+            state_operations=[
+                migrations.AddField(
+                    model_name="voter",
+                    name="constituency",
+                    field=_location_fk(True, **CONSTITUENCY_FK),
+                ),
+                migrations.AddField(
+                    model_name="voter",
+                    name="local_body",
+                    field=_location_fk(True, **LOCAL_BODY_FK),
+                ),
+            ],
+        ),
+        migrations.RunPython(backfill_voter_locations, migrations.RunPython.noop),
+        # NOT VALID only takes brief locks; VALIDATE scans under SHARE UPDATE EXCLUSIVE,
+        # so reads and writes to core_db_voter carry on meanwhile
+        migrations.RunSQL(
+            [
+                "ALTER TABLE core_db_voter ADD CONSTRAINT voter_constituency_id_fk "
+                "FOREIGN KEY (constituency_id) REFERENCES core_db_constituency (id) "
+                "DEFERRABLE INITIALLY DEFERRED NOT VALID",
+                "ALTER TABLE core_db_voter ADD CONSTRAINT voter_local_body_id_fk "
+                "FOREIGN KEY (local_body_id) REFERENCES core_db_localbody (id) "
+                "DEFERRABLE INITIALLY DEFERRED NOT VALID",
+            ],
+            [
+                "ALTER TABLE core_db_voter DROP CONSTRAINT IF EXISTS voter_constituency_id_fk",
+                "ALTER TABLE core_db_voter DROP CONSTRAINT IF EXISTS voter_local_body_id_fk",
+            ],
+        ),
+        migrations.RunSQL(
+            [
+                "ALTER TABLE core_db_voter VALIDATE CONSTRAINT voter_constituency_id_fk",
+                "ALTER TABLE core_db_voter VALIDATE CONSTRAINT voter_local_body_id_fk",
+            ],
+            migrations.RunSQL.noop,
+        ),
+        AddIndexConcurrently(
+            model_name="voter",
+            index=models.Index(
+                fields=["constituency", "voter_leaning"], name="voter_const_leaning"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="voter",
+            index=models.Index(fields=["local_body", "age"], name="voter_lb_age"),
+        ),
+    ]
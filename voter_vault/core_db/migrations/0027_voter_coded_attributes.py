@@ -0,0 +1,224 @@
+# Generated by Django 6.0.2 on 2026-10-19 15:00
+#
+# Expand / contract move of five varchar attributes to small-integer codes,
+# without a table rewrite or a long lock:
+#   1. add the *_code smallint columns (catalog-only change)
+#   2. backfill them in committed id-range chunks
+#   3. catch up rows written by the old code while 2 ran (updated_at)
+#   4. NOT NULL via a NOT VALID check validated online, indexes CONCURRENTLY
+#   5. switch the model fields to the code columns and drop the varchars
+
+import core_db.fields
+from django.db import migrations, models
+
+BACKFILL_CHUNK = 50_000
+
+# Frozen copies of the model code tables (codes are permanent)
+GENDER = {"": 0, "MALE": 1, "M": 1, "FEMALE": 2, "F": 2, "TRANSGENDER": 3, "T": 3, "TG": 3,
+          "THIRD GENDER": 3, "OTHER": 3, "N/A": 4}
+STATUS = {"VERIFIED": 1, "FLAGGED": 2, "AUTO_HEALED": 3}
+LOCATION = {"LOCAL": 1, "ABROAD": 2, "STATE": 3, "DISTRICT": 4}
+LEANING = {"UDF": 1, "LDF": 2, "NDA": 3, "NEUTRAL": 4}
+PROBABILITY = {"CONFIRMED": 1, "LIKELY": 2, "UNLIKELY": 3, "OUT_OF_STATION": 4}
+
+# new column -> (old column, codes, code for NULL / unknown values)
+COLUMNS = {
+    "gender_code": ("gender", GENDER, 0),
+    "status_code": ("status", STATUS, 1),
+    "location_code": ("current_location", LOCATION, None),
+    "leaning_code": ("voter_leaning", LEANING, None),
+    "probability_code": ("voting_probability", PROBABILITY, None),
+}
+
+
+def _case(old, codes, fallback):
+    whens = " ".join(f"WHEN '{value}' THEN {code}" for value, code in codes.items())
+    default = "NULL" if fallback is None else str(fallback)
+    return f"CASE UPPER(TRIM({old})) {whens} ELSE {default} END"
+
+
+def _assignments():
+    return ", ".join(
+        f"{new} = {_case(old, codes, fallback)}" for new, (old, codes, fallback) in COLUMNS.items()
+    )
+
+
+def backfill_codes(apps, schema_editor):
+    table = apps.get_model("core_db", "Voter")._meta.db_table
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT now()")
+        started, = cursor.fetchone()
+        cursor.execute(f"SELECT MIN(id), MAX(id) FROM {table}")
+        low, high = cursor.fetchone()
+        if low is not None:
+            # Every chunk commits on its own (non-atomic migration)
+            for start in range(low, high + 1, BACKFILL_CHUNK):
+                cursor.execute(
+                    f"UPDATE {table} SET {_assignments()} WHERE id >= %s AND id < %s",
+                    [start, start + BACKFILL_CHUNK],
+                )
+        # Rows inserted or edited by still-running old code during the backfill
+        cursor.execute(
+            f"UPDATE {table} SET {_assignments()} WHERE updated_at >= %s OR status_code IS NULL",
+            [started],
+        )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("core_db", "0026_voter_constituency_local_body"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            "ALTER TABLE core_db_voter "
+            "ADD COLUMN gender_code smallint, ADD COLUMN status_code smallint, "
+            "ADD COLUMN location_code smallint, ADD COLUMN leaning_code smallint, "
+            "ADD COLUMN probability_code smallint",
+            "ALTER TABLE core_db_voter "
+            "DROP COLUMN gender_code, DROP COLUMN status_code, DROP COLUMN location_code, "
+            "DROP COLUMN leaning_code, DROP COLUMN probability_code",
+        ),
+        migrations.RunPython(backfill_codes, migrations.RunPython.noop),
+        migrations.RunSQL(
+            [
+                "ALTER TABLE core_db_voter ALTER COLUMN gender_code SET DEFAULT 0, "
+                "ALTER COLUMN status_code SET DEFAULT 1",
+                "ALTER TABLE core_db_voter ADD CONSTRAINT voter_codes_not_null "
+                "CHECK (gender_code IS NOT NULL AND status_code IS NOT NULL) NOT VALID",
+                # Scans without blocking writes; SET NOT NULL then trusts the check
+                "ALTER TABLE core_db_voter VALIDATE CONSTRAINT voter_codes_not_null",
+                "ALTER TABLE core_db_voter ALTER COLUMN gender_code SET NOT NULL, "
+                "ALTER COLUMN status_code SET NOT NULL",
+                "ALTER TABLE core_db_voter DROP CONSTRAINT voter_codes_not_null",
+                "ALTER TABLE core_db_voter ALTER COLUMN gender_code DROP DEFAULT, "
+                "ALTER COLUMN status_code DROP DEFAULT",
+            ],
+            migrations.RunSQL.noop,
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS voter_location_code_idx ON core_db_voter (location_code)",
+            "DROP INDEX CONCURRENTLY IF EXISTS voter_location_code_idx",
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS voter_leaning_code_idx ON core_db_voter (leaning_code)",
+            "DROP INDEX CONCURRENTLY IF EXISTS voter_leaning_code_idx",
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS voter_probability_code_idx ON core_db_voter (probability_code)",
+            "DROP INDEX CONCURRENTLY IF EXISTS voter_probability_code_idx",
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS voter_const_leaning_code ON core_db_voter (constituency_id, leaning_code)",
+            "DROP INDEX CONCURRENTLY IF EXISTS voter_const_leaning_code",
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                # Dropping a column is catalog-only; its indexes (including the
+                # old voter_const_leaning) go with it, then the code index takes the name
+                migrations.RunSQL(
+                    "ALTER TABLE core_db_voter DROP COLUMN gender, DROP COLUMN status, "
+                    "DROP COLUMN current_location, DROP COLUMN voter_leaning, DROP COLUMN voting_probability",
+                    migrations.RunSQL.noop,
+                ),
+                migrations.RunSQL(
+                    "ALTER INDEX voter_const_leaning_code RENAME TO voter_const_leaning",
+                    "ALTER INDEX voter_const_leaning RENAME TO voter_const_leaning_code",
+                ),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name="voter",
+                    name="gender",
+                    field=core_db.fields.CodedField(
+                        blank=True,
+                        choices=[
+                            ("", "Unknown"),
+                            ("Male", "Male"),
+                            ("Female", "Female"),
+                            ("Transgender", "Transgender"),
+                            ("N/A", "Not Read (OCR)"),
+                        ],
+                        codes={"": 0, "Male": 1, "Female": 2, "Transgender": 3, "N/A": 4},
+                        aliases={
+                            "M": "Male",
+                            "F": "Female",
+                            "T": "Transgender",
+                            "TG": "Transgender",
+                            "Third Gender": "Transgender",
+                            "Other": "Transgender",
+                        },
+                        db_column="gender_code",
+                        default="",
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="voter",
+                    name="status",
+                    field=core_db.fields.CodedField(
+                        choices=[
+                            ("VERIFIED", "Verified"),
+                            ("FLAGGED", "Flagged for Review"),
+                            ("AUTO_HEALED", "Auto-Healed Serials"),
+                        ],
+                        codes={"VERIFIED": 1, "FLAGGED": 2, "AUTO_HEALED": 3},
+                        db_column="status_code",
+                        default="VERIFIED",
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="voter",
+                    name="current_location",
+                    field=core_db.fields.CodedField(
+                        blank=True,
+                        choices=[
+                            ("LOCAL", "Local"),
+                            ("ABROAD", "Abroad"),
+                            ("STATE", "Another State"),
+                            ("DISTRICT", "Another District"),
+                        ],
+                        codes={"LOCAL": 1, "ABROAD": 2, "STATE": 3, "DISTRICT": 4},
+                        db_column="location_code",
+                        db_index=True,
+                        null=True,
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="voter",
+                    name="voter_leaning",
+                    field=core_db.fields.CodedField(
+                        blank=True,
+                        choices=[
+                            ("UDF", "UDF"),
+                            ("LDF", "LDF"),
+                            ("NDA", "NDA"),
+                            ("NEUTRAL", "Neutral"),
+                        ],
+                        codes={"UDF": 1, "LDF": 2, "NDA": 3, "NEUTRAL": 4},
+                        db_column="leaning_code",
+                        db_index=True,
+                        null=True,
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="voter",
+                    name="voting_probability",
+                    field=core_db.fields.CodedField(
+                        blank=True,
+                        choices=[
+                            ("CONFIRMED", "Confirmed"),
+                            ("LIKELY", "Likely"),
+                            ("UNLIKELY", "Unlikely"),
+                            ("OUT_OF_STATION", "Out of Station"),
+                        ],
+                        codes={"CONFIRMED": 1, "LIKELY": 2, "UNLIKELY": 3, "OUT_OF_STATION": 4},
+                        db_column="probability_code",
+                        db_index=True,
+                        null=True,
+                    ),
+                ),
+            ],
+        ),
+    ]
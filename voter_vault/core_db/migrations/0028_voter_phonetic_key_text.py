@@ -0,0 +1,20 @@
+# Generated by Django 6.0.2 on 2026-10-19 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # varchar(700) -> text is binary-coercible in PostgreSQL: no table rewrite,
+    # and the trigram index on the column is kept as is.
+
+    dependencies = [
+        ("core_db", "0027_voter_coded_attributes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="voter",
+            name="phonetic_key",
+            field=models.TextField(blank=True, default=""),
+        ),
+    ]
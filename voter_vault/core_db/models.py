@@ -1,5 +1,30 @@
 from django.db import models
+from django.db.models.functions import Upper
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.utils.translation import gettext_lazy as _
+from .fields import CodedField
+
+@models.Field.register_lookup
+class AnyLookup(models.Lookup):
+    """
+    field__any=[...] -> "field = ANY(%s)" with the whole list as one array
+    parameter: a plain B-tree probe per element, and the SQL text (and so the
+    plan) is the same however many ids the list holds.
+    """
+    lookup_name = 'any'
+    prepare_rhs = False
+
+    def get_db_prep_lookup(self, value, connection):
+        return '%s', [list(value)]
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} = ANY({rhs})', (*lhs_params, *rhs_params)
+
+# Relation fields only look up lookups registered from ForeignObject down
+models.ForeignKey.register_lookup(AnyLookup)
 
 class Constituency(models.Model):
     name = models.CharField(max_length=200, unique=True, help_text="e.g. Trippunithura")
@@ -49,6 +74,16 @@ class Booth(models.Model):
     def __str__(self):
         return f"{self.constituency.name} - Booth {self.number}"
 
+    def save(self, *args, **kwargs):
+        moved = False
+        if self.pk:
+            old = Booth.objects.filter(pk=self.pk).values('constituency_id', 'local_body_id').first()
+            moved = old is not None and (old['constituency_id'], old['local_body_id']) != (self.constituency_id, self.local_body_id)
+        super().save(*args, **kwargs)
+        if moved:
+            # Keep the denormalized Voter columns on the booth's new parents
+            self.voters.update(constituency_id=self.constituency_id, local_body_id=self.local_body_id)
+
 class Voter(models.Model):
     SERIAL_STATUS = [
         ('VERIFIED', 'Verified'),
@@ -56,8 +91,28 @@ class Voter(models.Model):
         ('AUTO_HEALED', 'Auto-Healed Serials'),
     ]
 
+    # Low-cardinality attributes are stored as small-int codes (see CodedField).
+    # Codes are permanent: append new values, never renumber.
+    GENDER_CHOICES = [
+        ('', 'Unknown'),
+        ('Male', 'Male'),
+        ('Female', 'Female'),
+        ('Transgender', 'Transgender'),
+        ('N/A', 'Not Read (OCR)'),
+    ]
+    GENDER_CODES = {'': 0, 'Male': 1, 'Female': 2, 'Transgender': 3, 'N/A': 4}
+    GENDER_ALIASES = {'M': 'Male', 'F': 'Female', 'T': 'Transgender', 'TG': 'Transgender', 'Third Gender': 'Transgender', 'Other': 'Transgender'}
+    STATUS_CODES = {'VERIFIED': 1, 'FLAGGED': 2, 'AUTO_HEALED': 3}
+    LOCATION_CODES = {'LOCAL': 1, 'ABROAD': 2, 'STATE': 3, 'DISTRICT': 4}
+    LEANING_CODES = {'UDF': 1, 'LDF': 2, 'NDA': 3, 'NEUTRAL': 4}
+    PROBABILITY_CODES = {'CONFIRMED': 1, 'LIKELY': 2, 'UNLIKELY': 3, 'OUT_OF_STATION': 4}
+
     # Links
     booth = models.ForeignKey(Booth, on_delete=models.CASCADE, related_name='voters')
+    # Copies of booth.constituency / booth.local_body so scoped filters skip the booth join.
+    # Set on insert (save() or explicitly for bulk_create) and rewritten by Booth.save() on a move.
+    constituency = models.ForeignKey(Constituency, on_delete=models.CASCADE, null=True, blank=True, related_name='voters', db_index=False)
+    local_body = models.ForeignKey(LocalBody, on_delete=models.SET_NULL, null=True, blank=True, related_name='voters', db_index=False)
     
     # Core Data
     serial_no = models.PositiveIntegerField()
@@ -72,7 +127,10 @@ class Voter(models.Model):
     house_no = models.CharField(max_length=100, blank=True)
     house_name = models.CharField(max_length=300, blank=True, db_index=True)
     age = models.PositiveIntegerField(null=True, blank=True)
-    gender = models.CharField(max_length=20, blank=True)
+    gender = CodedField(codes=GENDER_CODES, aliases=GENDER_ALIASES, choices=GENDER_CHOICES, default='', blank=True, db_column='gender_code')
+
+    # Cross-script search key "<name>|<house>" (romanized + collapsed, see core/transliteration.py)
+    phonetic_key = models.TextField(blank=True, default='')
     
     # Custom Fields (Actionable Campaign Intelligence)
     phone_no = models.CharField(max_length=20, blank=True, null=True, db_index=True)
@@ -83,7 +141,7 @@ class Voter(models.Model):
         ('STATE', 'Another State'),
         ('DISTRICT', 'Another District'),
     ]
-    current_location = models.CharField(max_length=20, choices=LOCATION_CHOICES, db_index=True, null=True, blank=True)
+    current_location = CodedField(codes=LOCATION_CODES, choices=LOCATION_CHOICES, db_index=True, null=True, blank=True, db_column='location_code')
 
     LEANING_CHOICES = [
         ('UDF', 'UDF'),
@@ -91,7 +149,7 @@ class Voter(models.Model):
         ('NDA', 'NDA'),
         ('NEUTRAL', 'Neutral'),
     ]
-    voter_leaning = models.CharField(max_length=20, choices=LEANING_CHOICES, db_index=True, null=True, blank=True)
+    voter_leaning = CodedField(codes=LEANING_CODES, choices=LEANING_CHOICES, db_index=True, null=True, blank=True, db_column='leaning_code')
 
     PROBABILITY_CHOICES = [
         ('CONFIRMED', 'Confirmed'),
@@ -99,12 +157,12 @@ class Voter(models.Model):
         ('UNLIKELY', 'Unlikely'),
         ('OUT_OF_STATION', 'Out of Station'),
     ]
-    voting_probability = models.CharField(max_length=20, choices=PROBABILITY_CHOICES, db_index=True, null=True, blank=True)
+    voting_probability = CodedField(codes=PROBABILITY_CODES, choices=PROBABILITY_CHOICES, db_index=True, null=True, blank=True, db_column='probability_code')
     
     # Audit Trail
     source_file = models.CharField(max_length=300, help_text="Original PDF Filename")
     original_serial = models.CharField(max_length=50, blank=True, help_text="Raw OCR value if needed")
-    status = models.CharField(max_length=20, choices=SERIAL_STATUS, default='VERIFIED')
+    status = CodedField(codes=STATUS_CODES, choices=SERIAL_STATUS, default='VERIFIED', db_column='status_code')
     created_by = models.ForeignKey('auth.User', on_delete=models.SET_NULL, null=True, blank=True, related_name='uploaded_voters', help_text="User who uploaded this batch")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -114,10 +172,200 @@ class Voter(models.Model):
         permissions = [
             ("can_export_data", "Can export voter data to Excel"),
         ]
+        indexes = [
+            # pg_trgm indexes serving the icontains search (UPPER(col) LIKE UPPER('%term%'))
+            GinIndex(OpClass(Upper('full_name'), name='gin_trgm_ops'), name='voter_full_name_trgm'),
+            GinIndex(OpClass(Upper('house_name'), name='gin_trgm_ops'), name='voter_house_name_trgm'),
+            GinIndex(OpClass(Upper('epic_id'), name='gin_trgm_ops'), name='voter_epic_id_trgm'),
+            GinIndex(fields=['phonetic_key'], opclasses=['gin_trgm_ops'], name='voter_phonetic_key_trgm'),
+            # Keyset pagination order for /api/voters cursors (also serves booth + serial lookups)
+            models.Index(fields=['booth', 'serial_no', 'id'], name='voter_booth_serial_id'),
+            # Constituency / local body scoped filters and dashboards
+            models.Index(fields=['constituency', 'voter_leaning'], name='voter_const_leaning'),
+            models.Index(fields=['local_body', 'age'], name='voter_lb_age'),
+        ]
 
     def __str__(self):
         return f"{self.full_name} ({self.epic_id})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_booth_id = instance.__dict__.get('booth_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Copy the booth's parents for new voters and booth reassignments only
+        if self.booth_id and (self.constituency_id is None or self.booth_id != getattr(self, '_loaded_booth_id', None)):
+            self.constituency_id = self.booth.constituency_id
+            self.local_body_id = self.booth.local_body_id
+            self._loaded_booth_id = self.booth_id
+        super().save(*args, **kwargs)
+
+
+class BoothStats(models.Model):
+    """
+    Per-booth rollup of the dashboard counters, so any scope can be summed from
+    a few hundred rows instead of scanning its voters.
+    Kept current by save_booth_data (bulk inserts) and update_voter_in_db (edits);
+    scripts/rebuild_booth_stats.py recomputes it from Voter rows for repair.
+    """
+    booth = models.OneToOneField(Booth, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+
+    total = models.PositiveIntegerField(default=0)
+    male = models.PositiveIntegerField(default=0)
+    female = models.PositiveIntegerField(default=0)
+
+    age_18_25 = models.PositiveIntegerField(default=0)
+    age_26_35 = models.PositiveIntegerField(default=0)
+    age_36_45 = models.PositiveIntegerField(default=0)
+    age_46_60 = models.PositiveIntegerField(default=0)
+    age_60_plus = models.PositiveIntegerField(default=0)
+
+    udf = models.PositiveIntegerField(default=0)
+    ldf = models.PositiveIntegerField(default=0)
+    nda = models.PositiveIntegerField(default=0)
+    neutral = models.PositiveIntegerField(default=0)
+
+    loc_local = models.PositiveIntegerField(default=0)
+    loc_abroad = models.PositiveIntegerField(default=0)
+    loc_state = models.PositiveIntegerField(default=0)
+    loc_district = models.PositiveIntegerField(default=0)
+
+    prob_confirmed = models.PositiveIntegerField(default=0)
+    prob_likely = models.PositiveIntegerField(default=0)
+    prob_unlikely = models.PositiveIntegerField(default=0)
+    prob_out_of_station = models.PositiveIntegerField(default=0)
+
+    with_phone = models.PositiveIntegerField(default=0)
+    tagged = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Counter -> Voter filter. counters_for() must agree with these row by row.
+    COUNTERS = {
+        'male': models.Q(gender='Male'),
+        'female': models.Q(gender='Female'),
+        'age_18_25': models.Q(age__gte=18, age__lte=25),
+        'age_26_35': models.Q(age__gte=26, age__lte=35),
+        'age_36_45': models.Q(age__gte=36, age__lte=45),
+        'age_46_60': models.Q(age__gte=46, age__lte=60),
+        'age_60_plus': models.Q(age__gt=60),
+        'udf': models.Q(voter_leaning='UDF'),
+        'ldf': models.Q(voter_leaning='LDF'),
+        'nda': models.Q(voter_leaning='NDA'),
+        'neutral': models.Q(voter_leaning='NEUTRAL'),
+        'loc_local': models.Q(current_location='LOCAL'),
+        'loc_abroad': models.Q(current_location='ABROAD'),
+        'loc_state': models.Q(current_location='STATE'),
+        'loc_district': models.Q(current_location='DISTRICT'),
+        'prob_confirmed': models.Q(voting_probability='CONFIRMED'),
+        'prob_likely': models.Q(voting_probability='LIKELY'),
+        'prob_unlikely': models.Q(voting_probability='UNLIKELY'),
+        'prob_out_of_station': models.Q(voting_probability='OUT_OF_STATION'),
+        'with_phone': models.Q(phone_no__isnull=False) & ~models.Q(phone_no=''),
+        # Tagging Progress (anyone with either leaning, location, or phone)
+        'tagged': (
+            models.Q(voter_leaning__isnull=False) |
+            models.Q(current_location__isnull=False) |
+            models.Q(phone_no__isnull=False)
+        ),
+    }
+    FIELDS = ['total'] + list(COUNTERS)
+
+    class Meta:
+        verbose_name_plural = "Booth Stats"
+
+    def __str__(self):
+        return f"Stats for booth {self.booth_id}"
+
+    @classmethod
+    def counters_for(cls, voter):
+        """Counter vector (name -> 0/1) for one in-memory Voter, mirroring COUNTERS."""
+        gender = voter.gender
+        age = voter.age
+        leaning, location, probability, phone = voter.voter_leaning, voter.current_location, voter.voting_probability, voter.phone_no
+        return {
+            'total': 1,
+            'male': int(gender == 'Male'),
+            'female': int(gender == 'Female'),
+            'age_18_25': int(age is not None and 18 <= age <= 25),
+            'age_26_35': int(age is not None and 26 <= age <= 35),
+            'age_36_45': int(age is not None and 36 <= age <= 45),
+            'age_46_60': int(age is not None and 46 <= age <= 60),
+            'age_60_plus': int(age is not None and age > 60),
+            'udf': int(leaning == 'UDF'),
+            'ldf': int(leaning == 'LDF'),
+            'nda': int(leaning == 'NDA'),
+            'neutral': int(leaning == 'NEUTRAL'),
+            'loc_local': int(location == 'LOCAL'),
+            'loc_abroad': int(location == 'ABROAD'),
+            'loc_state': int(location == 'STATE'),
+            'loc_district': int(location == 'DISTRICT'),
+            'prob_confirmed': int(probability == 'CONFIRMED'),
+            'prob_likely': int(probability == 'LIKELY'),
+            'prob_unlikely': int(probability == 'UNLIKELY'),
+            'prob_out_of_station': int(probability == 'OUT_OF_STATION'),
+            'with_phone': int(phone is not None and phone != ''),
+            # Unset coded values are NULL, never '' (see CodedField)
+            'tagged': int(leaning is not None or location is not None or phone is not None),
+        }
+
+    @classmethod
+    def sum_counters(cls, voters):
+        """Adds up counters_for() over an iterable of in-memory Voters."""
+        totals = dict.fromkeys(cls.FIELDS, 0)
+        for voter in voters:
+            for name, value in cls.counters_for(voter).items():
+                totals[name] += value
+        return totals
+
+    @classmethod
+    def aggregates(cls):
+        """Count() expressions computing every counter over a Voter queryset."""
+        return dict(
+            total=models.Count('id'),
+            **{name: models.Count('id', filter=q) for name, q in cls.COUNTERS.items()}
+        )
+
+    @classmethod
+    def apply_delta(cls, booth_id, delta):
+        """Atomically adds a counter delta to one booth's rollup (rebuilds it if missing)."""
+        changes = {name: models.F(name) + value for name, value in delta.items() if value}
+        if not changes:
+            return
+        if not cls.objects.filter(booth_id=booth_id).update(**changes):
+            cls.rebuild(booth_ids=[booth_id])
+
+    @classmethod
+    def rebuild(cls, booth_ids=None):
+        """
+        Recomputes rollups from Voter rows in one grouped aggregate and upserts them.
+        Booths without voters get zeroed rows. Returns the number of booths written.
+        """
+        booths = Booth.objects.all()
+        voters = Voter.objects.all()
+        if booth_ids is not None:
+            booths = booths.filter(id__in=booth_ids)
+            voters = voters.filter(booth_id__in=booth_ids)
+
+        rows = {
+            row.pop('booth_id'): row
+            for row in voters.order_by().values('booth_id').annotate(**cls.aggregates())
+        }
+        objs = [
+            cls(booth_id=booth_id, **rows.get(booth_id, dict.fromkeys(cls.FIELDS, 0)))
+            for booth_id in booths.values_list('id', flat=True)
+        ]
+        cls.objects.bulk_create(
+            objs,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['booth'],
+            update_fields=cls.FIELDS + ['updated_at'],
+        )
+        return len(objs)
+
 class PoliticalParty(models.Model):
     name = models.CharField(max_length=200, unique=True)
     short_label = models.CharField(max_length=10, blank=True, help_text="e.g. INC, CPIM, BJP")
@@ -185,9 +433,15 @@ class UserProfile(models.Model):
         related_name='assigned_users'
     )
     
+    # Booth ids the assignments above resolve to for the booth-scoped roles,
+    # kept by refresh_scope() so scoped queries skip the assignment joins
+    scope_booth_ids = ArrayField(models.BigIntegerField(), default=list, blank=True, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    SCOPED_ROLES = ('CONSTITUENCY_ADMIN', 'LOCAL_BODY_HEAD', 'ZONE_COMMANDER', 'BOOTH_AGENT')
+    
     class Meta:
         verbose_name = "User Profile"
         verbose_name_plural = "User Profiles"
@@ -211,22 +465,69 @@ class UserProfile(models.Model):
             # Operator sees only voters from batches they personally uploaded
             return Voter.objects.filter(created_by=self.user)
             
-        elif self.role == 'CONSTITUENCY_ADMIN':
-            return Voter.objects.filter(booth__constituency__in=self.assigned_constituencies.all())
-        
+        elif self.role in self.SCOPED_ROLES:
+            # Constituency / local body / zone / booth scopes, pre-resolved to booth ids
+            return Voter.objects.filter(booth_id__any=self.scope_booth_ids)
+            
+        return Voter.objects.none()
+
+    def get_accessible_booths(self):
+        """
+        Returns queryset of booths whose voters this user can fully access,
+        or None when the scope is not booth-shaped (OPERATOR: own batches only).
+        """
+        if self.role in ('SUPERUSER', 'MANAGER'):
+            return Booth.objects.all()
+
+        elif self.role == 'OPERATOR':
+            return None
+
+        elif self.role in self.SCOPED_ROLES:
+            return Booth.objects.filter(id__any=self.scope_booth_ids)
+
+        return Booth.objects.none()
+
+    def resolve_scope_booths(self):
+        """Booths the role's assignments cover, resolved through the assignment tables"""
+        if self.role == 'CONSTITUENCY_ADMIN':
+            return Booth.objects.filter(constituency__in=self.assigned_constituencies.all())
+
         elif self.role == 'LOCAL_BODY_HEAD':
             # Local Body Head manages all booths in their municipality/panchayat
-            return Voter.objects.filter(booth__local_body__in=self.assigned_local_bodies.all())
-            
-        elif self.role == 'ZONE_COMMANDER':
+            return Booth.objects.filter(local_body__in=self.assigned_local_bodies.all())
+
+        elif self.role in ('ZONE_COMMANDER', 'BOOTH_AGENT'):
             # Zone Commander manages a cluster of booths
             # We use assigned_booths to define the "Zone"
-            return Voter.objects.filter(booth__in=self.assigned_booths.all())
-            
-        elif self.role == 'BOOTH_AGENT':
-            return Voter.objects.filter(booth__in=self.assigned_booths.all())
-            
-        return Voter.objects.none()
+            return Booth.objects.filter(id__in=self.assigned_booths.all())
+
+        return Booth.objects.none()
+
+    def refresh_scope(self):
+        """Recomputes scope_booth_ids; call after role or assignment changes"""
+        self.scope_booth_ids = sorted(self.resolve_scope_booths().values_list('id', flat=True))
+        UserProfile.objects.filter(pk=self.pk).update(scope_booth_ids=self.scope_booth_ids)
+        return self.scope_booth_ids
+
+    @classmethod
+    def refresh_scopes_for_booths(cls, booths):
+        """
+        Refreshes every profile whose scope could gain or lose these booths
+        (new booths, or booths moved to another constituency / local body).
+        Returns the refreshed profiles' user ids.
+        """
+        booth_ids = [b.id for b in booths]
+        affected = cls.objects.filter(
+            models.Q(assigned_constituencies__in={b.constituency_id for b in booths}) |
+            models.Q(assigned_local_bodies__in={b.local_body_id for b in booths if b.local_body_id}) |
+            models.Q(assigned_booths__in=booth_ids) |
+            models.Q(scope_booth_ids__overlap=booth_ids)
+        ).distinct()
+        user_ids = []
+        for profile in affected:
+            profile.refresh_scope()
+            user_ids.append(profile.user_id)
+        return user_ids
 
 class MessageTemplate(models.Model):
     TYPES = [
@@ -0,0 +1,284 @@
+import os
+import sys
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+
+from core_db.models import Booth, BoothStats, Constituency, LocalBody, UserProfile, Voter
+from voter_vault.db_pool.pool import ConnectionPool, _params_key
+
+# core/ lives next to the Django project, as for the scripts
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from core import profile_cache, stats_cache
+from core.db_bridge import get_dashboard_stats, save_booth_data, update_voter_in_db, voter_search_filter
+
+
+class DashboardStatsQueryTests(TestCase):
+    """get_dashboard_stats must stay one statement whatever the role's scope"""
+
+    @classmethod
+    def setUpTestData(cls):
+        kottayam = Constituency.objects.create(name="Kottayam")
+        pala = Constituency.objects.create(name="Pala")
+        municipality = LocalBody.objects.create(constituency=kottayam, name="Kottayam", body_type='MUNICIPALITY')
+        panchayat = LocalBody.objects.create(constituency=pala, name="Pala")
+
+        cls.operator = User.objects.create_user("operator")
+        booths = [
+            Booth.objects.create(constituency=kottayam, local_body=municipality, number="1"),
+            Booth.objects.create(constituency=kottayam, local_body=municipality, number="2"),
+            Booth.objects.create(constituency=pala, local_body=panchayat, number="1"),
+        ]
+        serial = 0
+        for booth in booths:
+            for age, gender, leaning in [(22, 'Male', 'UDF'), (41, 'Female', None), (67, 'Female', 'LDF')]:
+                serial += 1
+                Voter.objects.create(
+                    booth=booth, serial_no=serial, epic_id=f"ABC{serial:07d}", full_name=f"Voter {serial}",
+                    age=age, gender=gender, voter_leaning=leaning, source_file="test.pdf",
+                    created_by=cls.operator if booth is booths[0] else None,
+                )
+        BoothStats.rebuild()
+
+        cls.profiles = {
+            'SUPERUSER': cls._profile("root", 'SUPERUSER'),
+            'MANAGER': cls._profile("manager", 'MANAGER'),
+            'OPERATOR': cls._profile(cls.operator, 'OPERATOR'),
+            'CONSTITUENCY_ADMIN': cls._profile("mla", 'CONSTITUENCY_ADMIN', constituencies=[kottayam]),
+            'LOCAL_BODY_HEAD': cls._profile("chairman", 'LOCAL_BODY_HEAD', local_bodies=[panchayat]),
+            'ZONE_COMMANDER': cls._profile("zone", 'ZONE_COMMANDER', booths=booths[1:]),
+            'BOOTH_AGENT': cls._profile("agent", 'BOOTH_AGENT', booths=booths[:1]),
+        }
+        cls.expected_totals = {
+            'SUPERUSER': 9, 'MANAGER': 9, 'OPERATOR': 3,
+            'CONSTITUENCY_ADMIN': 6, 'LOCAL_BODY_HEAD': 3, 'ZONE_COMMANDER': 6, 'BOOTH_AGENT': 3,
+        }
+
+    @staticmethod
+    def _profile(user, role, constituencies=(), local_bodies=(), booths=()):
+        if isinstance(user, str):
+            user = User.objects.create_user(user)
+        profile = UserProfile.objects.create(user=user, role=role)
+        profile.assigned_constituencies.set(constituencies)
+        profile.assigned_local_bodies.set(local_bodies)
+        profile.assigned_booths.set(booths)
+        profile.refresh_scope()
+        return profile
+
+    def test_one_query_per_role(self):
+        for role, profile in self.profiles.items():
+            with self.subTest(role=role):
+                with self.assertNumQueries(1):
+                    stats = get_dashboard_stats(profile, use_cache=False)
+                self.assertEqual(stats['total'], self.expected_totals[role])
+
+    def test_one_query_with_filters(self):
+        booth = Booth.objects.get(constituency__name="Kottayam", number="2")
+        for role, profile in self.profiles.items():
+            with self.subTest(role=role):
+                with self.assertNumQueries(1):
+                    get_dashboard_stats(profile, constituency_id=booth.constituency_id, booth_id=booth.id, use_cache=False)
+
+    def test_rollups_match_voter_scan(self):
+        for role, profile in self.profiles.items():
+            with self.subTest(role=role):
+                self.assertEqual(
+                    get_dashboard_stats(profile, use_cache=False),
+                    get_dashboard_stats(profile, use_rollups=False),
+                )
+
+
+class SaveBoothDataTests(TestCase):
+    """Both ingest paths must write the same voters and rollup"""
+
+    ROWS = [
+        {"Serial_OCR": "1", "EPIC_ID": "KLA1234567", "Full Name": "സിന്ധു", "House Name": "പള്ളിപ്പറമ്പിൽ",
+         "Age": "34", "Gender": "F"},
+        {"Serial_OCR": "2", "EPIC_ID": "KLA7654321", "Full Name": "Tab\tand\\backslash", "House Name": "",
+         "Age": "", "Gender": "Male"},
+    ]
+
+    def _save(self, method, booth_number):
+        ok, message = save_booth_data("Kottayam", 'MUNICIPALITY', "Kottayam", booth_number, self.ROWS,
+                                      "part.pdf", ingest_method=method)
+        self.assertTrue(ok, message)
+        return Booth.objects.get(number=booth_number)
+
+    def test_copy_matches_bulk_create(self):
+        copied = self._save('copy', "1")
+        created = self._save('bulk_create', "2")
+        fields = ['serial_no', 'epic_id', 'full_name', 'house_name', 'phonetic_key', 'age', 'gender',
+                  'status', 'constituency_id', 'local_body_id']
+        self.assertEqual(
+            list(copied.voters.values_list(*fields)),
+            list(created.voters.values_list(*fields)),
+        )
+        self.assertEqual(copied.voters.count(), 2)
+        self.assertEqual(copied.stats.total, 2)
+        self.assertEqual(copied.stats.female, 1)
+
+
+class ConnectionPoolTests(TestCase):
+    """The pool must hand out clean sessions on the configured database"""
+
+    def setUp(self):
+        params = connection.get_connection_params()
+        self.pool = ConnectionPool('pool_test', _params_key(params), min_size=1, max_size=2, timeout=5,
+                                   max_idle=300, check_after=30, max_lifetime=3600)
+        self.connect = lambda: connection.get_new_connection(params)
+        self.addCleanup(self.pool.retire)
+
+    def _query(self, conn, sql):
+        with conn.cursor() as cursor:
+            cursor.execute(sql)
+            return cursor.fetchone()[0] if cursor.description else None
+
+    def test_connected_to_test_database(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT current_database()")
+            self.assertEqual(cursor.fetchone()[0], connection.settings_dict['NAME'])
+
+    def test_returned_connections_are_reset(self):
+        conn = self.pool.getconn(self.connect)
+        conn.autocommit = True
+        backend_pid = self._query(conn, "SELECT pg_backend_pid()")
+        self._query(conn, "SET statement_timeout = '1234ms'")
+        self._query(conn, "CREATE TEMP TABLE pool_leak (x int)")
+        self.pool.putconn(conn)
+
+        conn = self.pool.getconn(self.connect)
+        self.assertEqual(self._query(conn, "SELECT pg_backend_pid()"), backend_pid)
+        self.assertEqual(self._query(conn, "SHOW statement_timeout"), '0')
+        self.assertIsNone(self._query(conn, "SELECT to_regclass('pg_temp.pool_leak')"))
+        self.pool.putconn(conn)
+
+    def test_retired_pool_closes_connections(self):
+        idle = self.pool.getconn(self.connect)
+        out = self.pool.getconn(self.connect)
+        self.pool.putconn(idle)
+        self.pool.retire()
+        self.assertTrue(idle.closed)
+        self.pool.putconn(out)
+        self.assertTrue(out.closed)
+        self.assertEqual(self.pool.stats()['size'], 0)
+
+
+class AdminCacheInvalidationTests(TestCase):
+    """Admin edits must invalidate the same caches as the API's own writes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", password="x")
+        cls.kottayam = Constituency.objects.create(name="Kottayam")
+        cls.booth = Booth.objects.create(constituency=cls.kottayam, number="1")
+        cls.mla = UserProfile.objects.create(user=User.objects.create_user("mla"), role='CONSTITUENCY_ADMIN')
+        cls.mla.assigned_constituencies.set([cls.kottayam])
+        cls.mla.refresh_scope()
+
+    def setUp(self):
+        stats_cache.set_backend(stats_cache.LocalBackend(256))
+        self.addCleanup(stats_cache.set_backend, None)
+        self.client.force_login(self.admin)
+
+    def _profile_version(self, profile):
+        return stats_cache.get_backend().get_versions([profile_cache._version_name(profile.user_id)])[0]
+
+    def test_profile_change_invalidates_cached_profile(self):
+        before = self._profile_version(self.mla)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f"/admin/core_db/userprofile/{self.mla.pk}/change/", {
+                "user": self.mla.user_id, "role": 'BOOTH_AGENT', "assigned_booths": [self.booth.pk],
+            })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self._profile_version(self.mla), before + 1)
+
+    def test_booth_add_invalidates_scoped_profiles(self):
+        before = self._profile_version(self.mla)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/admin/core_db/booth/add/", {
+                "constituency": self.kottayam.pk, "number": "2",
+            })
+        self.assertEqual(response.status_code, 302)
+        self.mla.refresh_from_db()
+        self.assertEqual(len(self.mla.scope_booth_ids), 2)
+        self.assertEqual(self._profile_version(self.mla), before + 1)
+
+    def _stats_version(self, level, ident):
+        return stats_cache.get_backend().get_versions([stats_cache._version_name('voters', level, ident)])[0]
+
+    def test_voter_edit_and_delete_invalidate_stats(self):
+        voter = Voter.objects.create(booth=self.booth, serial_no=1, epic_id="ABC0000001", full_name="Voter",
+                                     source_file="test.pdf")
+        before = self._stats_version(stats_cache.BOOTH, self.booth.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f"/admin/core_db/voter/{voter.pk}/change/", {
+                "booth": self.booth.pk, "serial_no": 1, "epic_id": "ABC0000001", "full_name": "Renamed",
+                "status": 'VERIFIED', "gender": 'Female', "source_file": "test.pdf",
+            })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.booth.stats.female, 1)
+        self.assertEqual(self._stats_version(stats_cache.BOOTH, self.booth.pk), before + 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f"/admin/core_db/voter/{voter.pk}/delete/", {"post": "yes"})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self._stats_version(stats_cache.BOOTH, self.booth.pk), before + 2)
+
+    def test_booth_move_invalidates_both_constituencies(self):
+        pala = Constituency.objects.create(name="Pala")
+        before = {c.pk: self._stats_version(stats_cache.CONSTITUENCY, c.pk) for c in (self.kottayam, pala)}
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f"/admin/core_db/booth/{self.booth.pk}/change/", {
+                "constituency": pala.pk, "number": "1",
+            })
+        self.assertEqual(response.status_code, 302)
+        for constituency_id, version in before.items():
+            self.assertEqual(self._stats_version(stats_cache.CONSTITUENCY, constituency_id), version + 1)
+
+    def test_booth_and_constituency_changes_invalidate_location_trees(self):
+        def version():
+            return stats_cache.get_backend().get_versions(
+                [stats_cache._version_name('locations', stats_cache.CONSTITUENCY, self.kottayam.pk)])[0]
+
+        before = version()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/admin/core_db/booth/add/", {"constituency": self.kottayam.pk, "number": "2"})
+        self.assertEqual(version(), before + 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f"/admin/core_db/constituency/{self.kottayam.pk}/change/", {"name": "Kottayam", "code": "KTM"})
+        self.assertEqual(version(), before + 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f"/admin/core_db/constituency/{self.kottayam.pk}/delete/", {"post": "yes"})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(version(), before + 3)
+
+
+class VoterSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        booth = Booth.objects.create(constituency=Constituency.objects.create(name="Kottayam"), number="1")
+        cls.lower = Voter.objects.create(booth=booth, serial_no=1, epic_id="kla1234567", full_name="Sindhu",
+                                         source_file="test.pdf")
+        cls.named = Voter.objects.create(booth=booth, serial_no=2, epic_id="XYZ0000001", full_name="KLA123 Nair",
+                                         house_name="Kla1234 House", source_file="test.pdf")
+
+    def _search(self, term):
+        return set(Voter.objects.filter(voter_search_filter(term)).values_list('id', flat=True))
+
+    def test_epic_prefix_is_case_insensitive(self):
+        self.assertIn(self.lower.id, self._search("KLA123"))
+        self.assertIn(self.lower.id, self._search("kla1234567"))
+
+    def test_epic_shaped_terms_still_match_names_and_houses(self):
+        self.assertIn(self.named.id, self._search("kla123"))
+        self.assertIn(self.named.id, self._search("KLA1234"))
+
+    def test_edits_store_normalized_epic(self):
+        ok, message = update_voter_in_db(self.lower.id, {"epic_id": " kla 7654321 "})
+        self.assertTrue(ok, message)
+        self.lower.refresh_from_db()
+        self.assertEqual(self.lower.epic_id, "KLA7654321")
@@ -0,0 +1,33 @@
+"""
+PostgreSQL backend with a per-process connection pool (see pool.py).
+
+ENGINE = "voter_vault.db_pool", tuned by the "POOL" key of the database
+settings. Everything except opening and closing the raw connection is the
+stock postgresql backend.
+"""
+
+from django.db.backends.postgresql import base as postgresql_base
+from django.db.backends.postgresql import creation as postgresql_creation
+
+from .pool import close_pool, get_pool
+
+
+class DatabaseCreation(postgresql_creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Django "closed" the test database connections into the pool; DROP DATABASE needs them gone
+        close_pool(self.connection.alias)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(postgresql_base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def get_new_connection(self, conn_params):
+        pool = get_pool(self.alias, self.settings_dict, conn_params)
+        connection = pool.getconn(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params))
+        self._pool = pool  # returned to the pool it came from, even if the settings changed since
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            self._pool.putconn(self.connection)
@@ -0,0 +1,276 @@
+"""
+Connection pool behind the voter_vault.db_pool database backend.
+
+One pool per process and database alias, shared by all threads. Django
+"closing" a connection (request end, close_old_connections, CONN_MAX_AGE=0)
+hands it back here instead of disconnecting, so API threads, scripts and
+workers reuse at most POOL["MAX_SIZE"] server connections per process.
+
+Returned connections are reset with DISCARD ALL, so session settings and temp
+tables never leak into the next checkout. A pool only serves the connection
+parameters it was created for: when an alias's settings change (the test
+runner switching NAME to test_*), the old pool is retired and its connections
+are closed instead of reused.
+"""
+
+import os
+import time
+import threading
+from collections import deque
+
+from django.db import OperationalError
+
+DEFAULTS = {
+    "MIN_SIZE": 1,          # connections kept open when idle
+    "MAX_SIZE": 10,         # hard cap per process
+    "TIMEOUT": 30,          # seconds a checkout waits before failing
+    "MAX_IDLE": 300,        # close idle connections beyond MIN_SIZE after this
+    "CHECK_AFTER": 30,      # ping connections idle longer than this on checkout
+    "MAX_LIFETIME": 3600,   # recycle connections older than this
+}
+
+
+def _in_transaction(conn):
+    """True when a returned connection still has an open (or failed) transaction."""
+    info = getattr(conn, "info", None)
+    status = getattr(info, "transaction_status", None)  # psycopg 3
+    if status is None and hasattr(conn, "get_transaction_status"):
+        status = conn.get_transaction_status()  # psycopg2
+    return bool(status)  # 0 = idle
+
+
+def _reset(conn):
+    """Drops the session state (SET, temp tables, prepared statements, cursors) a user left behind."""
+    autocommit = conn.autocommit
+    if not autocommit:
+        conn.autocommit = True  # DISCARD ALL cannot run inside a transaction block
+    with conn.cursor() as cursor:
+        cursor.execute("DISCARD ALL")
+    if not autocommit:
+        conn.autocommit = False
+
+
+def _params_key(conn_params):
+    return tuple(sorted((name, repr(value)) for name, value in conn_params.items()))
+
+
+class ConnectionPool:
+    def __init__(self, alias, params, min_size, max_size, timeout, max_idle, check_after, max_lifetime):
+        self.alias = alias
+        self.params = params
+        self.retired = False
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.check_after = check_after
+        self.max_lifetime = max_lifetime
+
+        self._idle = deque()   # (connection, created_at, returned_at)
+        self._created = {}     # id(connection) -> created_at, for connections out of the pool
+        self._size = 0
+        self._cond = threading.Condition()
+
+        # Metrics
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+        self.opened = 0
+        self.discarded = 0
+
+    def getconn(self, connect):
+        """Takes an idle connection (health-checked) or opens one with connect()."""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        waited = False
+        while True:
+            with self._cond:
+                while True:
+                    idle = self._take_idle()
+                    if idle is not None:
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        raise OperationalError(
+                            f"Connection pool '{self.alias}' exhausted: {self.max_size} connections "
+                            f"in use for {self.timeout}s (raise DB_POOL_MAX_SIZE or check for leaks)"
+                        )
+                    waited = True
+                    self._cond.wait(remaining)
+                wait = time.monotonic() - started
+
+            if idle is None:
+                break
+            # Ping outside the lock: a slow server must not stall other checkouts and returns
+            conn, idle_for = idle
+            healthy = self._healthy(conn, idle_for)
+            with self._cond:
+                if healthy:
+                    self._record_checkout(wait, waited)
+                    return conn
+                self._discard(conn)
+
+        try:
+            conn = connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._record_checkout(wait, waited)
+            self.opened += 1
+            self._created[id(conn)] = time.monotonic()
+        return conn
+
+    def _record_checkout(self, wait, waited):
+        self.checkouts += 1
+        if waited:
+            self.waits += 1
+        self.wait_seconds += wait
+        self.max_wait_seconds = max(self.max_wait_seconds, wait)
+
+    def _take_idle(self):
+        """
+        Pops an idle connection for the caller to health-check, as (connection,
+        idle seconds); closed or expired ones are discarded. Caller holds the lock.
+        """
+        now = time.monotonic()
+        while self._idle:
+            conn, created, returned = self._idle.pop()  # most recently used first
+            self._created[id(conn)] = created
+            if now - created > self.max_lifetime or getattr(conn, "closed", False):
+                self._discard(conn)
+                continue
+            return conn, now - returned
+        return None
+
+    def _healthy(self, conn, idle_for):
+        if idle_for < self.check_after:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, conn):
+        self._size -= 1
+        self.discarded += 1
+        self._created.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+        self._cond.notify()
+
+    def putconn(self, conn):
+        """
+        Returns a connection, rolled back and reset; broken ones, ones that fail
+        the reset, and any coming back to a retired pool are closed.
+        """
+        usable = not self.retired and not getattr(conn, "closed", False)
+        if usable:
+            try:
+                if _in_transaction(conn):
+                    conn.rollback()
+                _reset(conn)
+            except Exception:
+                usable = False
+        with self._cond:
+            created = self._created.pop(id(conn), time.monotonic())
+            if not usable or self.retired:
+                self._created[id(conn)] = created
+                self._discard(conn)
+                return
+            self._idle.append((conn, created, time.monotonic()))
+            self._trim()
+            self._cond.notify()
+
+    def _trim(self):
+        """Closes connections idle past MAX_IDLE while keeping MIN_SIZE open."""
+        now = time.monotonic()
+        while len(self._idle) > self.min_size and now - self._idle[0][2] > self.max_idle:
+            conn, created, _ = self._idle.popleft()
+            self._created[id(conn)] = created
+            self._discard(conn)
+
+    def retire(self):
+        """Closes the idle connections; checked-out ones are closed when returned."""
+        with self._cond:
+            self.retired = True
+            while self._idle:
+                conn, created, _ = self._idle.pop()
+                self._created[id(conn)] = created
+                self._discard(conn)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "max_size": self.max_size,
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.wait_seconds / self.checkouts * 1000, 2) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 2),
+                "opened": self.opened,
+                "discarded": self.discarded,
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, settings_dict, conn_params):
+    """
+    The pool for this process, alias and connection parameters (forked workers
+    get their own). A pool for the alias with other parameters is retired.
+    """
+    key = (os.getpid(), alias)
+    params = _params_key(conn_params)
+    pool = _pools.get(key)
+    if pool is None or pool.params != params:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is not None and pool.params != params:
+                pool.retire()
+                pool = None
+            if pool is None:
+                options = {**DEFAULTS, **(settings_dict.get("POOL") or {})}
+                pool = ConnectionPool(
+                    alias,
+                    params,
+                    min_size=int(options["MIN_SIZE"]),
+                    max_size=int(options["MAX_SIZE"]),
+                    timeout=float(options["TIMEOUT"]),
+                    max_idle=float(options["MAX_IDLE"]),
+                    check_after=float(options["CHECK_AFTER"]),
+                    max_lifetime=float(options["MAX_LIFETIME"]),
+                )
+                _pools[key] = pool
+    return pool
+
+
+def close_pool(alias):
+    """Retires this process's pool for the alias, so its server connections really close."""
+    with _pools_lock:
+        pool = _pools.pop((os.getpid(), alias), None)
+    if pool is not None:
+        pool.retire()
+
+
+def pool_stats():
+    """{alias: metrics} for this process's pools."""
+    pid = os.getpid()
+    return {alias: pool.stats() for (owner, alias), pool in list(_pools.items()) if owner == pid}
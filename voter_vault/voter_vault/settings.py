@@ -42,6 +42,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres", # pg_trgm lookups & GIN indexes
     "core_db", # Voter Vault Models
 ]
 
@@ -100,6 +101,25 @@ else:
         }
     }
 
+# Connection pooling (voter_vault/db_pool): one pool per process shared by all
+# threads. Django hands connections back to the pool at the end of every
+# request / close_old_connections, so CONN_MAX_AGE must stay 0 with it.
+# Keep DB_POOL_MAX_SIZE >= DB_THREADS + DB_LIMIT_EXPORT for the API process.
+if os.getenv("DB_POOL", "1") == "1" and DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql":
+    DATABASES["default"].update({
+        "ENGINE": "voter_vault.db_pool",
+        "CONN_MAX_AGE": 0,
+        "CONN_HEALTH_CHECKS": False,
+        "POOL": {
+            "MIN_SIZE": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+            "MAX_SIZE": int(os.getenv("DB_POOL_MAX_SIZE", "20")),
+            "TIMEOUT": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+            "MAX_IDLE": float(os.getenv("DB_POOL_MAX_IDLE", "300")),
+            "CHECK_AFTER": float(os.getenv("DB_POOL_CHECK_AFTER", "30")),
+            "MAX_LIFETIME": float(os.getenv("DB_POOL_MAX_LIFETIME", "3600")),
+        },
+    })
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators